@@ -0,0 +1,73 @@
+import argparse
+import importlib
+import os
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(ROOT, "code", "translator"))
+
+codegen = importlib.import_module("codegen")
+lexer = importlib.import_module("lexer")
+semanalyzer = importlib.import_module("semanalyzer")
+syntaxer = importlib.import_module("syntaxer")
+
+
+def flat_program(statements: int) -> str:
+    body = "\n".join(
+        f"  x := x + {n} * y;" if n % 2 else f"  writeln(x, {n});"
+        for n in range(statements)
+    )
+    return f"program flat;\nvar\n  x, y: integer;\nbegin\n{body}\nend.\n"
+
+
+def nested_program(levels: int, per_level: int = 20) -> str:
+    lines = ["program nested;", "var", "  x, y: integer;", "begin"]
+    for level in range(levels):
+        pad = "  " * (level + 1)
+        lines += [f"{pad}x := x + {n};" for n in range(per_level)]
+        lines.append(f"{pad}while x < {level} do")
+        lines.append(f"{pad}begin")
+    for level in reversed(range(levels)):
+        pad = "  " * (level + 1)
+        lines.append(f"{pad}  y := y + 1;")
+        lines.append(f"{pad}end;")
+    lines.append("end.")
+    return "\n".join(lines) + "\n"
+
+
+def measure(source: str, repeat: int) -> tuple:
+    ast = syntaxer.SyntaxAnalyzer(lexer.iter_tokens(source)).parse_program()
+    semanalyzer.SemanticAnalyzer().check_program(ast)
+    best = float("inf")
+    output = ""
+    for _ in range(repeat):
+        start = time.perf_counter()
+        output = codegen.CodeGenerator().generate(ast)
+        best = min(best, time.perf_counter() - start)
+    return len(output), best
+
+
+def report(name: str, source: str, repeat: int) -> None:
+    size, seconds = measure(source, repeat)
+    print(f"{name:<22} {size:>10,} {seconds * 1000:>9.2f} "
+          f"{size / seconds / 2**20:>9.2f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Code generation scaling")
+    parser.add_argument("--statements", default="10000,20000,40000")
+    parser.add_argument("--levels", default="50,100,200")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    sys.setrecursionlimit(100000)
+
+    print(f"{'program':<22} {'bytes':>10} {'ms':>9} {'MiB/s':>9}")
+    for count in map(int, args.statements.split(",")):
+        report(f"flat {count} stmts", flat_program(count), args.repeat)
+    for levels in map(int, args.levels.split(",")):
+        report(f"nested {levels} levels", nested_program(levels), args.repeat)
+
+
+if __name__ == "__main__":
+    main()
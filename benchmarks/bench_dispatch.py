@@ -0,0 +1,59 @@
+import argparse
+import cProfile
+import importlib
+import os
+import pstats
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(ROOT, "code", "translator"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+codegen = importlib.import_module("codegen")
+generator = importlib.import_module("generator")
+lexer = importlib.import_module("lexer")
+semanalyzer = importlib.import_module("semanalyzer")
+syntaxer = importlib.import_module("syntaxer")
+
+DISPATCHERS = (
+    "genCode",
+    "genExpression",
+    "check_node",
+    "_infer_type",
+    "getTextNode",
+)
+
+
+def run_passes(source: str) -> None:
+    analyzer = syntaxer.SyntaxAnalyzer(lexer.iter_tokens(source))
+    ast = analyzer.parse_program()
+    semanalyzer.SemanticAnalyzer().check_program(ast)
+    codegen.CodeGenerator().generate(ast)
+    analyzer.getTextTree(ast)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Per-node dispatch cost")
+    parser.add_argument("--statements", type=int, default=20000)
+    args = parser.parse_args()
+
+    source = generator.generate_program(statements=args.statements)
+    profiler = cProfile.Profile()
+    profiler.runcall(run_passes, source)
+    stats = pstats.Stats(profiler).stats
+
+    total_time = sum(entry[2] for entry in stats.values())
+    print(f"{'dispatcher':<14} {'calls':>9} {'own ms':>9} {'ns/call':>8}")
+    dispatch_time = 0.0
+    for (_, _, name), (_, calls, own, _, _) in sorted(stats.items()):
+        if name not in DISPATCHERS:
+            continue
+        dispatch_time += own
+        print(f"{name:<14} {calls:>9} {own * 1000:>9.2f} "
+              f"{own * 1e9 / calls:>8.0f}")
+    print(f"dispatch share of profiled time: "
+          f"{dispatch_time / total_time:.1%} of {total_time * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+import argparse
+import importlib
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(ROOT, "code", "translator"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+generator = importlib.import_module("generator")
+lexer = importlib.import_module("lexer")
+pipeline = importlib.import_module("pipeline")
+
+
+def read_source(path: str) -> str:
+    with open(path, encoding="utf-8") as source:
+        return source.read()
+
+
+def lex_string(path: str) -> int:
+    return sum(1 for _ in lexer.iter_tokens(read_source(path)))
+
+
+def lex_file(path: str) -> int:
+    return sum(1 for _ in lexer.iter_file_tokens(path))
+
+
+def translate_string(path: str) -> int:
+    return len(pipeline.Translator().translate(read_source(path)).output)
+
+
+def translate_file(path: str) -> int:
+    return len(pipeline.Translator().translate_file(path).output)
+
+
+def measure(func, path: str) -> tuple:
+    start = time.perf_counter()
+    result = func(path)
+    seconds = time.perf_counter() - start
+    tracemalloc.start()
+    func(path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, seconds, peak
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="File input memory")
+    parser.add_argument("--statements", type=int, default=50000)
+    args = parser.parse_args()
+
+    source = generator.generate_program(statements=args.statements)
+
+    with tempfile.NamedTemporaryFile("w", suffix=".pas", delete=False,
+                                     encoding="utf-8") as target:
+        target.write(source)
+    try:
+        size = os.path.getsize(target.name)
+        print(f"source: {size / 2**20:.1f} MiB")
+        print(f"{'stage':>10} {'input':>7} {'seconds':>8} {'peak MiB':>9}")
+        for stage, funcs in (
+            ("lex", (lex_string, lex_file)),
+            ("translate", (translate_string, translate_file)),
+        ):
+            results = []
+            for name, func in zip(("str", "mmap"), funcs):
+                result, seconds, peak = measure(func, target.name)
+                results.append(result)
+                print(f"{stage:>10} {name:>7} {seconds:>8.2f} "
+                      f"{peak / 2**20:>9.1f}")
+            if results[0] != results[1]:
+                raise SystemExit(f"{stage}: results differ")
+    finally:
+        os.unlink(target.name)
+
+
+if __name__ == "__main__":
+    main()
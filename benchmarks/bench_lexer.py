@@ -0,0 +1,144 @@
+import argparse
+import importlib
+import os
+import re
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(ROOT, "code", "translator"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+lexer = importlib.import_module("lexer")
+generator = importlib.import_module("generator")
+
+LEGACY_SPECIFICATION = [
+    ("PROGRAM", r"program\b"),
+    ("VAR", r"var\b"),
+    ("FUNCTION", r"function\b"),
+    ("PROCEDURE", r"procedure\b"),
+    ("INTEGER", r"integer\b"),
+    ("REAL", r"real\b"),
+    ("BOOLEAN", r"boolean\b"),
+    ("CHAR", r"char\b"),
+    ("STRING", r"string\b"),
+    ("BEGIN", r"begin\b"),
+    ("END", r"end\b"),
+    ("IF", r"if\b"),
+    ("THEN", r"then\b"),
+    ("ELSE", r"else\b"),
+    ("WHILE", r"while\b"),
+    ("DO", r"do\b"),
+    ("REPEAT", r"repeat\b"),
+    ("UNTIL", r"until\b"),
+    ("FOR", r"for\b"),
+    ("TO", r"to\b"),
+    ("DOWNTO", r"downto\b"),
+    ("SWITCH", r"switch\b"),
+    ("CASE", r"case\b"),
+    ("DEFAULT", r"default\b"),
+    ("WRITELN", r"writeln\b"),
+    ("NOT", r"not\b"),
+    ("ARRAY", r"array\b"),
+    ("OF", r"of\b"),
+    ("ASSIGN", r":="),
+    ("COLON", r":"),
+    ("SEMICOLON", r";"),
+    ("COMMA", r","),
+    ("LPAR", r"\("),
+    ("RPAR", r"\)"),
+    ("LBRACKET", r"\["),
+    ("RBRACKET", r"\]"),
+    ("COMMENT1", r"//.*"),
+    ("COMMENT2", r"\{[^}]*\}"),
+    (
+        "OPERATOR",
+        (
+            r"(\+|\-|\*|/|==|!=|<=|>=|<>|<|>|="
+            r"|\band\b|\bor\b|\bxor\b|\bdiv\b|\bmod\b)"
+        ),
+    ),
+    ("RANGE", r"\.\."),
+    ("NUMBER", r"-?\d+(\.\d+)?"),
+    ("BOOL_LIT", r"\btrue\b|\bfalse\b"),
+    ("CHAR_LIT", r"'(.)'"),
+    ("STRING_LIT", r"'[^']*'"),
+    ("IDENTIFIER", r"[a-zA-Z_][a-zA-Z0-9_]*"),
+    ("SKIP", r"[\s\t\n\r]+"),
+    ("DOT", r"\."),
+    ("MISMATCH", r"."),
+]
+
+
+def legacy_tokenize(code: str) -> list:
+    tokens = []
+    tok_regex = "|".join(
+        f"(?P<{token_type}>{pattern})"
+        for token_type, pattern in LEGACY_SPECIFICATION
+    )
+    line_num = 1
+    line_start = 0
+
+    for match in re.finditer(tok_regex, code, re.IGNORECASE):
+        kind = match.lastgroup
+        value = match.group()
+        column = match.start() - line_start
+
+        if kind in ["SKIP", "COMMENT1", "COMMENT2"]:
+            if "\n" in value:
+                line_num += value.count("\n")
+                line_start = match.end() - (
+                    len(value) - value.rfind("\n") - 1
+                )
+            continue
+
+        if kind == "MISMATCH":
+            raise SyntaxError(value)
+
+        if kind == "STRING_LIT":
+            tokens.append(("STRING", value, line_num, column))
+        else:
+            tokens.append((kind, value, line_num, column))
+
+        if "\n" in value:
+            line_num += value.count("\n")
+            line_start = match.end() - (len(value) - value.rfind("\n") - 1)
+
+    return tokens
+
+
+def measure(tokenize, source: str, repeat: int) -> tuple:
+    best = float("inf")
+    count = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        count = len(tokenize(source))
+        best = min(best, time.perf_counter() - start)
+    return count, best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Lexer throughput")
+    parser.add_argument("--sizes", default="1000,10000,50000")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'statements':>10} {'tokens':>9} {'before tok/s':>14} "
+          f"{'after tok/s':>14} {'speedup':>8}")
+    for size in map(int, args.sizes.split(",")):
+        source = generator.generate_program(statements=size)
+        legacy = legacy_tokenize(source)
+        current = [
+            (token.type.name, token.value, token.line, token.column)
+            for token in lexer.tokenize(source)
+        ]
+        if legacy != current:
+            raise SystemExit(f"token streams differ for {size} statements")
+        count, before = measure(legacy_tokenize, source, args.repeat)
+        _, after = measure(lexer.tokenize, source, args.repeat)
+        print(f"{size:>10} {count:>9} {count / before:>14,.0f} "
+              f"{count / after:>14,.0f} {before / after:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+import argparse
+import importlib
+import os
+import sys
+import tracemalloc
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(ROOT, "code", "translator"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+codegen = importlib.import_module("codegen")
+generator = importlib.import_module("generator")
+lexer = importlib.import_module("lexer")
+nodes = importlib.import_module("nodes")
+semanalyzer = importlib.import_module("semanalyzer")
+syntaxer = importlib.import_module("syntaxer")
+
+
+def node_fields(node) -> list:
+    if hasattr(node, "__dict__"):
+        return list(vars(node).values())
+    return [
+        getattr(node, name)
+        for cls in type(node).__mro__
+        for name in getattr(cls, "__slots__", ())
+    ]
+
+
+def iter_nodes(root):
+    stack = [root]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, nodes.ExpressionNode):
+            yield item
+            stack.extend(node_fields(item))
+        elif isinstance(item, (list, tuple)):
+            stack.extend(item)
+
+
+def node_bytes(node) -> int:
+    size = sys.getsizeof(node)
+    if hasattr(node, "__dict__"):
+        size += sys.getsizeof(node.__dict__)
+    return size
+
+
+def parse(source: str):
+    return syntaxer.SyntaxAnalyzer(lexer.iter_tokens(source)).parse_program()
+
+
+def translate(source: str) -> str:
+    ast = parse(source)
+    semanalyzer.SemanticAnalyzer().check_program(ast)
+    return codegen.CodeGenerator().generate(ast)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="AST memory footprint")
+    parser.add_argument("--sizes", default="1000,10000,50000")
+    args = parser.parse_args()
+
+    print(f"{'statements':>10} {'KLOC':>7} {'nodes':>8} {'B/node':>7} "
+          f"{'AST MiB':>8} {'peak MiB/KLOC':>14}")
+    for size in map(int, args.sizes.split(",")):
+        source = generator.generate_program(statements=size)
+        kloc = source.count("\n") / 1000
+
+        tracemalloc.start()
+        ast = parse(source)
+        retained, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        all_nodes = list(iter_nodes(ast))
+        count = len(all_nodes)
+        per_node = sum(map(node_bytes, all_nodes)) / count
+        del ast, all_nodes
+
+        tracemalloc.start()
+        translate(source)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        print(f"{size:>10} {kloc:>7.1f} {count:>8} {per_node:>7.1f} "
+              f"{retained / 2**20:>8.2f} {peak / 2**20 / kloc:>14.3f}")
+
+
+if __name__ == "__main__":
+    main()
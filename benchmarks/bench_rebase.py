@@ -0,0 +1,61 @@
+import argparse
+import importlib
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+FIXTURE_DIR = os.path.join(ROOT, "tests", "fixtures", "rebase")
+sys.path.insert(0, os.path.join(ROOT, "code", "translator"))
+
+pipeline = importlib.import_module("pipeline")
+
+RESULT = re.compile(r"^(Benchmark\w+?)(?:-\d+)?\s+\d+\s+([\d.]+) ns/op", re.M)
+
+
+def translate(rebase_loops: bool) -> str:
+    translator = pipeline.Translator()
+    translator.passes()[2].rebase_loops = rebase_loops
+    with open(os.path.join(FIXTURE_DIR, "rebase.pas")) as source:
+        return translator.translate(source.read()).output
+
+
+def run_benchmarks(go: str, output: str, count: int) -> dict:
+    with tempfile.TemporaryDirectory() as module:
+        with open(os.path.join(module, "main.go"), "w") as main:
+            main.write(output)
+        with open(os.path.join(module, "go.mod"), "w") as mod:
+            mod.write("module rebase\n\ngo 1.18\n")
+        shutil.copy(os.path.join(FIXTURE_DIR, "rebase_test.go"), module)
+        run = subprocess.run(
+            [go, "test", "-run", "^$", "-bench", ".",
+             "-count", str(count)],
+            cwd=module,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    best = {}
+    for name, nanoseconds in RESULT.findall(run.stdout):
+        best[name] = min(best.get(name, float("inf")), float(nanoseconds))
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Loop rebasing in Go")
+    parser.add_argument("--go", default=shutil.which("go") or "go")
+    parser.add_argument("--count", type=int, default=5)
+    args = parser.parse_args()
+
+    plain = run_benchmarks(args.go, translate(False), args.count)
+    rebased = run_benchmarks(args.go, translate(True), args.count)
+    print(f"{'benchmark':<20} {'offset ns':>10} {'rebased ns':>11}")
+    for name in plain:
+        print(f"{name:<20} {plain[name]:>10.1f} {rebased[name]:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+import argparse
+import importlib
+import os
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(ROOT, "code", "translator"))
+
+lexer = importlib.import_module("lexer")
+semanalyzer = importlib.import_module("semanalyzer")
+syntaxer = importlib.import_module("syntaxer")
+
+
+def chained_program(length: int) -> str:
+    left = " + ".join(["a"] * length)
+    nested = "(" * length + "a" + " + a)" * length
+    cond = " and ".join(["(a < b)"] * length)
+    return (
+        "program chain;\nvar\n  a, b, x: integer;\n  c: boolean;\n"
+        f"begin\n  x := {left};\n  x := {nested};\n"
+        f"  c := {cond};\n  writeln({left});\nend.\n"
+    )
+
+
+class CountingAnalyzer(semanalyzer.SemanticAnalyzer):
+    def __init__(self) -> None:
+        super().__init__()
+        self.typed = 0
+
+    def _infer_type(self, node):
+        self.typed += 1
+        return super()._infer_type(node)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Semantic analysis scaling")
+    parser.add_argument("--lengths", default="50,100,200,400,800")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    sys.setrecursionlimit(100000)
+
+    print(f"{'length':>7} {'typed':>7} {'ms':>9} {'us/node':>8}")
+    for length in map(int, args.lengths.split(",")):
+        source = chained_program(length)
+        best = float("inf")
+        typed = 0
+        for _ in range(args.repeat):
+            ast = syntaxer.SyntaxAnalyzer(
+                lexer.iter_tokens(source)
+            ).parse_program()
+            analyzer = CountingAnalyzer()
+            start = time.perf_counter()
+            analyzer.check_program(ast)
+            best = min(best, time.perf_counter() - start)
+            typed = analyzer.typed
+        print(f"{length:>7} {typed:>7} {best * 1000:>9.2f} "
+              f"{best * 1e6 / typed:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+import argparse
+import importlib
+import os
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(ROOT, "code", "translator"))
+
+codegen = importlib.import_module("codegen")
+lexer = importlib.import_module("lexer")
+metrics = importlib.import_module("metrics")
+nodes = importlib.import_module("nodes")
+semanalyzer = importlib.import_module("semanalyzer")
+syntaxer = importlib.import_module("syntaxer")
+
+
+def scoped_program(routines: int, locals_: int, statements: int) -> str:
+    lines = [
+        "program scopes;",
+        "var",
+        f"  {', '.join(f'g{n}' for n in range(locals_))}: integer;",
+        "  ga: array[1..100] of integer;",
+    ]
+    for routine in range(routines):
+        names = [f"v{n}" for n in range(locals_)]
+        lines += [
+            f"procedure p{routine}(a: integer);",
+            "var",
+            f"  {', '.join(names)}: integer;",
+            "  la: array[5..104] of integer;",
+            "begin",
+        ]
+        for n in range(statements):
+            target = names[n % locals_]
+            source = names[(n * 7 + 3) % locals_]
+            lines.append(
+                f"  {target} := {source} + g{n % locals_} + a;"
+            )
+            lines.append(f"  la[{source} mod 100 + 5] := ga[a mod 100 + 1];")
+        lines += ["end;"]
+    lines += ["begin", "  p0(1);", "end."]
+    return "\n".join(lines) + "\n"
+
+
+def references(ast) -> list:
+    found = []
+    pending = [ast]
+    while pending:
+        node = pending.pop()
+        if isinstance(node, (nodes.ValueNode, nodes.ArrayAccessNode)):
+            if node.symbol is not None:
+                found.append(node)
+        pending.extend(metrics.node_children(node))
+    return found
+
+
+def scan(scopes: list, name: str):
+    for scope in reversed(scopes):
+        if name in scope:
+            return scope[name]
+    return None
+
+
+def best_of(func, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def measure(source: str, depths: list, repeat: int) -> tuple:
+    checker = semanalyzer.SemanticAnalyzer()
+    check = float("inf")
+    for _ in range(repeat):
+        tokens = lexer.iter_tokens(source)
+        ast = syntaxer.SyntaxAnalyzer(tokens).parse_program()
+        checker.reset()
+        start = time.perf_counter()
+        checker.check_program(ast)
+        check = min(check, time.perf_counter() - start)
+    generate = best_of(lambda: codegen.CodeGenerator().generate(ast), repeat)
+
+    refs = references(ast)
+    names = [
+        node.name if node.__class__ is nodes.ArrayAccessNode
+        else node.value.value
+        for node in refs
+    ]
+    routine = ast.routines[0]
+    checker.push_scope()
+    for name, type_ in routine.params + routine.local_decls:
+        checker.declare(name, type_)
+    outer = {name: checker.resolve(name) for name, _ in ast.declarations}
+    inner = {
+        name: checker.resolve(name)
+        for name, _ in routine.params + routine.local_decls
+    }
+    scans = [
+        best_of(
+            lambda: [scan(scopes, name) for name in names], repeat
+        )
+        for scopes in (
+            [outer] + [{}] * (depth - 2) + [inner] for depth in depths
+        )
+    ]
+    resolve = best_of(lambda: [checker.resolve(name) for name in names],
+                      repeat)
+    bound = best_of(lambda: [node.symbol for node in refs], repeat)
+    return len(refs), check, generate, scans, resolve, bound
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Symbol binding cost")
+    parser.add_argument("--routines", type=int, default=50)
+    parser.add_argument("--locals", default="10,100,1000")
+    parser.add_argument("--statements", type=int, default=100)
+    parser.add_argument("--depths", default="2,8,32")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    depths = [max(2, int(depth)) for depth in args.depths.split(",")]
+    print(f"{'locals':>7} {'refs':>7} {'check ms':>9} {'gen ms':>7} "
+          + "".join(f"{f'scan{depth} ns':>10}" for depth in depths)
+          + f" {'dict ns':>8} {'bound ns':>9}")
+    for locals_ in map(int, args.locals.split(",")):
+        source = scoped_program(args.routines, locals_, args.statements)
+        refs, check, generate, scans, resolve, bound = measure(
+            source, depths, args.repeat
+        )
+        print(f"{locals_:>7} {refs:>7} {check * 1000:>9.2f} "
+              f"{generate * 1000:>7.2f}"
+              + "".join(f"{seconds * 1e9 / refs:>10.1f}" for seconds in scans)
+              + f" {resolve * 1e9 / refs:>8.1f} {bound * 1e9 / refs:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+import random
+
+TYPES = ("integer", "real", "boolean")
+
+
+class ProgramGenerator:
+    def __init__(
+        self,
+        statements: int = 1000,
+        routines: int = 10,
+        seed: int = 0,
+        nesting: int = 1,
+        expr_depth: int = 2,
+        arrays: int = 0,
+    ) -> None:
+        self.statements = statements
+        self.routines = routines
+        self.nesting = nesting
+        self.expr_depth = expr_depth
+        self.arrays = [f"arr{n}" for n in range(arrays)]
+        self.rng = random.Random(seed)
+        self.variables = {
+            "integer": [f"i{n}" for n in range(8)],
+            "real": [f"r{n}" for n in range(4)],
+            "boolean": [f"b{n}" for n in range(4)],
+        }
+
+    def int_expr(self, depth: int = None) -> str:
+        rng = self.rng
+        if depth is None:
+            depth = self.expr_depth
+        if depth == 0 or rng.random() < 0.3:
+            roll = rng.random()
+            if roll < 0.4:
+                return str(rng.randint(0, 100))
+            if roll < 0.5 and self.arrays:
+                index = rng.choice(self.variables["integer"])
+                return f"{rng.choice(self.arrays)}[{index} mod 100 + 1]"
+            return rng.choice(self.variables["integer"])
+        op = rng.choice(["+", "-", "*", "div", "mod"])
+        left = self.int_expr(depth - 1)
+        right = self.int_expr(depth - 1)
+        if op in ("div", "mod"):
+            right = str(rng.randint(1, 9))
+        if rng.random() < 0.3:
+            return f"({left} {op} {right})"
+        return f"{left} {op} {right}"
+
+    def real_expr(self) -> str:
+        rng = self.rng
+        left = rng.choice(self.variables["real"])
+        return f"{left} * {rng.randint(1, 9)}.5 + {rng.randint(0, 9)}.25"
+
+    def bool_expr(self) -> str:
+        rng = self.rng
+        op = rng.choice(["<", ">", "<=", ">=", "=", "<>"])
+        cond = f"{self.int_expr(1)} {op} {self.int_expr(1)}"
+        if rng.random() < 0.3:
+            cond = f"({cond}) and not {rng.choice(self.variables['boolean'])}"
+        return cond
+
+    def statement(self, indent: str) -> list:
+        rng = self.rng
+        roll = rng.random()
+        if roll < 0.45:
+            if self.arrays and rng.random() < 0.2:
+                index = rng.choice(self.variables["integer"])
+                target = f"{rng.choice(self.arrays)}[{index} mod 100 + 1]"
+                return [f"{indent}{target} := {self.int_expr()};"]
+            var_type = rng.choice(TYPES)
+            target = rng.choice(self.variables[var_type])
+            if var_type == "integer":
+                value = self.int_expr()
+            elif var_type == "real":
+                value = self.real_expr()
+            else:
+                value = self.bool_expr()
+            return [f"{indent}{target} := {value};"]
+        if roll < 0.6:
+            return [f"{indent}writeln({self.int_expr(1)});"]
+        if roll < 0.75:
+            return [
+                f"{indent}if {self.bool_expr()} then",
+                f"{indent}begin",
+                f"{indent}  {rng.choice(self.variables['integer'])} := "
+                f"{self.int_expr()};",
+                f"{indent}end",
+                f"{indent}else",
+                f"{indent}  writeln({self.int_expr(1)});",
+            ]
+        if roll < 0.85:
+            var = rng.choice(self.variables["integer"])
+            return [
+                f"{indent}for {var} := 1 to {rng.randint(2, 20)} do",
+                f"{indent}  writeln({var});",
+            ]
+        if roll < 0.95:
+            var = rng.choice(self.variables["integer"])
+            return [
+                f"{indent}while {var} < {rng.randint(2, 20)} do",
+                f"{indent}  {var} := {var} + 1;",
+            ]
+        var = rng.choice(self.variables["integer"])
+        return [
+            f"{indent}case {var} of",
+            f"{indent}  1: writeln(1);",
+            f"{indent}  2, 3: writeln({self.int_expr(1)});",
+            f"{indent}else",
+            f"{indent}  writeln(0);",
+            f"{indent}end;",
+        ]
+
+    def nested(self, count: int, depth: int, indent: str) -> list:
+        if depth <= 1:
+            lines = []
+            for _ in range(count):
+                lines += self.statement(indent)
+            return lines
+        var = self.rng.choice(self.variables["integer"])
+        lines = [f"{indent}if {var} < {depth * 10} then", f"{indent}begin"]
+        lines += self.nested(count, depth - 1, indent + "  ")
+        lines.append(f"{indent}end;")
+        return lines
+
+    def routine(self, index: int, statements: int) -> list:
+        lines = [
+            f"function f{index}(a: integer; b: integer): integer;",
+            "var",
+            "  t: integer;",
+            "begin",
+            "  t := a + b;",
+        ]
+        for _ in range(statements):
+            lines.append(f"  t := {self.int_expr()} + t;")
+        lines += [f"  f{index} := t;", "end;", ""]
+        return lines
+
+    def generate(self) -> str:
+        lines = ["program bench;", "var"]
+        for var_type, names in self.variables.items():
+            lines.append(f"  {', '.join(names)}: {var_type};")
+        if self.arrays:
+            lines.append(
+                f"  {', '.join(self.arrays)}: array[1..100] of integer;"
+            )
+        per_routine = self.statements // (10 * max(self.routines, 1))
+        for index in range(self.routines):
+            lines += self.routine(index, per_routine)
+        lines.append("begin")
+        for index in range(self.routines):
+            lines.append(f"  i0 := f{index}(i1, {index});")
+        group = max(1, min(self.statements, 20))
+        for _ in range(0, self.statements, group):
+            lines += self.nested(group, self.nesting, "  ")
+        lines.append("end.")
+        return "\n".join(lines) + "\n"
+
+
+def generate_program(
+    statements: int = 1000,
+    routines: int = 10,
+    seed: int = 0,
+    nesting: int = 1,
+    expr_depth: int = 2,
+    arrays: int = 0,
+) -> str:
+    return ProgramGenerator(
+        statements,
+        routines,
+        seed,
+        nesting=nesting,
+        expr_depth=expr_depth,
+        arrays=arrays,
+    ).generate()
@@ -0,0 +1,133 @@
+import argparse
+import importlib
+import json
+import os
+import platform
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(ROOT, "code", "translator"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+generator = importlib.import_module("generator")
+metrics = importlib.import_module("metrics")
+pipeline = importlib.import_module("pipeline")
+
+SCENARIOS = {
+    "flat": dict(statements=5000, routines=10),
+    "nested": dict(statements=2000, routines=5, nesting=12),
+    "deep_expr": dict(statements=2000, routines=5, expr_depth=7),
+    "routines": dict(statements=4000, routines=200),
+    "arrays": dict(statements=4000, routines=10, arrays=8),
+}
+
+
+def run_scenario(params: dict, seed: int, repeat: int) -> dict:
+    source = generator.generate_program(seed=seed, **params)
+    staged = pipeline.Translator(instrument=True)
+    plain = pipeline.Translator()
+    stages = {stage: float("inf") for stage in metrics.STAGES}
+    total = float("inf")
+    result = None
+    for _ in range(repeat):
+        result = staged.translate(source)
+        if not result.ok:
+            raise RuntimeError(result.diagnostics[0].format())
+        for stage, seconds in result.stats.stage_seconds.items():
+            stages[stage] = min(stages[stage], seconds)
+        start = time.perf_counter()
+        plain.translate(source)
+        total = min(total, time.perf_counter() - start)
+    return {
+        "params": params,
+        "source_bytes": len(source.encode()),
+        "tokens": result.stats.tokens,
+        "nodes": result.stats.nodes,
+        "output_bytes": result.stats.output_bytes,
+        "stages": stages,
+        "total": total,
+    }
+
+
+def run(names: list, seed: int, repeat: int) -> dict:
+    return {
+        "python": platform.python_version(),
+        "seed": seed,
+        "repeat": repeat,
+        "scenarios": {
+            name: run_scenario(SCENARIOS[name], seed, repeat)
+            for name in names
+        },
+    }
+
+
+def compare(report: dict, baseline: dict, threshold: float) -> list:
+    regressions = []
+    for name, current in report["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(name)
+        if previous is None:
+            continue
+        timings = [("total", current["total"], previous["total"])]
+        for stage, seconds in current["stages"].items():
+            before = previous.get("stages", {}).get(stage)
+            if before is not None:
+                timings.append((stage, seconds, before))
+        for label, now, before in timings:
+            if before > 0 and now > before * (1 + threshold):
+                regressions.append((name, label, before, now))
+    return regressions
+
+
+def print_table(report: dict) -> None:
+    header = " ".join(f"{stage:>9}" for stage in metrics.STAGES)
+    print(f"{'scenario':<12} {'tokens':>9} {header} {'total ms':>9}",
+          file=sys.stderr)
+    for name, data in report["scenarios"].items():
+        stages = " ".join(
+            f"{data['stages'][stage] * 1000:>9.2f}"
+            for stage in metrics.STAGES
+        )
+        print(f"{name:<12} {data['tokens']:>9,} {stages} "
+              f"{data['total'] * 1000:>9.2f}", file=sys.stderr)
+
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(description="Translator benchmarks")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="write the JSON report here")
+    parser.add_argument("--baseline", help="JSON report to compare with")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="allowed slowdown, 0.10 means 10%%")
+    args = parser.parse_args(argv)
+
+    names = [name for name in args.scenarios.split(",") if name]
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(unknown)}")
+
+    report = run(names, args.seed, args.repeat)
+    print_table(report)
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(text + "\n")
+    else:
+        print(text)
+
+    if not args.baseline:
+        return 0
+    with open(args.baseline, encoding="utf-8") as file:
+        baseline = json.load(file)
+    regressions = compare(report, baseline, args.threshold)
+    for name, label, before, now in regressions:
+        print(f"REGRESSION {name}/{label}: {before * 1000:.2f} ms -> "
+              f"{now * 1000:.2f} ms (+{(now / before - 1) * 100:.0f}%)",
+              file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
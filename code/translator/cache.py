@@ -0,0 +1,142 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+
+TRANSLATOR_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class CachedTranslation(NamedTuple):
+    output: str
+    error: Optional[str]
+
+
+def translator_version() -> str:
+    digest = hashlib.sha256()
+    for name in sorted(os.listdir(TRANSLATOR_DIR)):
+        if not name.endswith(".py"):
+            continue
+        digest.update(name.encode("utf-8"))
+        with open(os.path.join(TRANSLATOR_DIR, name), "rb") as source:
+            digest.update(source.read())
+    return digest.hexdigest()[:16]
+
+
+def entry_size(entry: CachedTranslation) -> int:
+    size = len(entry.output.encode("utf-8"))
+    if entry.error is not None:
+        size += len(entry.error.encode("utf-8"))
+    return size
+
+
+class TranslationCache:
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        max_bytes: int = 64 * 2**20,
+        directory: str = None,
+        version: str = None,
+    ) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.version = version or translator_version()
+        self.entries = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def key(self, source: str) -> str:
+        digest = hashlib.sha256(self.version.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(source.encode("utf-8"))
+        return digest.hexdigest()
+
+    def get(self, source: str) -> Optional[CachedTranslation]:
+        key = self.key(source)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry
+
+        entry = self.load(key)
+        with self.lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self.remember(key, entry)
+        return entry
+
+    def put(self, source: str, entry: CachedTranslation) -> None:
+        key = self.key(source)
+        with self.lock:
+            self.remember(key, entry)
+        self.store(key, entry)
+
+    def remember(self, key: str, entry: CachedTranslation) -> None:
+        size = entry_size(entry)
+        if size > self.max_bytes:
+            return
+        previous = self.entries.pop(key, None)
+        if previous is not None:
+            self.size -= entry_size(previous)
+        self.entries[key] = entry
+        self.size += size
+        while (
+            len(self.entries) > self.max_entries
+            or self.size > self.max_bytes
+        ):
+            _, evicted = self.entries.popitem(last=False)
+            self.size -= entry_size(evicted)
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def load(self, key: str) -> Optional[CachedTranslation]:
+        if not self.directory:
+            return None
+        path = self.path(key)
+        try:
+            with open(path, encoding="utf-8") as stored:
+                data = json.load(stored)
+            return CachedTranslation(data["output"], data["error"])
+        except OSError:
+            return None
+        except (ValueError, KeyError, TypeError):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+
+    def store(self, key: str, entry: CachedTranslation) -> None:
+        if not self.directory:
+            return
+        path = self.path(key)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(temp_path, "w", encoding="utf-8") as stored:
+                json.dump(entry._asdict(), stored, ensure_ascii=False)
+            os.replace(temp_path, path)
+        except OSError:
+            pass
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                "entries": len(self.entries),
+                "bytes": self.size,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+            }
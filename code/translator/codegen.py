@@ -1,3 +1,9 @@
+import json
+from typing import Iterator
+
+from goruntime import READERS, resolve
+from lexer import ASSIGN, IDENTIFIER, NUMBER, STRING
+from metrics import node_children
 from nodes import (
     ArrayAccessNode,
     BinOperatorNode,
@@ -16,9 +22,10 @@ from nodes import (
     VarDeclarationNode,
     WhileStatementNode,
 )
+from operators import NON_ASSOCIATIVE, PRECEDENCE, UNARY_PRECEDENCE
+from visitor import NodeVisitor, visits
 
 TO_GO = {
-    "writeln": "fmt.Println",
     "integer": "int",
     "string": "string",
     "boolean": "bool",
@@ -36,48 +43,47 @@ TO_GO = {
 }
 
 MARGIN = "\t"
+OUTPUT = "_out"
+APPEND = f"{OUTPUT}.Write(strconv.Append{{}}({OUTPUT}.AvailableBuffer(), "
+WRITERS = {
+    "integer": ("strconv", APPEND.format("Int") + "int64(", "), 10))"),
+    "real": ("strconv", APPEND.format("Float"), ", 'g', -1, 64))"),
+    "boolean": ("strconv", APPEND.format("Bool"), "))"),
+    "char": (None, f"{OUTPUT}.WriteRune(", ")"),
+    "string": (None, f"{OUTPUT}.WriteString(", ")"),
+}
+FALLBACK_WRITER = ("fmt", f"fmt.Fprint({OUTPUT}, ", ")")
+INPUT = "_in"
+
 
+class CodeGenerator(NodeVisitor):
+    rebase_loops = True
 
-class CodeGenerator:
     def __init__(self) -> None:
+        self.prec = PRECEDENCE
+        self.reset()
+
+    def reset(self) -> None:
         self.output = ""
-        self.needs_fmt_import = False
+        self.chunks = []
+        self.indents = [""]
+        self.requires = set()
+        self.flush_chunk = None
         self.current_function = None
-        self.array_scopes = [{}]
-        self.prec = {
-            "or": 1,
-            "xor": 1,
-            "and": 2,
-            "=": 3,
-            "<>": 3,
-            "==": 3,
-            "!=": 3,
-            "<": 3,
-            ">": 3,
-            "<=": 3,
-            ">=": 3,
-            "+": 4,
-            "-": 4,
-            "*": 5,
-            "/": 5,
-            "div": 5,
-            "mod": 5,
-        }
-
-    def push_scope(self) -> None:
-        self.array_scopes.append({})
-
-    def pop_scope(self) -> None:
-        self.array_scopes.pop()
-
-    def register_array(self, name: str, low: int) -> None:
-        self.array_scopes[-1][name] = low
-
-    def lookup_array_low(self, name: str):
-        for scope in reversed(self.array_scopes):
-            if name in scope:
-                return scope[name]
-        return None
+        self.loop_bounds = 0
+        self.rebased = {}
+
+    def write(self, text: str) -> None:
+        self.chunks.append(text)
+
+    def margin(self) -> None:
+        self.chunks.append(self.indents[-1])
+
+    def indent(self) -> None:
+        self.indents.append(self.indents[-1] + MARGIN)
+
+    def dedent(self) -> None:
+        self.indents.pop()
 
     def format_type(self, type_) -> str:
         if isinstance(type_, dict) and type_.get("kind") == "array":
@@ -86,262 +92,478 @@ class CodeGenerator:
             return f"[{size}]{elem}"
         return TO_GO.get(type_, type_)
 
-    def genVarDeclaration(self, node) -> str:
+    @visits("statement", VarDeclarationNode)
+    def genVarDeclaration(self, node) -> None:
         decls = []
         for name, type_ in node.declarations:
-            if isinstance(type_, dict) and type_.get("kind") == "array":
-                self.register_array(name, type_["low"])
             decls.append(f"var {name} {self.format_type(type_)}")
-        return "\n".join(decls) + "\n"
-
-    def genProcedureCall(self, node) -> str:
-        args = ", ".join(self.genCode(arg) for arg in node.args)
-        if node.name.lower() == "writeln":
-            self.needs_fmt_import = True
-            return f"fmt.Println({args})"
-        return f"{node.name}({args})"
-
-    def genFunctionCall(self, node) -> str:
-        args = ", ".join(self.genCode(arg) for arg in node.args)
-        return f"{node.name}({args})"
+        self.margin()
+        self.write("\n".join(decls))
+        self.write("\n")
+
+    def genArgs(self, args: list) -> None:
+        for index, arg in enumerate(args):
+            if index:
+                self.write(", ")
+            self.genExpression(arg)
+
+    def arg_parts(self, args: list) -> list:
+        parts = []
+        for arg in args:
+            parts.append(arg)
+            parts.append(", ")
+        if parts:
+            parts.pop()
+        return parts
+
+    @visits("statement", ProcedureCallNode)
+    def genProcedureCall(self, node) -> None:
+        name = node.name.lower()
+        if name == "writeln":
+            self.genWriteln(node.args)
+            return
+        if name in ("read", "readln"):
+            self.genRead(node.args, name == "readln")
+            return
+        self.margin()
+        self.write(node.name)
+        self.write("(")
+        self.genArgs(node.args)
+        self.write(");\n")
+
+    def genWriteln(self, args: list) -> None:
+        self.requires.add(OUTPUT)
+        for index, arg in enumerate(args):
+            if index:
+                self.margin()
+                self.write(f"{OUTPUT}.WriteByte(' ')\n")
+            self.margin()
+            if arg.__class__ is ValueNode and arg.value.type == STRING:
+                text = json.dumps(arg.value.value[1:-1], ensure_ascii=False)
+                self.write(f"{OUTPUT}.WriteString({text})\n")
+                continue
+            expr_type = getattr(arg, "expr_type", None)
+            package, prefix, suffix = (
+                WRITERS.get(expr_type, FALLBACK_WRITER)
+                if expr_type.__class__ is str
+                else FALLBACK_WRITER
+            )
+            if package is not None:
+                self.requires.add(package)
+            self.write(prefix)
+            self.genExpression(arg)
+            self.write(f"{suffix}\n")
+        self.margin()
+        self.write(f"{OUTPUT}.WriteByte('\\n')\n")
+
+    def genRead(self, args: list, skip_line: bool) -> None:
+        for arg in args:
+            expr_type = getattr(arg, "expr_type", None)
+            reader = (
+                READERS.get(expr_type) if expr_type.__class__ is str else None
+            )
+            self.margin()
+            if reader is None:
+                self.requires.update(("fmt", INPUT))
+                self.write(f"fmt.Fscan({INPUT}, &")
+                self.genExpression(arg)
+                self.write(")\n")
+                continue
+            self.requires.add(reader)
+            self.genExpression(arg)
+            self.write(f" = {reader}()\n")
+        if skip_line:
+            self.requires.add("_skipLine")
+            self.margin()
+            self.write("_skipLine()\n")
+
+    @visits("expression", FunctionCallNode)
+    def genFunctionCall(self, node) -> list:
+        return [node.name, "(", *self.arg_parts(node.args), ")"]
+
+    @visits("statement", BinOperatorNode)
+    def genAssignment(self, node) -> None:
+        if node.operator.type != ASSIGN:
+            self.genExpressionStatement(node)
+            return
+        self.margin()
+        target = node.leftNode
+        if (
+            self.current_function
+            and isinstance(target, ValueNode)
+            and target.value.value == self.current_function
+        ):
+            self.write("return ")
+        else:
+            self.genExpression(target)
+            self.write(" = ")
+        self.genExpression(node.rightNode)
+        self.write("\n")
 
-    def genBinOperator(self, node) -> str:
+    @visits("expression", BinOperatorNode)
+    def genBinOperator(self, node) -> list:
         op_key = node.operator.value.lower()
         op = TO_GO.get(op_key, node.operator.value)
-        left = self.genCode(node.leftNode)
-        right = self.genCode(node.rightNode)
-        if (
-            op_key == ":="
-            and self.current_function
-            and left == self.current_function
-        ):
-            return f"return {right}"
-        if self.needs_parens(node.leftNode, op_key, side="left"):
-            left = f"({left})"
-        if self.needs_parens(node.rightNode, op_key, side="right"):
-            right = f"({right})"
-        return f"{left} {op} {right}"
-
-    def genUnaryOperator(self, node) -> str:
+        left = node.leftNode
+        right = node.rightNode
+        parts = []
+        if self.needs_parens(left, op_key, side="left"):
+            parts += ["(", left, ")"]
+        else:
+            parts.append(left)
+        parts.append(f" {op} ")
+        if self.needs_parens(right, op_key, side="right"):
+            parts += ["(", right, ")"]
+        else:
+            parts.append(right)
+        return parts
+
+    @visits("expression", UnaryOperatorNode)
+    def genUnaryOperator(self, node) -> list:
         op_key = node.operator.value.lower()
         op = TO_GO.get(op_key, node.operator.value)
-        operand = self.genCode(node.operand)
         if isinstance(node.operand, (BinOperatorNode, UnaryOperatorNode)):
-            return f"{op}({operand})"
-        return f"{op}{operand}"
-
-    def genBlock(self, node, level) -> str:
-        code = "{\n"
-        for stmt in node.body:
-            code += self.genCode(stmt, level + 1) + "\n"
-        return code + MARGIN * level + "}"
-
-    def genIfStatement(self, node, level) -> str:
-        condition = self.genCode(node.condition, level)
-        code = MARGIN * level + f"if {condition} {{\n"
-        for stmt in node.then_block.body:
-            code += self.genCode(stmt, level + 1) + "\n"
-        code += MARGIN * level + "}"
+            return [op, "(", node.operand, ")"]
+        return [op, node.operand]
+
+    def genBody(self, statements: list) -> Iterator:
+        self.indent()
+        for stmt in statements:
+            task = self.statement(stmt)
+            if task is not None:
+                yield task
+        self.dedent()
+
+    @visits("statement", IfStatementNode)
+    def genIfStatement(self, node) -> Iterator:
+        self.margin()
+        self.write("if ")
+        self.genExpression(node.condition)
+        self.write(" {\n")
+        yield from self.genBody(node.then_block.body)
+        self.margin()
+        self.write("}")
 
         if node.else_block:
-            code += " else {\n"
-            for stmt in node.else_block.body:
-                code += self.genCode(stmt, level + 1) + "\n"
-            code += MARGIN * level + "}"
-        return code
-
-    def genWhileStatement(self, node, level) -> str:
-        condition = self.genCode(node.condition, level)
-        code = MARGIN * level + f"for {condition} {{\n"
-        for stmt in node.body.body:
-            code += self.genCode(stmt, level + 1) + "\n"
-        return code + MARGIN * level + "}"
-
-    def genDoWhileStatement(self, node, level) -> str:
-        indent = MARGIN * level
-        code = indent + "for {\n"
-        for stmt in node.body.body:
-            code += self.genCode(stmt, level + 1) + "\n"
-        condition = self.genCode(node.condition)
-        code += indent + f"\tif !({condition}) {{ break }}\n"
-        code += indent + "}"
-        return code
-
-    def genRepeatUntilStatement(self, node, level) -> str:
-        indent = MARGIN * level
-        code = indent + "for {\n"
-        for stmt in node.body.body:
-            code += self.genCode(stmt, level + 1) + "\n"
-        condition = self.genCode(node.condition)
-        code += indent + f"\tif {condition} {{ break }}\n"
-        code += indent + "}"
-        return code
-
-    def genCaseStatement(self, node, level) -> str:
-        expr = self.genCode(node.expression)
-        indent = MARGIN * level
-        code = indent + f"switch {expr} {{\n"
+            self.write(" else {\n")
+            yield from self.genBody(node.else_block.body)
+            self.margin()
+            self.write("}")
+        self.write("\n")
+
+    @visits("statement", WhileStatementNode)
+    def genWhileStatement(self, node) -> Iterator:
+        self.margin()
+        self.write("for ")
+        self.genExpression(node.condition)
+        self.write(" {\n")
+        yield from self.genBody(node.body.body)
+        self.margin()
+        self.write("}\n")
+
+    @visits("statement", DoWhileStatementNode)
+    def genDoWhileStatement(self, node) -> Iterator:
+        self.margin()
+        self.write("for {\n")
+        yield from self.genBody(node.body.body)
+        self.margin()
+        self.write("\tif !(")
+        self.genExpression(node.condition)
+        self.write(") { break }\n")
+        self.margin()
+        self.write("}\n")
+
+    @visits("statement", RepeatUntilStatementNode)
+    def genRepeatUntilStatement(self, node) -> Iterator:
+        self.margin()
+        self.write("for {\n")
+        yield from self.genBody(node.body.body)
+        self.margin()
+        self.write("\tif ")
+        self.genExpression(node.condition)
+        self.write(" { break }\n")
+        self.margin()
+        self.write("}\n")
+
+    @visits("statement", CaseStatementNode)
+    def genCaseStatement(self, node) -> Iterator:
+        self.margin()
+        self.write("switch ")
+        self.genExpression(node.expression)
+        self.write(" {\n")
         for labels, block in node.cases:
-            labels_code = ", ".join(self.genCode(label) for label in labels)
-            code += indent + f"case {labels_code}:\n"
-            for stmt in block.body:
-                code += self.genCode(stmt, level + 1) + "\n"
+            self.margin()
+            self.write("case ")
+            self.genArgs(labels)
+            self.write(":\n")
+            yield from self.genBody(block.body)
         if node.else_block:
-            code += indent + "default:\n"
-            for stmt in node.else_block.body:
-                code += self.genCode(stmt, level + 1) + "\n"
-        code += indent + "}"
-        return code
-
-    def genForStatement(self, node, level) -> str:
+            self.margin()
+            self.write("default:\n")
+            yield from self.genBody(node.else_block.body)
+        self.margin()
+        self.write("}\n")
+
+    @visits("statement", ForStatementNode)
+    def genForStatement(self, node) -> Iterator:
         var = node.var_token.value
-        start = self.genCode(node.start_expr)
-        end = self.genCode(node.end_expr)
-        indent = MARGIN * level
-
         if node.direction == "TO":
-            loop = f"for {var} := {start}; {var} <= {end}; {var}++ {{\n"
+            compare, step = "<=", "++"
         else:
-            loop = f"for {var} := {start}; {var} >= {end}; {var}-- {{\n"
+            compare, step = ">=", "--"
+        low = self.rebase_low(node)
+
+        self.margin()
+        stable = self.stable_bound(node)
+        if stable:
+            self.write(f"for {var} := ")
+            self.genBound(node.start_expr, low)
+            self.write(f"; {var} {compare} ")
+            self.genBound(node.end_expr, low)
+            self.write(f"; {var}{step} {{\n")
+        else:
+            self.loop_bounds += 1
+            bound = f"_end{self.loop_bounds}"
+            self.write(f"for {var}, {bound} := ")
+            self.genBound(node.start_expr, low)
+            self.write(", ")
+            self.genBound(node.end_expr, low)
+            self.write(f"; {var} {compare} {bound}; {var}{step} {{\n")
+        if low:
+            self.rebased[var] = low
+        yield from self.genBody(node.body.body)
+        if low:
+            del self.rebased[var]
+        if not stable:
+            self.loop_bounds -= 1
+        self.margin()
+        self.write("}\n")
+
+    def genBound(self, node, low: int) -> None:
+        if not low:
+            self.genExpression(node)
+            return
+        value = node
+        negate = (
+            node.__class__ is UnaryOperatorNode
+            and node.operator.value == "-"
+        )
+        if negate:
+            value = node.operand
+        if value.__class__ is ValueNode and value.value.type == NUMBER:
+            number = int(value.value.value)
+            self.write(str((-number if negate else number) - low))
+            return
+        if isinstance(node, (BinOperatorNode, UnaryOperatorNode)):
+            self.write("(")
+            self.genExpression(node)
+            self.write(")")
+        else:
+            self.genExpression(node)
+        self.write(f" - {low}" if low > 0 else f" + {-low}")
 
-        code = indent + loop
-        for stmt in node.body.body:
-            code += self.genCode(stmt, level + 1) + "\n"
-        code += indent + "}"
-        return code
+    def rebase_low(self, node) -> int:
+        if not self.rebase_loops:
+            return 0
+        var = node.var_token.value
+        lows = set()
+        uses = 0
+        pending = list(node.body.body)
+        while pending:
+            item = pending.pop()
+            kind = item.__class__
+            if kind is ValueNode:
+                if item.value.type == IDENTIFIER and item.value.value == var:
+                    uses += 1
+            elif kind is ArrayAccessNode:
+                index = item.index
+                if (
+                    index.__class__ is ValueNode
+                    and index.value.value == var
+                ):
+                    lows.add(self.array_symbol(item).low)
+                    uses -= 1
+            elif kind is ForStatementNode and item.var_token.value == var:
+                return 0
+            pending.extend(node_children(item))
+        if uses or len(lows) != 1:
+            return 0
+        return lows.pop() or 0
+
+    def stable_bound(self, node) -> bool:
+        end = node.end_expr
+        if (
+            end.__class__ is UnaryOperatorNode
+            and end.operator.value == "-"
+        ):
+            end = end.operand
+        if end.__class__ is not ValueNode:
+            return False
+        if end.value.type == NUMBER:
+            return True
+        symbol = end.symbol
+        return (
+            symbol is not None
+            and symbol.depth > 0
+            and node.assigned is not None
+            and end.value.value not in node.assigned
+        )
 
-    def genCode(self, node, level=0) -> str:
-        if isinstance(node, VarDeclarationNode):
-            return MARGIN * level + self.genVarDeclaration(node).strip()
-        if isinstance(node, BinOperatorNode):
-            return MARGIN * level + self.genBinOperator(node)
-        if isinstance(node, ProcedureCallNode):
-            return MARGIN * level + self.genProcedureCall(node) + ";"
-        if isinstance(node, ValueNode):
-            return node.value.value
-        if isinstance(node, UnaryOperatorNode):
-            return MARGIN * level + self.genUnaryOperator(node)
-        if isinstance(node, FunctionCallNode):
-            return self.genFunctionCall(node)
-        if isinstance(node, ArrayAccessNode):
-            return self.genArrayAccess(node)
-        if isinstance(node, IfStatementNode):
-            return self.genIfStatement(node, level)
-        if isinstance(node, WhileStatementNode):
-            return self.genWhileStatement(node, level)
-        if isinstance(node, ForStatementNode):
-            return self.genForStatement(node, level)
-        if isinstance(node, DoWhileStatementNode):
-            return self.genDoWhileStatement(node, level)
-        if isinstance(node, RepeatUntilStatementNode):
-            return self.genRepeatUntilStatement(node, level)
-        if isinstance(node, CaseStatementNode):
-            return self.genCaseStatement(node, level)
-        return ""
+    def genCode(self, node) -> None:
+        self.run(self.statement(node))
+
+    def statement(self, node):
+        handler = self.dispatch["statement"][node.__class__]
+        if handler is None:
+            return self.genExpressionStatement(node)
+        return handler(self, node)
+
+    def genExpressionStatement(self, node) -> None:
+        self.margin()
+        self.genExpression(node)
+        self.write("\n")
+
+    @visits("expression", ValueNode)
+    def genValue(self, node) -> None:
+        self.write(node.value.value)
+
+    def genExpression(self, node) -> None:
+        table = self.dispatch["expression"]
+        pending = [node]
+        while pending:
+            item = pending.pop()
+            if item.__class__ is str:
+                self.chunks.append(item)
+                continue
+            handler = table[item.__class__]
+            if handler is not None:
+                parts = handler(self, item)
+                if parts:
+                    parts.reverse()
+                    pending += parts
 
     def generate(self, root) -> str:
-        self.output = "package main\n\n"
-        import_line = ""
+        self.begin()
 
         if isinstance(root, ProgramNode):
-            self.array_scopes = [{}]
-            if root.declarations:
-                for name, type_ in root.declarations:
-                    if (
-                        isinstance(type_, dict)
-                        and type_.get("kind") == "array"
-                    ):
-                        self.register_array(name, type_["low"])
-                self.output += (
-                    "\n".join(
-                        f"var {name} {self.format_type(type_)}"
-                        for name, type_ in root.declarations
-                    )
-                    + "\n\n"
-                )
-
+            self.genGlobals(root.declarations)
             for routine in root.routines:
-                self.output += self.genRoutine(routine) + "\n\n"
-
-            self.output += "func main() {\n"
-            self.push_scope()
-            for stmt in root.main_block.body:
-                self.output += self.genCode(stmt, 1) + "\n"
-            self.pop_scope()
-            self.output += "}"
+                self.run(self.genRoutine(routine))
+                self.write("\n\n")
+            self.genMain(root.main_block)
         else:
-            self.output += "func main() {\n"
-            for node in root.codeStrings:
-                self.output += self.genCode(node, 1) + "\n"
-            self.output += "}"
-
-        if self.needs_fmt_import:
-            import_line = 'import "fmt"\n\n'
-        self.output = (
-            "package main\n\n" + import_line + self.output.split("\n\n", 1)[1]
-        )
+            self.genMainHeader()
+            self.run(self.genBody(root.codeStrings))
+            self.write("}")
+
+        return self.finish()
+
+    def begin(self) -> None:
+        self.chunks = ["package main\n\n", ""]
+        self.indents = [""]
+        self.flush_chunk = None
+
+    def finish(self) -> str:
+        imports, helpers = resolve(self.requires)
+        header = ""
+        if len(imports) == 1:
+            header = f'import "{imports[0]}"\n\n'
+        elif imports:
+            header = "import (\n" + "".join(
+                f'{MARGIN}"{package}"\n' for package in imports
+            ) + ")\n\n"
+        header += "".join(f"{source}\n" for source in helpers)
+        if OUTPUT in self.requires and self.flush_chunk is not None:
+            self.chunks[self.flush_chunk] = f"{MARGIN}defer {OUTPUT}.Flush()\n"
+        self.chunks[1] = header
+        self.output = "".join(self.chunks)
+        self.chunks = []
         return self.output
 
-    def genRoutine(self, node) -> str:
-        if isinstance(node, FunctionDeclNode):
-            return self.genFunctionDecl(node)
-        if isinstance(node, ProcedureDeclNode):
-            return self.genProcedureDecl(node)
-        return ""
+    def genGlobals(self, declarations: list) -> None:
+        if not declarations:
+            return
+        for name, type_ in declarations:
+            self.write(f"var {name} {self.format_type(type_)}\n")
+        self.write("\n")
+
+    def genMain(self, block) -> None:
+        self.genMainHeader()
+        self.run(self.genBody(block.body))
+        self.write("}")
+
+    def genMainHeader(self) -> None:
+        self.write("func main() {\n")
+        self.flush_chunk = len(self.chunks)
+        self.write("")
+
+    def render_routine(self, node) -> tuple:
+        start = len(self.chunks)
+        requires = self.requires
+        self.requires = set()
+        self.run(self.genRoutine(node))
+        used = frozenset(self.requires)
+        self.requires = requires | used
+        return "".join(self.chunks[start:]), used
+
+    def genRoutine(self, node):
+        handler = self.dispatch["routine"][node.__class__]
+        if handler is not None:
+            return handler(self, node)
+        return None
+
+    def genRoutineBody(self, node, function_name) -> Iterator:
+        for name, type_ in node.local_decls:
+            self.write(f"{MARGIN}var {name} {self.format_type(type_)}\n")
+        prev_function = self.current_function
+        self.current_function = function_name
+        yield from self.genBody(node.body.body)
+        self.current_function = prev_function
+        self.write("}")
 
-    def genFunctionDecl(self, node) -> str:
+    @visits("routine", FunctionDeclNode)
+    def genFunctionDecl(self, node) -> Iterator:
         params = ", ".join(
             f"{name} {TO_GO.get(type_, type_)}"
             for name, type_ in node.params
         )
         ret_type = TO_GO.get(node.return_type, node.return_type)
-        code = f"func {node.name}({params}) {ret_type} {{\n"
-        self.push_scope()
-        if node.local_decls:
-            for name, type_ in node.local_decls:
-                if isinstance(type_, dict) and type_.get("kind") == "array":
-                    self.register_array(name, type_["low"])
-                code += MARGIN + f"var {name} {self.format_type(type_)}\n"
-        prev_function = self.current_function
-        self.current_function = node.name
-        for stmt in node.body.body:
-            code += self.genCode(stmt, 1) + "\n"
-        self.current_function = prev_function
-        self.pop_scope()
-        code += "}"
-        return code
+        self.write(f"func {node.name}({params}) {ret_type} {{\n")
+        yield from self.genRoutineBody(node, node.name)
 
-    def genProcedureDecl(self, node) -> str:
+    @visits("routine", ProcedureDeclNode)
+    def genProcedureDecl(self, node) -> Iterator:
         params = ", ".join(
             f"{name} {TO_GO.get(type_, type_)}"
             for name, type_ in node.params
         )
-        code = f"func {node.name}({params}) {{\n"
-        self.push_scope()
-        if node.local_decls:
-            for name, type_ in node.local_decls:
-                if isinstance(type_, dict) and type_.get("kind") == "array":
-                    self.register_array(name, type_["low"])
-                code += MARGIN + f"var {name} {self.format_type(type_)}\n"
-        prev_function = self.current_function
-        self.current_function = None
-        for stmt in node.body.body:
-            code += self.genCode(stmt, 1) + "\n"
-        self.current_function = prev_function
-        self.pop_scope()
-        code += "}"
-        return code
+        self.write(f"func {node.name}({params}) {{\n")
+        yield from self.genRoutineBody(node, None)
+
+    @visits("expression", ArrayAccessNode)
+    def genArrayAccess(self, node) -> list:
+        symbol = self.array_symbol(node)
+        if not symbol.low:
+            return [node.name, "[", node.index, "]"]
+        index = node.index
+        if (
+            index.__class__ is ValueNode
+            and self.rebased.get(index.value.value) == symbol.low
+        ):
+            return [node.name, "[", index, "]"]
+        return [node.name, "[(", node.index, f") - {symbol.low}]"]
 
-    def genArrayAccess(self, node) -> str:
-        index = self.genCode(node.index)
-        low = self.lookup_array_low(node.name)
-        if low is None or low == 0:
-            return f"{node.name}[{index}]"
-        return f"{node.name}[({index}) - {low}]"
+    def array_symbol(self, node):
+        if node.symbol is None:
+            raise RuntimeError(
+                f"Массив {node.name} не связан с объявлением: "
+                "кодогенерация требует семантического анализа"
+            )
+        return node.symbol
 
     def get_prec(self, node) -> int:
         if isinstance(node, UnaryOperatorNode):
-            return 6
+            return UNARY_PRECEDENCE
         if isinstance(node, BinOperatorNode):
             return self.prec.get(node.operator.value.lower(), 0)
         return 100
@@ -356,7 +578,7 @@ class CodeGenerator:
         if (
             child_prec == parent_prec
             and side == "right"
-            and parent_op in ["-", "/", "div", "mod"]
+            and parent_op in NON_ASSOCIATIVE
         ):
             return True
         return False
@@ -0,0 +1,142 @@
+RUNTIME = {
+    "_out": (
+        ("bufio", "os"),
+        "var _out = bufio.NewWriter(os.Stdout)\n",
+    ),
+    "_in": (
+        ("bufio", "os"),
+        "var _in = bufio.NewReaderSize(os.Stdin, 1<<16)\n",
+    ),
+    "_skipSpace": (
+        ("_in",),
+        """func _skipSpace() byte {
+\tc, err := _in.ReadByte()
+\tfor err == nil && (c == ' ' || c == '\\n' || c == '\\r' || c == '\\t') {
+\t\tc, err = _in.ReadByte()
+\t}
+\tif err != nil {
+\t\treturn 0
+\t}
+\treturn c
+}
+""",
+    ),
+    "_readInt": (
+        ("_in", "_skipSpace"),
+        """func _readInt() int {
+\tc := _skipSpace()
+\tneg := c == '-'
+\tif neg || c == '+' {
+\t\tc, _ = _in.ReadByte()
+\t}
+\tn := 0
+\tfor '0' <= c && c <= '9' {
+\t\tn = n*10 + int(c-'0')
+\t\tvar err error
+\t\tif c, err = _in.ReadByte(); err != nil {
+\t\t\tc = 0
+\t\t\tbreak
+\t\t}
+\t}
+\tif c != 0 {
+\t\t_in.UnreadByte()
+\t}
+\tif neg {
+\t\treturn -n
+\t}
+\treturn n
+}
+""",
+    ),
+    "_readReal": (
+        ("_in", "_skipSpace", "strconv"),
+        """func _readReal() float64 {
+\tvar token [64]byte
+\ttext := token[:0]
+\tc := _skipSpace()
+\tfor '0' <= c && c <= '9' || c == '.' || c == 'e' || c == 'E' ||
+\t\tc == '+' || c == '-' {
+\t\ttext = append(text, c)
+\t\tvar err error
+\t\tif c, err = _in.ReadByte(); err != nil {
+\t\t\tc = 0
+\t\t}
+\t}
+\tif c != 0 {
+\t\t_in.UnreadByte()
+\t}
+\tvalue, _ := strconv.ParseFloat(string(text), 64)
+\treturn value
+}
+""",
+    ),
+    "_readChar": (
+        ("_in",),
+        """func _readChar() rune {
+\tr, _, err := _in.ReadRune()
+\tif err != nil {
+\t\treturn 0
+\t}
+\treturn r
+}
+""",
+    ),
+    "_readString": (
+        ("_in",),
+        """func _readString() string {
+\tvar text []byte
+\tfor {
+\t\tline, err := _in.ReadSlice('\\n')
+\t\tif err == nil {
+\t\t\t_in.UnreadByte()
+\t\t\tline = line[:len(line)-1]
+\t\t}
+\t\ttext = append(text, line...)
+\t\tif err != bufio.ErrBufferFull {
+\t\t\tbreak
+\t\t}
+\t}
+\tif n := len(text); n > 0 && text[n-1] == '\\r' {
+\t\ttext = text[:n-1]
+\t}
+\treturn string(text)
+}
+""",
+    ),
+    "_skipLine": (
+        ("_in",),
+        """func _skipLine() {
+\tfor {
+\t\t_, err := _in.ReadSlice('\\n')
+\t\tif err != bufio.ErrBufferFull {
+\t\t\treturn
+\t\t}
+\t}
+}
+""",
+    ),
+}
+
+READERS = {
+    "integer": "_readInt",
+    "real": "_readReal",
+    "char": "_readChar",
+    "string": "_readString",
+}
+
+
+def resolve(requires: set) -> tuple:
+    needed = set()
+    pending = list(requires)
+    while pending:
+        name = pending.pop()
+        if name in needed:
+            continue
+        needed.add(name)
+        if name in RUNTIME:
+            pending.extend(RUNTIME[name][0])
+    packages = sorted(name for name in needed if name not in RUNTIME)
+    helpers = [
+        source for name, (_, source) in RUNTIME.items() if name in needed
+    ]
+    return packages, helpers
@@ -0,0 +1,209 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+
+import lexer
+import metrics
+import pipeline
+from lexer import BEGIN, CASE, END, FUNCTION, PROCEDURE, SEMICOLON
+from nodes import ExpressionNode, FunctionCallNode, ProcedureCallNode
+
+ROUTINE_START = frozenset((FUNCTION, PROCEDURE))
+BLOCK_OPEN = frozenset((BEGIN, CASE))
+# Errors in the source itself; the full translator reports them as
+# diagnostics. Anything else is a bug and must not be hidden.
+SOURCE_ERRORS = (
+    SyntaxError,
+    NameError,
+    TypeError,
+    RecursionError,
+    UnicodeDecodeError,
+)
+
+
+class RoutineEntry(NamedTuple):
+    node: ExpressionNode
+    globals_key: str
+    callees: tuple
+    code: str
+    requires: frozenset
+
+
+def split_routines(tokens: list) -> Optional[tuple]:
+    index = 0
+    while index < len(tokens) and tokens[index].type not in ROUTINE_START:
+        if tokens[index].type in BLOCK_OPEN:
+            return tokens, [], []
+        index += 1
+    head = tokens[:index]
+    spans = []
+    while index < len(tokens) and tokens[index].type in ROUTINE_START:
+        start = index
+        depth = 0
+        while index < len(tokens):
+            kind = tokens[index].type
+            index += 1
+            if kind in BLOCK_OPEN:
+                depth += 1
+            elif kind == END:
+                depth -= 1
+                if depth == 0:
+                    break
+        if depth or index >= len(tokens):
+            return None
+        if tokens[index].type != SEMICOLON:
+            return None
+        index += 1
+        spans.append(tokens[start:index])
+    return head, spans, tokens[index:]
+
+
+def span_key(tokens: list) -> str:
+    text = "\x1f".join(
+        [f"{int(token.type)}\x1e{token.value}" for token in tokens]
+    )
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def called_names(node: ExpressionNode) -> list:
+    names = set()
+    pending = [node]
+    while pending:
+        item = pending.pop()
+        if isinstance(item, (FunctionCallNode, ProcedureCallNode)):
+            names.add(item.name)
+        pending.extend(metrics.node_children(item))
+    return sorted(names)
+
+
+def require_clean(analyzer) -> None:
+    if analyzer.errors:
+        raise SyntaxError("Найдены ошибки, нужна полная трансляция")
+
+
+def signatures(checker, names) -> tuple:
+    return tuple((name, checker.signature(name)) for name in names)
+
+
+class IncrementalTranslator:
+    def __init__(
+        self,
+        translator: pipeline.Translator = None,
+        max_entries: int = 4096,
+    ) -> None:
+        self.translator = translator or pipeline.Translator()
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.reused = 0
+        self.translated = 0
+        self.fallbacks = 0
+        self.lock = threading.Lock()
+
+    def translate(self, source: str) -> pipeline.Result:
+        try:
+            layout = split_routines(list(lexer.iter_tokens(source)))
+            if layout is not None:
+                return pipeline.Result(self.translate_layout(*layout), [])
+        except SOURCE_ERRORS:
+            pass
+        with self.lock:
+            self.fallbacks += 1
+        return self.translator.translate(source)
+
+    def translate_layout(self, head: list, spans: list, tail: list) -> str:
+        parser, checker, generator, optimizer = self.translator.passes()
+        try:
+            parser.reset(head + tail)
+            root = parser.parse_program()
+            require_clean(parser)
+            globals_key = span_key(head)
+
+            keys = [span_key(span) for span in spans]
+            entries = []
+            with self.lock:
+                for key in keys:
+                    entry = self.entries.get(key)
+                    if entry and entry.globals_key != globals_key:
+                        entry = None
+                    entries.append(entry)
+            root.routines = [
+                self.parse_routine(parser, span) if entry is None
+                else entry.node
+                for span, entry in zip(spans, entries)
+            ]
+        finally:
+            parser.reset(())
+
+        checker.reset()
+        checker.declare_globals(root.declarations)
+        checker.register_routines(root.routines)
+        fresh = {}
+        for index, entry in enumerate(entries):
+            if entry is not None and entry.callees == signatures(
+                checker, [name for name, _ in entry.callees]
+            ):
+                continue
+            if entry is not None:
+                try:
+                    node = self.parse_routine(parser, spans[index])
+                finally:
+                    parser.reset(())
+                root.routines[index] = node
+            node = root.routines[index]
+            checker.check_node(node)
+            fresh[index] = signatures(checker, called_names(node))
+        checker.run(checker.check_block(root.main_block))
+        require_clean(checker)
+        if self.translator.optimize:
+            optimizer.reset()
+            for index in fresh:
+                optimizer.optimize_routine(root.routines[index])
+            optimizer.run(optimizer.optimize_block(root.main_block))
+
+        generator.reset()
+        generator.begin()
+        generator.genGlobals(root.declarations)
+        rendered = {}
+        for index, node in enumerate(root.routines):
+            if index in fresh:
+                code, requires = generator.render_routine(node)
+                rendered[keys[index]] = RoutineEntry(
+                    node, globals_key, fresh[index], code, requires
+                )
+            else:
+                generator.write(entries[index].code)
+                generator.requires |= entries[index].requires
+            generator.write("\n\n")
+        generator.genMain(root.main_block)
+        output = generator.finish()
+
+        with self.lock:
+            self.reused += len(spans) - len(fresh)
+            self.translated += len(fresh)
+            for key, entry in rendered.items():
+                self.entries[key] = entry
+                self.entries.move_to_end(key)
+            for key in keys:
+                if key in self.entries:
+                    self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        return output
+
+    def parse_routine(self, parser, span: list) -> ExpressionNode:
+        parser.reset(span)
+        node = parser.parse_routine_declaration()
+        require_clean(parser)
+        if parser.current_token is not None:
+            raise SyntaxError("Подпрограмма не совпала с её токенами")
+        return node
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                "entries": len(self.entries),
+                "reused": self.reused,
+                "translated": self.translated,
+                "fallbacks": self.fallbacks,
+            }
@@ -1,43 +1,250 @@
+import mmap
+import os
 import re
-from typing import NamedTuple
+from bisect import bisect_right
+from enum import IntEnum
+from typing import Iterator, NamedTuple
+
+WORDS = (
+    "program",
+    "var",
+    "function",
+    "procedure",
+    "integer",
+    "real",
+    "boolean",
+    "char",
+    "string",
+    "begin",
+    "end",
+    "if",
+    "then",
+    "else",
+    "while",
+    "do",
+    "repeat",
+    "until",
+    "for",
+    "to",
+    "downto",
+    "switch",
+    "case",
+    "default",
+    "writeln",
+    "read",
+    "readln",
+    "not",
+    "array",
+    "of",
+)
+
+
+# Group names of TOKEN_SPECIFICATION, then the kinds the lexer produces
+# from words and literals in WORDS order.
+class TokenKind(IntEnum):
+    ASSIGN = 1
+    COLON = 2
+    SEMICOLON = 3
+    COMMA = 4
+    LPAR = 5
+    RPAR = 6
+    LBRACKET = 7
+    RBRACKET = 8
+    COMMENT1 = 9
+    COMMENT2 = 10
+    OPERATOR = 11
+    RANGE = 12
+    NUMBER = 13
+    CHAR_LIT = 14
+    STRING_LIT = 15
+    IDENTIFIER = 16
+    SKIP = 17
+    DOT = 18
+    MISMATCH = 19
+    BOOL_LIT = 20
+    PROGRAM = 21
+    VAR = 22
+    FUNCTION = 23
+    PROCEDURE = 24
+    INTEGER = 25
+    REAL = 26
+    BOOLEAN = 27
+    CHAR = 28
+    STRING = 29
+    BEGIN = 30
+    END = 31
+    IF = 32
+    THEN = 33
+    ELSE = 34
+    WHILE = 35
+    DO = 36
+    REPEAT = 37
+    UNTIL = 38
+    FOR = 39
+    TO = 40
+    DOWNTO = 41
+    SWITCH = 42
+    CASE = 43
+    DEFAULT = 44
+    WRITELN = 45
+    READ = 46
+    READLN = 47
+    NOT = 48
+    ARRAY = 49
+    OF = 50
+
+    def __str__(self) -> str:
+        return self.name
+
+    def __format__(self, spec: str) -> str:
+        return format(self.name, spec)
+
+
+ASSIGN = TokenKind.ASSIGN
+COLON = TokenKind.COLON
+SEMICOLON = TokenKind.SEMICOLON
+COMMA = TokenKind.COMMA
+LPAR = TokenKind.LPAR
+RPAR = TokenKind.RPAR
+LBRACKET = TokenKind.LBRACKET
+RBRACKET = TokenKind.RBRACKET
+COMMENT1 = TokenKind.COMMENT1
+COMMENT2 = TokenKind.COMMENT2
+OPERATOR = TokenKind.OPERATOR
+RANGE = TokenKind.RANGE
+NUMBER = TokenKind.NUMBER
+CHAR_LIT = TokenKind.CHAR_LIT
+STRING_LIT = TokenKind.STRING_LIT
+IDENTIFIER = TokenKind.IDENTIFIER
+SKIP = TokenKind.SKIP
+DOT = TokenKind.DOT
+MISMATCH = TokenKind.MISMATCH
+BOOL_LIT = TokenKind.BOOL_LIT
+PROGRAM = TokenKind.PROGRAM
+VAR = TokenKind.VAR
+FUNCTION = TokenKind.FUNCTION
+PROCEDURE = TokenKind.PROCEDURE
+INTEGER = TokenKind.INTEGER
+REAL = TokenKind.REAL
+BOOLEAN = TokenKind.BOOLEAN
+CHAR = TokenKind.CHAR
+STRING = TokenKind.STRING
+BEGIN = TokenKind.BEGIN
+END = TokenKind.END
+IF = TokenKind.IF
+THEN = TokenKind.THEN
+ELSE = TokenKind.ELSE
+WHILE = TokenKind.WHILE
+DO = TokenKind.DO
+REPEAT = TokenKind.REPEAT
+UNTIL = TokenKind.UNTIL
+FOR = TokenKind.FOR
+TO = TokenKind.TO
+DOWNTO = TokenKind.DOWNTO
+SWITCH = TokenKind.SWITCH
+CASE = TokenKind.CASE
+DEFAULT = TokenKind.DEFAULT
+WRITELN = TokenKind.WRITELN
+READ = TokenKind.READ
+READLN = TokenKind.READLN
+NOT = TokenKind.NOT
+ARRAY = TokenKind.ARRAY
+OF = TokenKind.OF
+
+
+NEWLINE = re.compile("\n")
+
+
+class LineIndex:
+    def __init__(self, text: str) -> None:
+        self.text = text
+        self.starts = None
+
+    def scan(self) -> list:
+        if self.starts is None:
+            self.starts = [0]
+            self.starts.extend(
+                match.end() for match in NEWLINE.finditer(self.text)
+            )
+        return self.starts
+
+    def position(self, offset: int) -> tuple:
+        starts = self.scan()
+        line = bisect_right(starts, offset)
+        return line, offset - starts[line - 1]
+
+    def line_text(self, line: int) -> str:
+        starts = self.scan()
+        end = starts[line] if line < len(starts) else len(self.text)
+        return self.text[starts[line - 1]:end].rstrip("\r\n")
+
+    def snippet(self, line: int, column: int) -> str:
+        starts = self.scan()
+        if not 0 < line <= len(starts):
+            return ""
+        text = self.line_text(line)
+        pad = "".join("\t" if char == "\t" else " " for char in text[:column])
+        number = str(line)
+        return (
+            f"{number} | {text}\n"
+            f"{' ' * len(number)} | {pad}^"
+        )
+
+
+class FileLineIndex(LineIndex):
+    def __init__(self, path: str) -> None:
+        super().__init__(None)
+        self.path = path
+        self.starts = [0]
+        self.byte_starts = [0]
+
+    def add_line(self, start: int, byte_start: int) -> None:
+        self.starts.append(start)
+        self.byte_starts.append(byte_start)
+
+    def line_text(self, line: int) -> str:
+        with open(self.path, "rb") as source:
+            source.seek(self.byte_starts[line - 1])
+            text = source.readline()
+        return text.decode("utf-8", "replace").rstrip("\r\n")
 
 
 class Token(NamedTuple):
-    type: str
+    type: TokenKind
     value: str
-    line: int
-    column: int
+    offset: int
+    index: LineIndex = None
+
+    @property
+    def position(self) -> tuple:
+        if self.index is None:
+            return 0, self.offset
+        return self.index.position(self.offset)
+
+    @property
+    def line(self) -> int:
+        return self.position[0]
 
+    @property
+    def column(self) -> int:
+        return self.position[1]
+
+
+KEYWORDS = {word: TokenKind[word.upper()] for word in WORDS}
+
+# Word operators and boolean literals also require a word boundary before
+# them, so "1and" lexes as NUMBER followed by IDENTIFIER.
+BOUNDED_WORDS = {
+    "and": OPERATOR,
+    "or": OPERATOR,
+    "xor": OPERATOR,
+    "div": OPERATOR,
+    "mod": OPERATOR,
+    "true": BOOL_LIT,
+    "false": BOOL_LIT,
+}
 
 TOKEN_SPECIFICATION = [
-    ("PROGRAM", r"program\b"),
-    ("VAR", r"var\b"),
-    ("FUNCTION", r"function\b"),
-    ("PROCEDURE", r"procedure\b"),
-    ("INTEGER", r"integer\b"),
-    ("REAL", r"real\b"),
-    ("BOOLEAN", r"boolean\b"),
-    ("CHAR", r"char\b"),
-    ("STRING", r"string\b"),
-    ("BEGIN", r"begin\b"),
-    ("END", r"end\b"),
-    ("IF", r"if\b"),
-    ("THEN", r"then\b"),
-    ("ELSE", r"else\b"),
-    ("WHILE", r"while\b"),
-    ("DO", r"do\b"),
-    ("REPEAT", r"repeat\b"),
-    ("UNTIL", r"until\b"),
-    ("FOR", r"for\b"),
-    ("TO", r"to\b"),
-    ("DOWNTO", r"downto\b"),
-    ("SWITCH", r"switch\b"),
-    ("CASE", r"case\b"),
-    ("DEFAULT", r"default\b"),
-    ("WRITELN", r"writeln\b"),
-    ("NOT", r"not\b"),
-    ("ARRAY", r"array\b"),
-    ("OF", r"of\b"),
     ("ASSIGN", r":="),
     ("COLON", r":"),
     ("SEMICOLON", r";"),
@@ -48,16 +255,9 @@ TOKEN_SPECIFICATION = [
     ("RBRACKET", r"\]"),
     ("COMMENT1", r"//.*"),
     ("COMMENT2", r"\{[^}]*\}"),
-    (
-        "OPERATOR",
-        (
-            r"(\+|\-|\*|/|==|!=|<=|>=|<>|<|>|="
-            r"|\band\b|\bor\b|\bxor\b|\bdiv\b|\bmod\b)"
-        ),
-    ),
+    ("OPERATOR", r"\+|\-|\*|/|==|!=|<=|>=|<>|<|>|="),
     ("RANGE", r"\.\."),
     ("NUMBER", r"-?\d+(\.\d+)?"),
-    ("BOOL_LIT", r"\btrue\b|\bfalse\b"),
     ("CHAR_LIT", r"'(.)'"),
     ("STRING_LIT", r"'[^']*'"),
     ("IDENTIFIER", r"[a-zA-Z_][a-zA-Z0-9_]*"),
@@ -66,49 +266,293 @@ TOKEN_SPECIFICATION = [
     ("MISMATCH", r"."),
 ]
 
-GO_RESERVED_WORDS = {"package", "import", "func"}
+TOKEN_REGEX = re.compile(
+    "|".join(
+        f"(?P<{token_type}>{pattern})"
+        for token_type, pattern in TOKEN_SPECIFICATION
+    ),
+    re.IGNORECASE,
+)
 
+GROUP_KINDS = [None] * (TOKEN_REGEX.groups + 1)
+for token_type, group in TOKEN_REGEX.groupindex.items():
+    GROUP_KINDS[group] = TokenKind[token_type]
 
-def tokenize(code: str) -> list[Token]:
-    tokens = []
-    tok_regex = "|".join(
-        f"(?P<{token_type}>{pattern})"
+# The file lexer matches UTF-8 bytes, so a character literal may span
+# several bytes there.
+FILE_TOKEN_REGEX = re.compile(
+    b"|".join(
+        b"(?P<%s>%s)" % (
+            token_type.encode("ascii"),
+            rb"'([\xc0-\xff][\x80-\xbf]+|.)'" if token_type == "CHAR_LIT"
+            else pattern.encode("ascii"),
+        )
         for token_type, pattern in TOKEN_SPECIFICATION
+    ),
+    re.IGNORECASE,
+)
+
+FILE_GROUP_KINDS = [None] * (FILE_TOKEN_REGEX.groups + 1)
+for token_type, group in FILE_TOKEN_REGEX.groupindex.items():
+    FILE_GROUP_KINDS[group] = TokenKind[token_type]
+
+WORD_CHAR = re.compile(r"\w")
+
+# Any non-ASCII byte may start a word character; word_char_at decodes it.
+FILE_WORD_CHAR = re.compile(rb"[\w\x80-\xff]")
+HIGH_BYTE = re.compile(rb"[\x80-\xff]")
+
+SKIPPED = frozenset((SKIP, COMMENT1, COMMENT2))
+# Kinds whose str pattern also takes non-ASCII characters (\d, \s and
+# letters folded by re.IGNORECASE) while the bytes pattern does not.
+UNICODE_KINDS = frozenset((SKIP, NUMBER, IDENTIFIER))
+# Kinds whose text may span lines or hold non-ASCII characters.
+MULTILINE_KINDS = frozenset((SKIP, COMMENT2, STRING_LIT))
+TEXT_KINDS = frozenset((COMMENT1, COMMENT2, CHAR_LIT, STRING_LIT))
+
+# re.IGNORECASE also matches these letters against ASCII ones.
+ASCII_FOLD = str.maketrans(
+    {"\u0130": "i", "\u0131": "i", "\u212a": "k", "\u017f": "s"}
+)
+
+GO_RESERVED_WORDS = {"package", "import", "func"}
+# Names the generated Go declares next to user identifiers.
+GENERATED_NAMES = frozenset((
+    "bufio",
+    "fmt",
+    "os",
+    "strconv",
+    "_out",
+    "_in",
+    "_skipspace",
+    "_readint",
+    "_readreal",
+    "_readchar",
+    "_readstring",
+    "_skipline",
+))
+LOOP_BOUND = re.compile(r"_end\d+", re.IGNORECASE)
+
+
+def located(err: Exception, position: tuple = None) -> Exception:
+    err.position = position
+    return err
+
+
+def reserved_error(value: str, line: int, column: int) -> NameError:
+    if value.lower() in GO_RESERVED_WORDS:
+        message = f"Использование зарезервированного слова Go: '{value}'"
+    else:
+        message = f"Имя '{value}' зарезервировано для сгенерированного кода Go"
+    return located(
+        NameError(f"{message} (строка {line}, колонка {column})"),
+        (line, column),
     )
-    line_num = 1
-    line_start = 0
 
-    for match in re.finditer(tok_regex, code, re.IGNORECASE):
-        kind = match.lastgroup
-        value = match.group()
-        column = match.start() - line_start
-
-        if kind in ["SKIP", "COMMENT1", "COMMENT2"]:
-            if "\n" in value:
-                line_num += value.count("\n")
-                line_start = match.end() - (
-                    len(value) - value.rfind("\n") - 1
-                )
+
+def is_reserved(value: str) -> bool:
+    folded = value.lower()
+    return (
+        folded in GO_RESERVED_WORDS
+        or folded in GENERATED_NAMES
+        or folded[0] == "_" and LOOP_BOUND.fullmatch(folded) is not None
+    )
+
+
+def fold_word(word: str) -> str:
+    if word.isascii():
+        return word.lower()
+    return word.translate(ASCII_FOLD).lower()
+
+
+def classify_word(code: str, start: int, end: int, word: str) -> TokenKind:
+    if end < len(code) and WORD_CHAR.match(code, end):
+        return IDENTIFIER
+    folded = fold_word(word)
+    kind = KEYWORDS.get(folded)
+    if kind is not None:
+        return kind
+    kind = BOUNDED_WORDS.get(folded)
+    if kind is not None and not (start and WORD_CHAR.match(code, start - 1)):
+        return kind
+    return IDENTIFIER
+
+
+def iter_tokens(
+    code: str, index: LineIndex = None, pos: int = 0
+) -> Iterator[Token]:
+    if index is None:
+        index = LineIndex(code)
+
+    for match in TOKEN_REGEX.finditer(code, pos):
+        kind = GROUP_KINDS[match.lastindex]
+
+        if kind in SKIPPED:
             continue
 
-        if kind == "MISMATCH":
-            raise SyntaxError(
-                f"Недопустимый символ '{value}' "
-                f"на строке {line_num}, колонка {column}"
+        value = match.group()
+        if kind == MISMATCH:
+            line, column = index.position(match.start())
+            raise located(
+                SyntaxError(
+                    f"Недопустимый символ '{value}' "
+                    f"на строке {line}, колонка {column}"
+                ),
+                (line, column),
             )
 
-        if kind == "STRING_LIT":
-            tokens.append(Token("STRING", value, line_num, column))
-        elif kind == "IDENTIFIER" and value.lower() in GO_RESERVED_WORDS:
-            raise NameError(
-                f"Использование зарезервированного слова Go: '{value}' "
-                f"(строка {line_num}, колонка {column})"
+        if kind == IDENTIFIER:
+            kind = classify_word(code, match.start(), match.end(), value)
+
+        if kind == STRING_LIT:
+            yield Token(STRING, value, match.start(), index)
+        elif kind == IDENTIFIER and is_reserved(value):
+            raise reserved_error(value, *index.position(match.start()))
+        else:
+            yield Token(kind, value, match.start(), index)
+
+
+def tokenize(code: str) -> list[Token]:
+    return list(iter_tokens(code))
+
+
+def char_at(data: bytes, pos: int) -> str:
+    return data[pos:pos + 4].decode("utf-8", "replace")[:1]
+
+
+def char_before(data: bytes, pos: int) -> str:
+    start = pos - 1
+    while start > 0 and pos - start < 4 and 0x80 <= data[start] < 0xC0:
+        start -= 1
+    return data[start:pos].decode("utf-8", "replace")[-1:]
+
+
+def word_char_at(data: bytes, pos: int) -> bool:
+    if FILE_WORD_CHAR.match(data, pos) is None:
+        return False
+    return data[pos] < 0x80 or bool(WORD_CHAR.match(char_at(data, pos)))
+
+
+def word_char_before(data: bytes, pos: int) -> bool:
+    if FILE_WORD_CHAR.match(data, pos - 1) is None:
+        return False
+    return data[pos - 1] < 0x80 or bool(
+        WORD_CHAR.match(char_before(data, pos))
+    )
+
+
+def classify_file_word(
+    data: bytes, start: int, end: int, word: str
+) -> TokenKind:
+    if end < len(data) and word_char_at(data, end):
+        return IDENTIFIER
+    folded = word.lower()
+    kind = KEYWORDS.get(folded)
+    if kind is not None:
+        return kind
+    kind = BOUNDED_WORDS.get(folded)
+    if kind is not None and not (start and word_char_before(data, start)):
+        return kind
+    return IDENTIFIER
+
+
+def next_high_byte(data: bytes, pos: int) -> int:
+    match = HIGH_BYTE.search(data, pos)
+    return match.start() if match else len(data)
+
+
+def iter_bytes_tokens(
+    data: bytes, index: FileLineIndex = None
+) -> Iterator[Token]:
+    if index is None:
+        index = FileLineIndex(None)
+    # Token offsets count characters; shift is the number of extra UTF-8
+    # bytes seen so far.
+    shift = 0
+    texts = {}
+    high = next_high_byte(data, 0)
+
+    for match in FILE_TOKEN_REGEX.finditer(data):
+        kind = FILE_GROUP_KINDS[match.lastindex]
+        raw = match.group()
+        start, end = match.span()
+        offset = start - shift
+
+        if end >= high:
+            if (
+                kind == MISMATCH and data[start] >= 0x80
+                or kind in UNICODE_KINDS and end == high
+            ):
+                yield from iter_decoded_tokens(data, start, offset, index)
+                return
+            if end > high:
+                high = next_high_byte(data, end)
+
+        if kind in MULTILINE_KINDS and b"\n" in raw:
+            ascii_raw = raw.isascii()
+            pos = raw.find(b"\n")
+            while pos != -1:
+                line_start = offset + pos + 1
+                if not ascii_raw:
+                    line_start = offset + len(
+                        raw[:pos + 1].decode("utf-8", "replace")
+                    )
+                index.add_line(line_start, start + pos + 1)
+                pos = raw.find(b"\n", pos + 1)
+        if kind in TEXT_KINDS and not raw.isascii():
+            shift += len(raw) - len(raw.decode("utf-8", "replace"))
+
+        if kind in SKIPPED:
+            continue
+
+        if kind == MISMATCH:
+            line, column = index.position(offset)
+            raise located(
+                SyntaxError(
+                    f"Недопустимый символ '{char_at(data, start)}' "
+                    f"на строке {line}, колонка {column}"
+                ),
+                (line, column),
             )
+
+        value = texts.get(raw)
+        if value is None:
+            value = raw.decode("utf-8")
+            if kind != STRING_LIT:
+                texts[raw] = value
+        if kind == IDENTIFIER:
+            kind = classify_file_word(data, start, end, value)
+
+        if kind == STRING_LIT:
+            yield Token(STRING, value, offset, index)
+        elif kind == IDENTIFIER and is_reserved(value):
+            raise reserved_error(value, *index.position(offset))
         else:
-            tokens.append(Token(kind, value, line_num, column))
+            yield Token(kind, value, offset, index)
+
+
+def iter_decoded_tokens(
+    data: bytes, start: int, offset: int, index: FileLineIndex
+) -> Iterator[Token]:
+    # A non-ASCII character outside literals and comments: lex the rest
+    # of the source as str so both entry points accept the same text.
+    code = data[:].decode("utf-8", "replace")
+    byte_pos = data.find(b"\n", start)
+    pos = code.find("\n", offset)
+    while byte_pos != -1:
+        index.add_line(pos + 1, byte_pos + 1)
+        byte_pos = data.find(b"\n", byte_pos + 1)
+        pos = code.find("\n", pos + 1)
+    yield from iter_tokens(code, index, offset)
 
-        if "\n" in value:
-            line_num += value.count("\n")
-            line_start = match.end() - (len(value) - value.rfind("\n") - 1)
 
-    return tokens
+def iter_file_tokens(
+    path: str, index: FileLineIndex = None
+) -> Iterator[Token]:
+    if index is None:
+        index = FileLineIndex(path)
+    with open(path, "rb") as source:
+        if os.fstat(source.fileno()).st_size == 0:
+            return
+        with mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            yield from iter_bytes_tokens(data, index)
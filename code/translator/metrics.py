@@ -0,0 +1,129 @@
+import threading
+from typing import NamedTuple
+
+from nodes import ExpressionNode
+
+STAGES = ("lexer", "syntax", "semantic", "optimize", "codegen")
+
+
+class TranslationStats(NamedTuple):
+    stage_seconds: dict
+    tokens: int
+    nodes: int
+    max_depth: int
+    output_bytes: int
+    removed_nodes: int = 0
+
+    @property
+    def total_seconds(self) -> float:
+        return sum(self.stage_seconds.values())
+
+
+def node_children(node: ExpressionNode) -> list:
+    children = []
+    pending = [
+        getattr(node, name, None)
+        for cls in type(node).__mro__
+        for name in getattr(cls, "__slots__", ())
+    ]
+    while pending:
+        item = pending.pop()
+        if isinstance(item, ExpressionNode):
+            children.append(item)
+        elif type(item) in (list, tuple):
+            pending.extend(item)
+    return children
+
+
+def tree_shape(root: ExpressionNode) -> tuple:
+    if root is None:
+        return 0, 0
+    count = 0
+    max_depth = 0
+    stack = [(root, 1)]
+    while stack:
+        node, depth = stack.pop()
+        count += 1
+        if depth > max_depth:
+            max_depth = depth
+        stack.extend((child, depth + 1) for child in node_children(node))
+    return count, max_depth
+
+
+class MetricsRegistry:
+    def __init__(self, prefix: str = "pas2go") -> None:
+        self.prefix = prefix
+        self.lock = threading.Lock()
+        self.outcomes = {"ok": 0, "error": 0}
+        self.stage_seconds = dict.fromkeys(STAGES, 0.0)
+        self.stage_count = dict.fromkeys(STAGES, 0)
+        self.tokens = 0
+        self.nodes = 0
+        self.output_bytes = 0
+        self.removed_nodes = 0
+        self.max_depth = 0
+
+    def record(self, result) -> None:
+        stats = result.stats
+        with self.lock:
+            self.outcomes["ok" if result.ok else "error"] += 1
+            if stats is None:
+                return
+            for stage, seconds in stats.stage_seconds.items():
+                self.stage_seconds[stage] += seconds
+                self.stage_count[stage] += 1
+            self.tokens += stats.tokens
+            self.nodes += stats.nodes
+            self.output_bytes += stats.output_bytes
+            self.removed_nodes += stats.removed_nodes
+            self.max_depth = max(self.max_depth, stats.max_depth)
+
+    def render(self, extra: dict = None) -> str:
+        name = self.prefix
+        with self.lock:
+            lines = [
+                f"# HELP {name}_translations_total Translations by outcome.",
+                f"# TYPE {name}_translations_total counter",
+            ]
+            lines += [
+                f'{name}_translations_total{{outcome="{outcome}"}} {count}'
+                for outcome, count in self.outcomes.items()
+            ]
+            lines += [
+                f"# HELP {name}_stage_seconds Wall time per pipeline stage.",
+                f"# TYPE {name}_stage_seconds summary",
+            ]
+            for stage in STAGES:
+                lines.append(
+                    f'{name}_stage_seconds_sum{{stage="{stage}"}} '
+                    f"{self.stage_seconds[stage]:.6f}"
+                )
+                lines.append(
+                    f'{name}_stage_seconds_count{{stage="{stage}"}} '
+                    f"{self.stage_count[stage]}"
+                )
+            counters = {
+                "tokens_total": ("Tokens produced by the lexer.", self.tokens),
+                "ast_nodes_total": ("AST nodes built.", self.nodes),
+                "removed_nodes_total": (
+                    "AST nodes removed by the optimizer.",
+                    self.removed_nodes,
+                ),
+                "output_bytes_total": (
+                    "Bytes of generated Go code.",
+                    self.output_bytes,
+                ),
+            }
+            counters.update(extra or {})
+            for metric, (help_text, value) in counters.items():
+                lines += [
+                    f"# HELP {name}_{metric} {help_text}",
+                    f"# TYPE {name}_{metric} counter",
+                    f"{name}_{metric} {value}",
+                ]
+            lines += [
+                f"# HELP {name}_ast_max_depth Deepest AST seen so far.",
+                f"# TYPE {name}_ast_max_depth gauge",
+                f"{name}_ast_max_depth {self.max_depth}",
+            ]
+        return "\n".join(lines) + "\n"
@@ -1,16 +1,50 @@
+from typing import NamedTuple, Optional
+
 from lexer import Token
 
 
+class Symbol(NamedTuple):
+    name: str
+    type: object
+    depth: int
+    low: Optional[int] = None
+    high: Optional[int] = None
+
+
 class ExpressionNode:
-    pass
+    __slots__ = ()
+
+
+def node_token(node) -> Optional[Token]:
+    if isinstance(node, Token):
+        return node
+    if not isinstance(node, ExpressionNode):
+        return None
+    if hasattr(node, "value") and isinstance(node.value, Token):
+        return node.value
+    if hasattr(node, "token"):
+        return node.token
+    if hasattr(node, "operator"):
+        return node.operator
+    if hasattr(node, "var_token"):
+        return node.var_token
+    for name in ("condition", "expression", "start_expr", "end_expr"):
+        token = node_token(getattr(node, name, None))
+        if token is not None:
+            return token
+    return None
 
 
 class VarDeclarationNode(ExpressionNode):
+    __slots__ = ("declarations",)
+
     def __init__(self, declarations: list) -> None:
         self.declarations = declarations
 
 
 class ProcedureCallNode(ExpressionNode):
+    __slots__ = ("name", "args", "token")
+
     def __init__(self, name: str, args: list, token: Token = None) -> None:
         self.name = name
         self.args = args
@@ -18,11 +52,17 @@ class ProcedureCallNode(ExpressionNode):
 
 
 class ValueNode(ExpressionNode):
+    __slots__ = ("value", "expr_type", "symbol")
+
     def __init__(self, value: Token) -> None:
         self.value = value
+        self.expr_type = None
+        self.symbol = None
 
 
 class BinOperatorNode(ExpressionNode):
+    __slots__ = ("operator", "leftNode", "rightNode", "expr_type")
+
     def __init__(
         self,
         operator: Token,
@@ -32,15 +72,21 @@ class BinOperatorNode(ExpressionNode):
         self.operator = operator
         self.leftNode = left_node
         self.rightNode = right_node
+        self.expr_type = None
 
 
 class UnaryOperatorNode(ExpressionNode):
+    __slots__ = ("operator", "operand", "expr_type")
+
     def __init__(self, operator: Token, operand: ExpressionNode) -> None:
         self.operator = operator
         self.operand = operand
+        self.expr_type = None
 
 
 class BlockNode(ExpressionNode):
+    __slots__ = ("body",)
+
     def __init__(self) -> None:
         self.body = []
 
@@ -49,6 +95,8 @@ class BlockNode(ExpressionNode):
 
 
 class IfStatementNode(ExpressionNode):
+    __slots__ = ("condition", "then_block", "else_block")
+
     def __init__(
         self,
         condition: ExpressionNode,
@@ -61,12 +109,16 @@ class IfStatementNode(ExpressionNode):
 
 
 class WhileStatementNode(ExpressionNode):
+    __slots__ = ("condition", "body")
+
     def __init__(self, condition: ExpressionNode, body: BlockNode) -> None:
         self.condition = condition
         self.body = body
 
 
 class StatementNode(ExpressionNode):
+    __slots__ = ("codeStrings",)
+
     def __init__(self) -> None:
         self.codeStrings = []
 
@@ -75,6 +127,8 @@ class StatementNode(ExpressionNode):
 
 
 class ProgramNode(ExpressionNode):
+    __slots__ = ("declarations", "routines", "main_block")
+
     def __init__(
         self,
         declarations: list,
@@ -87,6 +141,8 @@ class ProgramNode(ExpressionNode):
 
 
 class FunctionDeclNode(ExpressionNode):
+    __slots__ = ("name", "params", "return_type", "local_decls", "body")
+
     def __init__(
         self,
         name: str,
@@ -103,6 +159,8 @@ class FunctionDeclNode(ExpressionNode):
 
 
 class ProcedureDeclNode(ExpressionNode):
+    __slots__ = ("name", "params", "local_decls", "body")
+
     def __init__(
         self,
         name: str,
@@ -117,13 +175,18 @@ class ProcedureDeclNode(ExpressionNode):
 
 
 class FunctionCallNode(ExpressionNode):
+    __slots__ = ("name", "args", "token", "expr_type")
+
     def __init__(self, name: str, args: list, token: Token = None) -> None:
         self.name = name
         self.args = args
         self.token = token
+        self.expr_type = None
 
 
 class ArrayAccessNode(ExpressionNode):
+    __slots__ = ("name", "index", "token", "expr_type", "symbol")
+
     def __init__(
         self,
         name: str,
@@ -133,9 +196,20 @@ class ArrayAccessNode(ExpressionNode):
         self.name = name
         self.index = index
         self.token = token
+        self.expr_type = None
+        self.symbol = None
 
 
 class ForStatementNode(ExpressionNode):
+    __slots__ = (
+        "var_token",
+        "start_expr",
+        "end_expr",
+        "direction",
+        "body",
+        "assigned",
+    )
+
     def __init__(
         self,
         var_token: Token,
@@ -149,21 +223,28 @@ class ForStatementNode(ExpressionNode):
         self.end_expr = end_expr
         self.direction = direction
         self.body = body
+        self.assigned = None
 
 
 class DoWhileStatementNode(ExpressionNode):
+    __slots__ = ("body", "condition")
+
     def __init__(self, body: BlockNode, condition: ExpressionNode) -> None:
         self.body = body
         self.condition = condition
 
 
 class RepeatUntilStatementNode(ExpressionNode):
+    __slots__ = ("body", "condition")
+
     def __init__(self, body: BlockNode, condition: ExpressionNode) -> None:
         self.body = body
         self.condition = condition
 
 
 class CaseStatementNode(ExpressionNode):
+    __slots__ = ("expression", "cases", "else_block")
+
     def __init__(
         self,
         expression: ExpressionNode,
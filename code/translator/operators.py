@@ -0,0 +1,34 @@
+LOGICAL_OPERATORS = frozenset(("or", "xor", "and"))
+
+PRECEDENCE = {
+    "or": 1,
+    "xor": 1,
+    "and": 2,
+    "=": 3,
+    "<>": 3,
+    "==": 3,
+    "!=": 3,
+    "<": 3,
+    ">": 3,
+    "<=": 3,
+    ">=": 3,
+    "+": 4,
+    "-": 4,
+    "*": 5,
+    "/": 5,
+    "div": 5,
+    "mod": 5,
+}
+
+UNARY_PRECEDENCE = 6
+
+NON_ASSOCIATIVE = frozenset(("-", "/", "div", "mod"))
+
+
+def binary_precedence(value: str):
+    prec = PRECEDENCE.get(value)
+    if prec is None:
+        folded = value.lower()
+        if folded in LOGICAL_OPERATORS:
+            return PRECEDENCE[folded]
+    return prec
@@ -0,0 +1,415 @@
+from fractions import Fraction
+from types import GeneratorType
+from typing import Iterator
+
+import metrics
+from lexer import (
+    ASSIGN,
+    BOOL_LIT,
+    CHAR_LIT,
+    IDENTIFIER,
+    NUMBER,
+    STRING,
+    Token,
+)
+from nodes import (
+    ArrayAccessNode,
+    BinOperatorNode,
+    BlockNode,
+    CaseStatementNode,
+    DoWhileStatementNode,
+    ExpressionNode,
+    ForStatementNode,
+    FunctionCallNode,
+    IfStatementNode,
+    ProcedureCallNode,
+    ProgramNode,
+    RepeatUntilStatementNode,
+    UnaryOperatorNode,
+    ValueNode,
+    WhileStatementNode,
+)
+from visitor import NodeVisitor, visits
+
+NOT_CONSTANT = object()
+NUMERIC_TYPES = frozenset(("integer", "real"))
+ORDERED_TYPES = frozenset(("integer", "real", "char", "string"))
+EQUALITY = {
+    "=": lambda a, b: a == b,
+    "==": lambda a, b: a == b,
+    "<>": lambda a, b: a != b,
+    "!=": lambda a, b: a != b,
+}
+ORDERING = {
+    "<": lambda a, b: a < b,
+    ">": lambda a, b: a > b,
+    "<=": lambda a, b: a <= b,
+    ">=": lambda a, b: a >= b,
+}
+LOGIC = {
+    "and": lambda a, b: a and b,
+    "or": lambda a, b: a or b,
+    "xor": lambda a, b: a != b,
+}
+ARITHMETIC = {
+    "+": lambda a, b: a + b,
+    "-": lambda a, b: a - b,
+    "*": lambda a, b: a * b,
+}
+
+
+def truncated_div(a: int, b: int) -> int:
+    quotient = abs(a) // abs(b)
+    return quotient if (a < 0) == (b < 0) else -quotient
+
+
+def real_text(value: Fraction) -> str:
+    text = repr(float(value))
+    if "." not in text:
+        mantissa, _, exponent = text.partition("e")
+        text = f"{mantissa}.0" + (f"e{exponent}" if exponent else "")
+    return text
+
+
+def subtree_size(node: ExpressionNode) -> int:
+    return metrics.tree_shape(node)[0]
+
+
+class Optimizer(NodeVisitor):
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        self.removed = 0
+        self.values = {}
+        self.dropped = set()
+
+    def optimize_program(self, root: ExpressionNode) -> int:
+        removed = self.removed
+        if isinstance(root, ProgramNode):
+            for routine in root.routines:
+                self.optimize_routine(routine)
+            self.run(self.optimize_block(root.main_block))
+        else:
+            block = BlockNode()
+            block.body = root.codeStrings
+            self.run(self.optimize_block(block))
+            root.codeStrings = block.body
+        self.values = {}
+        return self.removed - removed
+
+    def optimize_routine(self, node: ExpressionNode) -> None:
+        self.dropped = set()
+        self.run(self.optimize_block(node.body))
+        sinks = [
+            self.sink(name)
+            for name, _ in node.local_decls
+            if name in self.dropped
+        ]
+        node.body.body[:0] = sinks
+        self.removed -= 3 * len(sinks)
+        self.dropped = set()
+
+    def sink(self, name: str) -> BinOperatorNode:
+        return BinOperatorNode(
+            Token(ASSIGN, ":=", 0),
+            ValueNode(Token(IDENTIFIER, "_", 0)),
+            ValueNode(Token(IDENTIFIER, name, 0)),
+        )
+
+    def referenced(self, node: ExpressionNode) -> set:
+        names = set()
+        pending = [node]
+        while pending:
+            item = pending.pop()
+            if item.__class__ is ValueNode:
+                if item.value.type == IDENTIFIER:
+                    names.add(item.value.value)
+            elif item.__class__ is ArrayAccessNode:
+                names.add(item.name)
+            pending.extend(metrics.node_children(item))
+        return names
+
+    def drop(self, node: ExpressionNode) -> None:
+        if node is None:
+            return
+        self.removed += subtree_size(node)
+        self.dropped |= self.referenced(node)
+
+    def optimize_block(self, block: BlockNode) -> Iterator:
+        body = []
+        for stmt in block.body:
+            result = self.statement(stmt)
+            if result.__class__ is GeneratorType:
+                result = yield result
+            body += result
+        block.body = body
+
+    def statement(self, node: ExpressionNode):
+        handler = self.dispatch["statement"][node.__class__]
+        if handler is None:
+            return [self.fold(node)]
+        return handler(self, node)
+
+    @visits("statement", BinOperatorNode)
+    def _optimize_assignment(self, node: BinOperatorNode) -> list:
+        if node.operator.type != ASSIGN:
+            return [self.fold(node)]
+        if node.leftNode.__class__ is ArrayAccessNode:
+            node.leftNode.index = self.fold(node.leftNode.index)
+        node.rightNode = self.fold(node.rightNode)
+        return [node]
+
+    @visits("statement", ProcedureCallNode)
+    def _optimize_procedure_call(self, node: ProcedureCallNode) -> list:
+        node.args = [self.fold(arg) for arg in node.args]
+        return [node]
+
+    @visits("statement", IfStatementNode)
+    def _optimize_if_statement(self, node: IfStatementNode) -> Iterator:
+        node.condition = self.fold(node.condition)
+        condition = self.constant(node.condition)
+        if condition is NOT_CONSTANT:
+            yield self.optimize_block(node.then_block)
+            if node.else_block:
+                yield self.optimize_block(node.else_block)
+            return [node]
+
+        kept, dropped = node.then_block, node.else_block
+        if not condition:
+            kept, dropped = dropped, kept
+        self.removed += 2
+        self.drop(dropped)
+        if kept is None:
+            return []
+        self.removed += 1
+        yield self.optimize_block(kept)
+        return kept.body
+
+    @visits("statement", WhileStatementNode)
+    def _optimize_while_statement(
+        self,
+        node: WhileStatementNode,
+    ) -> Iterator:
+        node.condition = self.fold(node.condition)
+        if self.constant(node.condition) is False:
+            self.drop(node)
+            return []
+        yield self.optimize_block(node.body)
+        return [node]
+
+    @visits("statement", RepeatUntilStatementNode)
+    def _optimize_repeat_until_statement(
+        self,
+        node: RepeatUntilStatementNode,
+    ) -> Iterator:
+        yield self.optimize_block(node.body)
+        node.condition = self.fold(node.condition)
+        if self.constant(node.condition) is True:
+            self.removed += 3
+            return node.body.body
+        return [node]
+
+    @visits("statement", DoWhileStatementNode)
+    def _optimize_do_while_statement(
+        self,
+        node: DoWhileStatementNode,
+    ) -> Iterator:
+        yield self.optimize_block(node.body)
+        node.condition = self.fold(node.condition)
+        if self.constant(node.condition) is False:
+            self.removed += 3
+            return node.body.body
+        return [node]
+
+    @visits("statement", ForStatementNode)
+    def _optimize_for_statement(self, node: ForStatementNode) -> Iterator:
+        node.start_expr = self.fold(node.start_expr)
+        node.end_expr = self.fold(node.end_expr)
+        start = self.constant(node.start_expr)
+        end = self.constant(node.end_expr)
+        if start is not NOT_CONSTANT and end is not NOT_CONSTANT:
+            if start > end if node.direction == "TO" else start < end:
+                self.drop(node)
+                return []
+        yield self.optimize_block(node.body)
+        return [node]
+
+    @visits("statement", CaseStatementNode)
+    def _optimize_case_statement(
+        self,
+        node: CaseStatementNode,
+    ) -> Iterator:
+        node.expression = self.fold(node.expression)
+        value = self.constant(node.expression)
+        labels = [
+            self.case_key(label)
+            for case_labels, _ in node.cases
+            for label in case_labels
+        ]
+        if (
+            value is NOT_CONSTANT
+            or None in labels
+            or len(set(labels)) != len(labels)
+        ):
+            for _, block in node.cases:
+                yield self.optimize_block(block)
+            if node.else_block:
+                yield self.optimize_block(node.else_block)
+            return [node]
+
+        kept = node.else_block
+        for case_labels, block in node.cases:
+            keys = [self.case_key(label) for label in case_labels]
+            if (value.__class__, value) in keys:
+                kept = block
+        self.removed += 1 + subtree_size(node.expression)
+        for case_labels, block in node.cases:
+            self.removed += len(case_labels)
+            if block is not kept:
+                self.drop(block)
+        if node.else_block is not kept:
+            self.drop(node.else_block)
+        if kept is None:
+            return []
+        self.removed += 1
+        yield self.optimize_block(kept)
+        return kept.body
+
+    def case_key(self, node: ExpressionNode):
+        value = self.constant(node)
+        if value is NOT_CONSTANT:
+            return None
+        return value.__class__, value
+
+    def constant(self, node: ExpressionNode):
+        if node.__class__ is not ValueNode:
+            return NOT_CONSTANT
+        value = self.values.get(node, NOT_CONSTANT)
+        if value is not NOT_CONSTANT:
+            return value
+        token = node.value
+        if token.type == NUMBER:
+            if "." in token.value:
+                return Fraction(token.value)
+            return int(token.value)
+        if token.type == BOOL_LIT:
+            return token.value.lower() == "true"
+        if token.type in (STRING, CHAR_LIT):
+            return token.value[1:-1]
+        return NOT_CONSTANT
+
+    def fold(self, root: ExpressionNode) -> ExpressionNode:
+        if root.__class__ is ValueNode:
+            return root
+        order = []
+        pending = [root]
+        while pending:
+            node = pending.pop()
+            order.append(node)
+            pending.extend(self.operands(node))
+        folded = {}
+        table = self.dispatch["fold"]
+        for node in reversed(order):
+            handler = table[node.__class__]
+            if handler is not None:
+                literal = handler(self, node, folded)
+                if literal is not None:
+                    folded[node] = literal
+        return folded.get(root, root)
+
+    def operands(self, node: ExpressionNode) -> list:
+        kind = node.__class__
+        if kind is BinOperatorNode:
+            return [node.leftNode, node.rightNode]
+        if kind is UnaryOperatorNode:
+            return [node.operand]
+        if kind is ArrayAccessNode:
+            return [node.index]
+        if kind is FunctionCallNode:
+            return node.args
+        return []
+
+    @visits("fold", ArrayAccessNode)
+    def _fold_array_access(self, node, folded: dict) -> None:
+        node.index = folded.get(node.index, node.index)
+
+    @visits("fold", FunctionCallNode)
+    def _fold_function_call(self, node, folded: dict) -> None:
+        node.args = [folded.get(arg, arg) for arg in node.args]
+
+    @visits("fold", UnaryOperatorNode)
+    def _fold_unary_operator(self, node, folded: dict):
+        node.operand = folded.get(node.operand, node.operand)
+        operand = self.constant(node.operand)
+        if operand is NOT_CONSTANT:
+            return None
+        op = node.operator.value.lower()
+        if op == "not" and node.expr_type == "boolean":
+            return self.literal(node, not operand, 1)
+        if op == "-" and node.expr_type in NUMERIC_TYPES:
+            return self.literal(node, -operand, 1)
+        return None
+
+    @visits("fold", BinOperatorNode)
+    def _fold_bin_operator(self, node, folded: dict):
+        node.leftNode = folded.get(node.leftNode, node.leftNode)
+        node.rightNode = folded.get(node.rightNode, node.rightNode)
+        left = self.constant(node.leftNode)
+        right = self.constant(node.rightNode)
+        if left is NOT_CONSTANT or right is NOT_CONSTANT:
+            return None
+        value = self.evaluate(
+            node.operator.value.lower(),
+            node.leftNode.expr_type,
+            left,
+            right,
+        )
+        if value is NOT_CONSTANT:
+            return None
+        return self.literal(node, value, 2)
+
+    def evaluate(self, op: str, operand_type, left, right):
+        if op in EQUALITY:
+            return EQUALITY[op](left, right)
+        if op in ORDERING:
+            if operand_type not in ORDERED_TYPES:
+                return NOT_CONSTANT
+            return ORDERING[op](left, right)
+        if op in LOGIC:
+            if operand_type != "boolean":
+                return NOT_CONSTANT
+            return LOGIC[op](left, right)
+        if operand_type not in NUMERIC_TYPES:
+            return NOT_CONSTANT
+        if op in ARITHMETIC:
+            return ARITHMETIC[op](left, right)
+        if not right:
+            return NOT_CONSTANT
+        if operand_type == "real":
+            return left / right if op == "/" else NOT_CONSTANT
+        if op in ("/", "div"):
+            return truncated_div(left, right)
+        if op == "mod":
+            return left - right * truncated_div(left, right)
+        return NOT_CONSTANT
+
+    def literal(self, node, value, removed: int) -> ValueNode:
+        if node.expr_type == "boolean":
+            token_type, text = BOOL_LIT, "true" if value else "false"
+        elif node.expr_type == "integer":
+            token_type, text = NUMBER, str(value)
+        elif node.expr_type == "real":
+            if not abs(float(value)) < float("inf"):
+                return None
+            token_type, text = NUMBER, real_text(value)
+        else:
+            return None
+        operator = node.operator
+        literal = ValueNode(
+            Token(token_type, text, operator.offset, operator.index)
+        )
+        literal.expr_type = node.expr_type
+        self.values[literal] = value
+        self.removed += removed
+        return literal
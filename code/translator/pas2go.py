@@ -0,0 +1,155 @@
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pipeline
+
+SOURCE_EXTENSION = ".pas"
+
+TRANSLATOR = pipeline.Translator()
+
+
+def configure(optimize: bool) -> None:
+    global TRANSLATOR
+    TRANSLATOR = pipeline.Translator(instrument=optimize, optimize=optimize)
+
+
+def collect_sources(paths: list) -> list:
+    sources = []
+    for path in paths:
+        if os.path.isdir(path):
+            for directory, _, names in os.walk(path):
+                sources.extend(
+                    os.path.join(directory, name)
+                    for name in names
+                    if name.lower().endswith(SOURCE_EXTENSION)
+                )
+        else:
+            sources.append(path)
+    return sorted(sources)
+
+
+def translate_file(path: str) -> dict:
+    start = time.perf_counter()
+    result = {
+        "path": path,
+        "output": None,
+        "error_type": None,
+        "error": None,
+        "snippet": None,
+        "removed_nodes": None,
+    }
+    try:
+        translation = TRANSLATOR.translate_file(path)
+        if TRANSLATOR.optimize and translation.stats is not None:
+            result["removed_nodes"] = translation.stats.removed_nodes
+        if translation.ok:
+            target = os.path.splitext(path)[0] + ".go"
+            with open(target, "w", encoding="utf-8") as target_file:
+                target_file.write(translation.output)
+            result["output"] = target
+        else:
+            diagnostic = translation.diagnostics[0]
+            result["error_type"] = diagnostic.kind
+            result["error"] = diagnostic.message
+            result["snippet"] = diagnostic.snippet
+    except Exception as err:
+        result["error_type"] = type(err).__name__
+        result["error"] = str(err)
+    result["seconds"] = time.perf_counter() - start
+    return result
+
+
+def translate_all(
+    paths: list,
+    workers: int,
+    chunk_size: int,
+    optimize: bool = False,
+) -> list:
+    configure(optimize)
+    if workers == 1:
+        return [translate_file(path) for path in paths]
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=configure,
+        initargs=(optimize,),
+    ) as pool:
+        return list(pool.map(translate_file, paths, chunksize=chunk_size))
+
+
+def build_summary(results: list, seconds: float, workers: int) -> dict:
+    failed = [result for result in results if result["error"] is not None]
+    return {
+        "files": len(results),
+        "translated": len(results) - len(failed),
+        "failed": len(failed),
+        "workers": workers,
+        "wall_seconds": seconds,
+        "translate_seconds": sum(result["seconds"] for result in results),
+        "results": results,
+    }
+
+
+def parse_args(argv: list) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="pas2go",
+        description="Пакетная трансляция Pascal-файлов в Go",
+    )
+    parser.add_argument("paths", nargs="+", help=".pas файлы или каталоги")
+    parser.add_argument(
+        "-j",
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="число процессов (по умолчанию: число CPU)",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=16,
+        help="сколько файлов передаётся процессу за раз",
+    )
+    parser.add_argument(
+        "--optimize",
+        action="store_true",
+        help="свернуть константы и удалить мёртвые ветви перед генерацией",
+    )
+    parser.add_argument(
+        "--summary",
+        default="-",
+        help="куда записать JSON-сводку (по умолчанию: stdout)",
+    )
+    args = parser.parse_args(argv)
+    if args.workers < 1 or args.chunk_size < 1:
+        parser.error("--workers и --chunk-size должны быть положительными")
+    return args
+
+
+def main(argv: list = None) -> int:
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    paths = collect_sources(args.paths)
+
+    start = time.perf_counter()
+    results = translate_all(
+        paths, args.workers, args.chunk_size, args.optimize
+    )
+    summary = build_summary(
+        results,
+        time.perf_counter() - start,
+        args.workers,
+    )
+
+    if args.summary == "-":
+        json.dump(summary, sys.stdout, ensure_ascii=False, indent=2)
+        sys.stdout.write("\n")
+    else:
+        with open(args.summary, "w", encoding="utf-8") as summary_file:
+            json.dump(summary, summary_file, ensure_ascii=False, indent=2)
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,216 @@
+import threading
+import time
+from typing import Iterator, NamedTuple, Optional
+
+import codegen
+import lexer
+import metrics
+import optimizer
+import semanalyzer
+import syntaxer
+
+
+class Diagnostic(NamedTuple):
+    stage: str
+    kind: str
+    message: str
+    line: Optional[int] = None
+    column: Optional[int] = None
+    snippet: Optional[str] = None
+
+    def format(self) -> str:
+        return f"{self.kind}: {self.message}"
+
+
+class Result(NamedTuple):
+    output: str
+    diagnostics: list
+    stats: Optional[metrics.TranslationStats] = None
+
+    @property
+    def ok(self) -> bool:
+        return not self.diagnostics
+
+
+def diagnostic_from(
+    stage: str,
+    err: Exception,
+    index: lexer.LineIndex = None,
+) -> Diagnostic:
+    message = str(err)
+    position = getattr(err, "position", None)
+    line = column = snippet = None
+    if position is not None:
+        line, column = position
+        if index is not None:
+            snippet = index.snippet(line, column) or None
+    return Diagnostic(
+        stage, type(err).__name__, message, line, column, snippet
+    )
+
+
+class TokenStream:
+    def __init__(self, tokens: Iterator, timed: bool = False) -> None:
+        self.tokens = tokens
+        self.timed = timed
+        self.error = None
+        self.count = 0
+        self.seconds = 0.0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> lexer.Token:
+        start = time.perf_counter() if self.timed else 0.0
+        try:
+            token = next(self.tokens)
+        except StopIteration:
+            raise
+        except Exception as err:
+            self.error = err
+            raise
+        finally:
+            if self.timed:
+                self.seconds += time.perf_counter() - start
+        self.count += 1
+        return token
+
+    def close(self) -> None:
+        close = getattr(self.tokens, "close", None)
+        if close is not None:
+            close()
+
+
+class Translator:
+    def __init__(
+        self,
+        instrument: bool = False,
+        max_depth: Optional[int] = None,
+        recover: bool = False,
+        max_errors: int = 20,
+        optimize: bool = False,
+    ) -> None:
+        self.instrument = instrument
+        self.max_depth = max_depth
+        self.recover = recover
+        self.max_errors = max_errors
+        self.optimize = optimize
+        self.local = threading.local()
+
+    def passes(self) -> tuple:
+        local = self.local
+        if not hasattr(local, "parser"):
+            local.parser = syntaxer.SyntaxAnalyzer(())
+            local.checker = semanalyzer.SemanticAnalyzer()
+            local.generator = codegen.CodeGenerator()
+            local.optimizer = optimizer.Optimizer()
+            if self.max_depth is not None:
+                local.parser.max_depth = self.max_depth
+                local.checker.max_depth = self.max_depth
+                local.generator.max_depth = self.max_depth
+                local.optimizer.max_depth = self.max_depth
+            local.parser.recover = local.checker.recover = self.recover
+            local.parser.max_errors = self.max_errors
+        return (
+            local.parser,
+            local.checker,
+            local.generator,
+            local.optimizer,
+        )
+
+    def reset(self) -> None:
+        self.local = threading.local()
+
+    def translate(self, source: str) -> Result:
+        index = lexer.LineIndex(source)
+        return self.translate_tokens(lexer.iter_tokens(source, index), index)
+
+    def translate_file(self, path: str) -> Result:
+        index = lexer.FileLineIndex(path)
+        return self.translate_tokens(
+            lexer.iter_file_tokens(path, index), index
+        )
+
+    def translate_tokens(
+        self,
+        token_iter: Iterator,
+        index: lexer.LineIndex = None,
+    ) -> Result:
+        parser, checker, generator, optimizer_pass = self.passes()
+        tokens = TokenStream(token_iter, timed=self.instrument)
+        timings = {}
+        syntax_tree = None
+        output = ""
+        diagnostics = []
+        removed = 0
+        stage = "syntax"
+        started = time.perf_counter()
+        checker.reset()
+        try:
+            parser.reset(tokens)
+            syntax_tree = parser.parse_program()
+            started = self.lap(timings, stage, started)
+            stage = "semantic"
+            checker.max_errors = self.max_errors - len(parser.errors)
+            checker.check_program(syntax_tree)
+            started = self.lap(timings, stage, started)
+            if not (parser.errors or checker.errors):
+                if self.optimize:
+                    stage = "optimize"
+                    optimizer_pass.reset()
+                    removed = optimizer_pass.optimize_program(syntax_tree)
+                    started = self.lap(timings, stage, started)
+                stage = "codegen"
+                generator.reset()
+                output = generator.generate(syntax_tree)
+                self.lap(timings, stage, started)
+        except Exception as err:
+            self.lap(timings, stage, started)
+            if err is tokens.error:
+                stage = "lexer"
+            output = ""
+            diagnostics.append(diagnostic_from(stage, err, index))
+        finally:
+            diagnostics[:0] = [
+                diagnostic_from("syntax", err, index) for err in parser.errors
+            ] + [
+                diagnostic_from("semantic", err, index)
+                for err in checker.errors
+            ]
+            parser.reset(())
+            tokens.close()
+
+        stats = None
+        if self.instrument:
+            stats = self.collect(
+                tokens, timings, syntax_tree, output, removed
+            )
+        return Result(output, diagnostics, stats)
+
+    def lap(self, timings: dict, stage: str, started: float) -> float:
+        now = time.perf_counter()
+        timings[stage] = now - started
+        return now
+
+    def collect(
+        self,
+        tokens: TokenStream,
+        timings: dict,
+        syntax_tree,
+        output: str,
+        removed: int = 0,
+    ) -> metrics.TranslationStats:
+        stage_seconds = {"lexer": tokens.seconds}
+        stage_seconds["syntax"] = timings["syntax"] - tokens.seconds
+        for stage in metrics.STAGES[2:]:
+            if stage in timings:
+                stage_seconds[stage] = timings[stage]
+        nodes, max_depth = metrics.tree_shape(syntax_tree)
+        return metrics.TranslationStats(
+            stage_seconds=stage_seconds,
+            tokens=tokens.count,
+            nodes=nodes + removed,
+            max_depth=max_depth,
+            output_bytes=len(output.encode("utf-8")),
+            removed_nodes=removed,
+        )
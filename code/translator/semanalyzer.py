@@ -1,4 +1,16 @@
-from lexer import Token
+from types import GeneratorType
+from typing import Iterator
+
+from lexer import (
+    ASSIGN,
+    BOOL_LIT,
+    CHAR_LIT,
+    IDENTIFIER,
+    NUMBER,
+    STRING,
+    Token,
+    located,
+)
 from nodes import (
     ArrayAccessNode,
     BinOperatorNode,
@@ -12,36 +24,63 @@ from nodes import (
     ProcedureDeclNode,
     ProgramNode,
     RepeatUntilStatementNode,
+    Symbol,
     UnaryOperatorNode,
     ValueNode,
     VarDeclarationNode,
     WhileStatementNode,
+    node_token,
 )
+from visitor import NodeVisitor, visits
+
+READABLE_TYPES = ("integer", "real", "char", "string")
 
 
-class SemanticAnalyzer:
+class SemanticAnalyzer(NodeVisitor):
     def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
         self.scopes = [{}]
+        self.symbols = {}
         self.functions = {}
         self.procedures = {}
         self.in_loop = False
+        self.assigned = []
+        self.errors = []
 
     def push_scope(self) -> None:
         self.scopes.append({})
 
     def pop_scope(self) -> None:
-        self.scopes.pop()
+        symbols = self.symbols
+        for name, shadowed in self.scopes.pop().items():
+            if shadowed is None:
+                del symbols[name]
+            else:
+                symbols[name] = shadowed
 
     def declare(self, name: str, var_type: str) -> None:
-        if name in self.scopes[-1]:
+        scope = self.scopes[-1]
+        if name in scope:
             raise NameError(f"Переменная {name} уже объявлена")
-        self.scopes[-1][name] = var_type
+        scope[name] = self.symbols.get(name)
+        depth = len(self.scopes) - 1
+        if self.is_array_type(var_type):
+            self.symbols[name] = Symbol(
+                name, var_type, depth, var_type["low"], var_type["high"]
+            )
+        else:
+            self.symbols[name] = Symbol(name, var_type, depth)
 
-    def lookup(self, name: str):
-        for scope in reversed(self.scopes):
-            if name in scope:
-                return scope[name]
-        return None
+    def resolve(self, name: str):
+        return self.symbols.get(name)
+
+    def bind(self, node: ExpressionNode, name: str):
+        symbol = node.symbol
+        if symbol is None:
+            symbol = node.symbol = self.symbols.get(name)
+        return symbol
 
     def format_error(self, message: str, node: ExpressionNode = None) -> str:
         token = self.get_token(node)
@@ -49,462 +88,522 @@ class SemanticAnalyzer:
             return f"{message} (строка {token.line}, колонка {token.column})"
         return f"{message} (строка ?, колонка ?)"
 
+    def error(
+        self, kind: type, message: str, node: ExpressionNode = None
+    ) -> Exception:
+        token = self.get_token(node)
+        return located(
+            kind(self.format_error(message, node)),
+            token.position if token else None,
+        )
+
     def get_token(self, node: ExpressionNode):
-        if node is None:
-            return None
-        if hasattr(node, "value") and isinstance(node.value, Token):
-            return node.value
-        if hasattr(node, "token"):
-            return node.token
-        if hasattr(node, "operator"):
-            return node.operator
-        if hasattr(node, "var_token"):
-            return node.var_token
-        if hasattr(node, "start_expr"):
-            return (
-                self.get_token(node.start_expr)
-                or self.get_token(node.end_expr)
-            )
-        return None
+        return node_token(node)
 
     def check_program(self, root: ExpressionNode) -> None:
         if isinstance(root, ProgramNode):
-            for var_name, var_type in root.declarations:
-                self.declare(var_name, var_type)
-
-            for routine in root.routines:
-                if isinstance(routine, FunctionDeclNode):
-                    if (
-                        routine.name in self.functions
-                        or routine.name in self.procedures
-                    ):
-                        raise NameError(
-                            f"Функция/процедура {routine.name} уже объявлена"
-                        )
-                    self.functions[routine.name] = {
-                        "params": routine.params,
-                        "return_type": routine.return_type,
-                    }
-                elif isinstance(routine, ProcedureDeclNode):
-                    if (
-                        routine.name in self.functions
-                        or routine.name in self.procedures
-                    ):
-                        raise NameError(
-                            f"Функция/процедура {routine.name} уже объявлена"
-                        )
-                    self.procedures[routine.name] = {"params": routine.params}
-
+            self.declare_globals(root.declarations)
+            self.register_routines(root.routines)
             for routine in root.routines:
-                self.check_node(routine)
-
-            for stmt in root.main_block.body:
-                self.check_node(stmt)
+                depth = len(self.scopes)
+                try:
+                    self.check_node(routine)
+                except (NameError, TypeError) as err:
+                    while len(self.scopes) > depth:
+                        self.pop_scope()
+                    self.record_error(err)
+            self.run(self.check_block(root.main_block))
             return
 
         for node in root.codeStrings:
             self.check_node(node)
 
-    def check_node(self, node: ExpressionNode) -> None:
-        if isinstance(node, VarDeclarationNode):
-            for var_name, var_type in node.declarations:
+    def declare_globals(self, declarations: list) -> None:
+        for var_name, var_type in declarations:
+            try:
                 self.declare(var_name, var_type)
-            return
+            except NameError as err:
+                self.record_error(err)
+
+    def register_routines(self, routines: list) -> None:
+        for routine in routines:
+            if (
+                routine.name in self.functions
+                or routine.name in self.procedures
+            ):
+                self.record_error(
+                    NameError(
+                        f"Функция/процедура {routine.name} уже объявлена"
+                    )
+                )
+                continue
+            if isinstance(routine, FunctionDeclNode):
+                self.functions[routine.name] = {
+                    "params": routine.params,
+                    "return_type": routine.return_type,
+                }
+            elif isinstance(routine, ProcedureDeclNode):
+                self.procedures[routine.name] = {"params": routine.params}
+
+    def signature(self, name: str):
+        if name in self.functions:
+            signature = self.functions[name]
+            return ("function", repr(signature["params"]),
+                    signature["return_type"])
+        if name in self.procedures:
+            return ("procedure", repr(self.procedures[name]["params"]))
+        return None
 
-        if isinstance(node, BinOperatorNode):
-            self._check_assignment(node)
-            return
+    def check_node(self, node: ExpressionNode) -> None:
+        self.run(self.check(node))
 
-        if isinstance(node, IfStatementNode):
-            self.check_condition(node.condition)
-            for stmt in node.then_block.body:
-                self.check_node(stmt)
-            if node.else_block:
-                for stmt in node.else_block.body:
-                    self.check_node(stmt)
-            return
+    def check(self, node: ExpressionNode):
+        handler = self.dispatch["check"][node.__class__]
+        if handler is not None:
+            return handler(self, node)
+        return None
 
-        if isinstance(node, WhileStatementNode):
-            self.check_condition(node.condition)
-            self.in_loop = True
-            for stmt in node.body.body:
-                self.check_node(stmt)
-            self.in_loop = False
-            return
+    def check_block(self, block) -> Iterator:
+        for stmt in block.body:
+            try:
+                task = self.check(stmt)
+                if task is not None:
+                    yield task
+            except (NameError, TypeError) as err:
+                self.record_error(err)
+
+    @visits("check", VarDeclarationNode)
+    def _check_var_declaration(self, node: VarDeclarationNode) -> None:
+        for var_name, var_type in node.declarations:
+            self.declare(var_name, var_type)
+
+    @visits("check", IfStatementNode)
+    def _check_if_statement(self, node: IfStatementNode) -> Iterator:
+        yield from self.check_condition(node.condition)
+        yield from self.check_block(node.then_block)
+        if node.else_block:
+            yield from self.check_block(node.else_block)
+
+    @visits("check", WhileStatementNode)
+    def _check_while_statement(self, node: WhileStatementNode) -> Iterator:
+        yield from self.check_condition(node.condition)
+        self.in_loop = True
+        yield from self.check_block(node.body)
+        self.in_loop = False
 
-        if isinstance(node, RepeatUntilStatementNode):
-            self.in_loop = True
-            for stmt in node.body.body:
-                self.check_node(stmt)
-            self.in_loop = False
-            self.check_condition(node.condition)
+    @visits("check", RepeatUntilStatementNode)
+    def _check_repeat_until_statement(
+        self,
+        node: RepeatUntilStatementNode,
+    ) -> Iterator:
+        self.in_loop = True
+        yield from self.check_block(node.body)
+        self.in_loop = False
+        yield from self.check_condition(node.condition)
+
+    @visits("check", ProcedureCallNode)
+    def _check_procedure_call(self, node: ProcedureCallNode) -> Iterator:
+        if node.name.lower() == "writeln":
+            for arg in node.args:
+                task = self.infer(arg)
+                if task.__class__ is GeneratorType:
+                    yield task
             return
-
-        if isinstance(node, ForStatementNode):
-            self._check_for_statement(node)
+        if node.name in ("read", "readln"):
+            yield from self.check_read(node)
             return
+        yield from self.check_call(
+            node.name,
+            node.args,
+            allow_procedure=True,
+            allow_function=False,
+            node=node,
+        )
+
+    def check_read(self, node: ProcedureCallNode) -> Iterator:
+        for arg in node.args:
+            if arg.__class__ is ArrayAccessNode:
+                var_name = arg.name
+            else:
+                var_name = arg.value.value
+                if self.bind(arg, var_name) is None:
+                    raise self.error(
+                        NameError, f"Переменная {var_name} не объявлена", arg
+                    )
+            if self.assigned:
+                self.assigned[-1].add(var_name)
+            arg_type = self.infer(arg)
+            if arg_type.__class__ is GeneratorType:
+                arg_type = yield arg_type
+            if arg_type not in READABLE_TYPES:
+                type_name = arg_type
+                if self.is_array_type(arg_type):
+                    type_name = "array"
+                raise self.error(
+                    TypeError,
+                    f"{node.name} не читает значения типа {type_name}",
+                    arg,
+                )
 
-        if isinstance(node, ProcedureCallNode):
-            if node.name.lower() == "writeln":
-                for arg in node.args:
-                    self.check_expression(arg)
-                return
-            self.check_call(
-                node.name,
-                node.args,
-                allow_procedure=True,
-                allow_function=False,
-                node=node,
-            )
-            return
+    @visits("check", FunctionCallNode)
+    def _check_function_call(self, node: FunctionCallNode) -> Iterator:
+        yield from self.check_call(
+            node.name,
+            node.args,
+            allow_procedure=False,
+            allow_function=True,
+            node=node,
+        )
+
+    @visits("check", FunctionDeclNode)
+    def _check_function_decl(self, node: FunctionDeclNode) -> Iterator:
+        self.push_scope()
+        for param_name, param_type in node.params:
+            self.declare(param_name, param_type)
+        self.declare(node.name, node.return_type)
+        for var_name, var_type in node.local_decls:
+            self.declare(var_name, var_type)
+        yield from self.check_block(node.body)
+        self.pop_scope()
+
+    @visits("check", ProcedureDeclNode)
+    def _check_procedure_decl(self, node: ProcedureDeclNode) -> Iterator:
+        self.push_scope()
+        for param_name, param_type in node.params:
+            self.declare(param_name, param_type)
+        for var_name, var_type in node.local_decls:
+            self.declare(var_name, var_type)
+        yield from self.check_block(node.body)
+        self.pop_scope()
+
+    @visits("check", CaseStatementNode)
+    def _check_case_statement(self, node: CaseStatementNode) -> Iterator:
+        expr_type = yield self.infer(node.expression)
+        for labels, block in node.cases:
+            for label in labels:
+                label_type = yield self.infer(label)
+                if label_type != expr_type:
+                    raise self.error(
+                        TypeError,
+                        f"Тип метки {label_type} "
+                        f"не соответствует {expr_type}",
+                        label,
+                    )
+            yield from self.check_block(block)
+        if node.else_block:
+            yield from self.check_block(node.else_block)
 
-        if isinstance(node, FunctionCallNode):
-            self.check_call(
-                node.name,
-                node.args,
-                allow_procedure=False,
-                allow_function=True,
-                node=node,
-            )
-            return
+    @visits("check", BinOperatorNode)
+    def _check_assignment(self, node: BinOperatorNode):
+        if node.operator.type != ASSIGN:
+            return None
 
-        if isinstance(node, FunctionDeclNode):
-            self.push_scope()
-            for param_name, param_type in node.params:
-                self.declare(param_name, param_type)
-            self.declare(node.name, node.return_type)
-            for var_name, var_type in node.local_decls:
-                self.declare(var_name, var_type)
-            for stmt in node.body.body:
-                self.check_node(stmt)
-            self.pop_scope()
-            return
+        if isinstance(node.leftNode, ArrayAccessNode):
+            return self.check_array_assignment(node)
 
-        if isinstance(node, ProcedureDeclNode):
-            self.push_scope()
-            for param_name, param_type in node.params:
-                self.declare(param_name, param_type)
-            for var_name, var_type in node.local_decls:
-                self.declare(var_name, var_type)
-            for stmt in node.body.body:
-                self.check_node(stmt)
-            self.pop_scope()
-            return
+        var_name = node.leftNode.value.value
+        if self.assigned:
+            self.assigned[-1].add(var_name)
+        if self.bind(node.leftNode, var_name) is None:
+            raise self.error(
+                NameError, f"Переменная {var_name} не объявлена", node.leftNode
+            )
 
-        if isinstance(node, CaseStatementNode):
-            expr_type = self.infer_type(node.expression)
-            for labels, block in node.cases:
-                for label in labels:
-                    label_type = self.infer_type(label)
-                    if label_type != expr_type:
-                        raise TypeError(
-                            self.format_error(
-                                f"Тип метки {label_type} "
-                                f"не соответствует {expr_type}",
-                                label,
-                            )
-                        )
-                for stmt in block.body:
-                    self.check_node(stmt)
-            if node.else_block:
-                for stmt in node.else_block.body:
-                    self.check_node(stmt)
-
-    def _check_assignment(self, node: BinOperatorNode) -> None:
-        if node.operator.type != "ASSIGN":
-            return
+        expr_type = self.infer(node.rightNode)
+        if expr_type.__class__ is GeneratorType:
+            return self.resolve_assignment(node, expr_type)
+        self.assignment_type(node, expr_type)
+        return None
 
-        if isinstance(node.leftNode, ArrayAccessNode):
-            arr_name = node.leftNode.name
-            arr_type = self.lookup(arr_name)
-            if arr_type is None or not self.is_array_type(arr_type):
-                raise NameError(
-                    self.format_error(
-                        f"Переменная {arr_name} не объявлена как массив",
-                        node.leftNode,
-                    )
-                )
+    def resolve_assignment(self, node: BinOperatorNode, task) -> Iterator:
+        expr_type = yield task
+        self.assignment_type(node, expr_type)
 
-            index_type = self.infer_type(node.leftNode.index)
-            if index_type != "integer":
-                raise TypeError(
-                    self.format_error(
-                        "Индекс массива должен быть integer",
-                        node.leftNode.index,
-                    )
-                )
+    def assignment_type(self, node: BinOperatorNode, expr_type) -> None:
+        var_type = node.leftNode.symbol.type
+        node.leftNode.expr_type = var_type
+        if expr_type != var_type:
+            raise self.error(
+                TypeError,
+                f"Тип {expr_type} не соответствует {var_type}",
+                node.rightNode,
+            )
 
-            expr_type = self.infer_type(node.rightNode)
-            elem_type = arr_type["elem"]
-            if expr_type != elem_type:
-                raise TypeError(
-                    self.format_error(
-                        f"Тип {expr_type} не соответствует {elem_type}",
-                        node.rightNode,
-                    )
-                )
-            return
+    def check_array_assignment(self, node: BinOperatorNode) -> Iterator:
+        arr_name = node.leftNode.name
+        if self.assigned:
+            self.assigned[-1].add(arr_name)
+        symbol = self.bind(node.leftNode, arr_name)
+        arr_type = symbol.type if symbol is not None else None
+        if arr_type is None or not self.is_array_type(arr_type):
+            raise self.error(
+                NameError,
+                f"Переменная {arr_name} не объявлена как массив",
+                node.leftNode,
+            )
 
-        var_name = node.leftNode.value.value
-        if self.lookup(var_name) is None:
-            raise NameError(
-                self.format_error(
-                    f"Переменная {var_name} не объявлена",
-                    node.leftNode,
-                )
+        index_type = yield self.infer(node.leftNode.index)
+        if index_type != "integer":
+            raise self.error(
+                TypeError,
+                "Индекс массива должен быть integer",
+                node.leftNode.index,
             )
 
-        expr_type = self.infer_type(node.rightNode)
-        var_type = self.lookup(var_name)
-        if expr_type != var_type:
-            raise TypeError(
-                self.format_error(
-                    f"Тип {expr_type} не соответствует {var_type}",
-                    node.rightNode,
-                )
+        expr_type = yield self.infer(node.rightNode)
+        elem_type = arr_type["elem"]
+        node.leftNode.expr_type = elem_type
+        if expr_type != elem_type:
+            raise self.error(
+                TypeError,
+                f"Тип {expr_type} не соответствует {elem_type}",
+                node.rightNode,
             )
 
-    def _check_for_statement(self, node: ForStatementNode) -> None:
+    @visits("check", ForStatementNode)
+    def _check_for_statement(self, node: ForStatementNode) -> Iterator:
         var_name = node.var_token.value
+        symbol = self.resolve(var_name)
 
-        if self.lookup(var_name) is None:
-            raise NameError(
-                self.format_error(
-                    f"Переменная {var_name} не объявлена",
-                    ValueNode(node.var_token),
-                )
+        if symbol is None:
+            raise self.error(
+                NameError,
+                f"Переменная {var_name} не объявлена",
+                ValueNode(node.var_token),
             )
-        if self.lookup(var_name) != "integer":
-            raise TypeError(
-                self.format_error(
-                    f"Переменная цикла {var_name} должна быть типа integer",
-                    ValueNode(node.var_token),
-                )
+        if symbol.type != "integer":
+            raise self.error(
+                TypeError,
+                f"Переменная цикла {var_name} должна быть типа integer",
+                ValueNode(node.var_token),
             )
 
-        start_type = self.infer_type(node.start_expr)
-        end_type = self.infer_type(node.end_expr)
+        start_type = yield self.infer(node.start_expr)
+        end_type = yield self.infer(node.end_expr)
         if start_type != "integer" or end_type != "integer":
-            raise TypeError(
-                self.format_error(
-                    "Границы цикла for должны быть integer, "
-                    f"получено: {start_type} и {end_type}",
-                    node,
-                )
+            raise self.error(
+                TypeError,
+                "Границы цикла for должны быть integer, "
+                f"получено: {start_type} и {end_type}",
+                node,
             )
 
         self.in_loop = True
-        for stmt in node.body.body:
-            self.check_node(stmt)
+        self.assigned.append({var_name})
+        try:
+            yield from self.check_block(node.body)
+        finally:
+            assigned = self.assigned.pop()
+            if self.assigned:
+                self.assigned[-1] |= assigned
+        node.assigned = frozenset(assigned)
         self.in_loop = False
 
     def check_expression(self, node: ExpressionNode) -> None:
-        if isinstance(node, BinOperatorNode):
-            left_type = self.infer_type(node.leftNode)
-            right_type = self.infer_type(node.rightNode)
-            if node.operator.value in ["+", "-", "*", "/", "div", "mod"]:
-                if (
-                    left_type not in ["integer", "real"]
-                    or right_type not in ["integer", "real"]
-                ):
-                    raise TypeError(
-                        self.format_error(
-                            "Арифметические операции требуют числовые типы",
-                            node,
-                        )
-                    )
-                if left_type != right_type:
-                    raise TypeError(
-                        self.format_error(
-                            "Арифметические операции требуют "
-                            "одинаковые числовые типы",
-                            node,
-                        )
-                    )
-                if (
-                    node.operator.value in ["div", "mod"]
-                    and left_type != "integer"
-                ):
-                    raise TypeError(
-                        self.format_error(
-                            "Операции div/mod требуют integer",
-                            node,
-                        )
-                    )
-            return
-
-        if (
-            isinstance(node, UnaryOperatorNode)
-            and node.operator.value.lower() == "not"
-            and self.infer_type(node.operand) != "boolean"
-        ):
-            raise TypeError(
-                self.format_error("Оператор not требует boolean", node)
-            )
+        self.infer_type(node)
 
     def infer_type(self, node: ExpressionNode) -> str:
-        if isinstance(node, ValueNode):
-            if node.value.type == "NUMBER":
-                return "real" if "." in node.value.value else "integer"
-            if node.value.type == "STRING":
-                return "string"
-            if node.value.type == "BOOL_LIT":
-                return "boolean"
-            if node.value.type == "CHAR_LIT":
-                return "char"
-            if node.value.type == "IDENTIFIER":
-                return self.lookup(node.value.value) or "unknown"
-
-        elif isinstance(node, ArrayAccessNode):
-            arr_type = self.lookup(node.name)
-            if arr_type is None or not self.is_array_type(arr_type):
-                raise NameError(
-                    self.format_error(
-                        f"Массив {node.name} не объявлен",
-                        node,
-                    )
+        return self.run(self.infer(node))
+
+    def infer(self, node: ExpressionNode):
+        expr_type = node.expr_type
+        if expr_type is not None:
+            return expr_type
+        expr_type = self._infer_type(node)
+        if expr_type.__class__ is not GeneratorType:
+            node.expr_type = expr_type
+        return expr_type
+
+    def _infer_type(self, node: ExpressionNode):
+        handler = self.dispatch["infer"][node.__class__]
+        if handler is None:
+            return "unknown"
+        return handler(self, node)
+
+    @visits("infer", ValueNode)
+    def _infer_value(self, node: ValueNode) -> str:
+        if node.value.type == NUMBER:
+            return "real" if "." in node.value.value else "integer"
+        if node.value.type == STRING:
+            return "string"
+        if node.value.type == BOOL_LIT:
+            return "boolean"
+        if node.value.type == CHAR_LIT:
+            return "char"
+        if node.value.type == IDENTIFIER:
+            symbol = node.symbol
+            if symbol is None:
+                symbol = node.symbol = self.symbols.get(node.value.value)
+                if symbol is None:
+                    return "unknown"
+            return symbol.type
+        return "unknown"
+
+    @visits("infer", ArrayAccessNode)
+    def _infer_array_access(self, node: ArrayAccessNode) -> Iterator:
+        symbol = self.bind(node, node.name)
+        arr_type = symbol.type if symbol is not None else None
+        if arr_type is None or not self.is_array_type(arr_type):
+            raise self.error(
+                NameError, f"Массив {node.name} не объявлен", node
+            )
+        index_type = self.infer(node.index)
+        if index_type.__class__ is GeneratorType:
+            index_type = yield index_type
+        if index_type != "integer":
+            raise self.error(
+                TypeError, "Индекс массива должен быть integer", node.index
+            )
+        node.expr_type = arr_type["elem"]
+        return node.expr_type
+
+    @visits("infer", UnaryOperatorNode)
+    def _infer_unary_operator(self, node: UnaryOperatorNode):
+        if node.operand.__class__ is ValueNode:
+            return self.unary_operator_type(node, self.infer(node.operand))
+        return self.resolve_unary_operator(node)
+
+    def resolve_unary_operator(self, node: UnaryOperatorNode) -> Iterator:
+        op_type = self.infer(node.operand)
+        if op_type.__class__ is GeneratorType:
+            op_type = yield op_type
+        node.expr_type = self.unary_operator_type(node, op_type)
+        return node.expr_type
+
+    def unary_operator_type(self, node: UnaryOperatorNode, op_type) -> str:
+        if node.operator.value.lower() == "not":
+            if op_type != "boolean":
+                raise self.error(
+                    TypeError, "Оператор not требует boolean", node
                 )
-            index_type = self.infer_type(node.index)
-            if index_type != "integer":
-                raise TypeError(
-                    self.format_error(
-                        "Индекс массива должен быть integer",
-                        node.index,
-                    )
+            return "boolean"
+        if node.operator.value == "-":
+            if op_type not in ["integer", "real"]:
+                raise self.error(
+                    TypeError, "Унарный минус требует числовой тип", node
                 )
-            return arr_type["elem"]
-
-        elif isinstance(node, UnaryOperatorNode):
-            if node.operator.value.lower() == "not":
-                if self.infer_type(node.operand) != "boolean":
-                    raise TypeError(
-                        self.format_error("Оператор not требует boolean", node)
-                    )
-                return "boolean"
-            if node.operator.value == "-":
-                op_type = self.infer_type(node.operand)
-                if op_type not in ["integer", "real"]:
-                    raise TypeError(
-                        self.format_error(
-                            "Унарный минус требует числовой тип",
-                            node,
-                        )
-                    )
-                return op_type
-            return "unknown"
+            return op_type
+        return "unknown"
 
-        elif isinstance(node, FunctionCallNode):
-            if node.name not in self.functions:
-                if node.name in self.procedures:
-                    raise TypeError(
-                        self.format_error(
-                            f"{node.name} является процедурой "
-                            "и не может использоваться как функция",
-                            node,
-                        )
-                    )
-                raise NameError(
-                    self.format_error(
-                        f"Функция {node.name} не объявлена",
-                        node,
-                    )
+    @visits("infer", FunctionCallNode)
+    def _infer_function_call(self, node: FunctionCallNode) -> Iterator:
+        if node.name not in self.functions:
+            if node.name in self.procedures:
+                raise self.error(
+                    TypeError,
+                    f"{node.name} является процедурой "
+                    "и не может использоваться как функция",
+                    node,
                 )
-            self.check_call(
-                node.name,
-                node.args,
-                allow_procedure=False,
-                allow_function=True,
-                node=node,
+            raise self.error(
+                NameError, f"Функция {node.name} не объявлена", node
             )
-            return self.functions[node.name]["return_type"]
-
-        elif isinstance(node, BinOperatorNode):
-            left_type = self.infer_type(node.leftNode)
-            right_type = self.infer_type(node.rightNode)
-
-            op_value = node.operator.value.lower()
-            if op_value in ["and", "or", "xor"]:
-                if left_type != "boolean" or right_type != "boolean":
-                    raise TypeError(
-                        self.format_error(
-                            "Логические операторы требуют boolean, "
-                            f"получено {left_type} и {right_type}",
-                            node,
-                        )
-                    )
-                return "boolean"
-
-            if node.operator.value in [
-                "==",
-                "!=",
-                "<",
-                ">",
-                "<=",
-                ">=",
-                "=",
-                "<>",
-            ]:
-                if (
-                    self.is_array_type(left_type)
-                    or self.is_array_type(right_type)
-                ):
-                    raise TypeError(
-                        self.format_error(
-                            "Сравнение массивов не поддерживается",
-                            node,
-                        )
-                    )
-                if left_type != right_type:
-                    raise TypeError(
-                        self.format_error(
-                            f"Сравнение типов {left_type} "
-                            f"и {right_type} невозможно",
-                            node,
-                        )
-                    )
-                return "boolean"
-
-            if node.operator.value in ["+", "-", "*", "/", "div", "mod"]:
-                if self.is_array_type(left_type) or self.is_array_type(
-                    right_type
-                ):
-                    raise TypeError(
-                        self.format_error(
-                            "Арифметика с массивами не поддерживается",
-                            node,
-                        )
-                    )
-                if (
-                    left_type not in ["integer", "real"]
-                    or right_type not in ["integer", "real"]
-                ):
-                    raise TypeError(
-                        self.format_error(
-                            "Арифметические операции требуют "
-                            f"числовые типы, получено {left_type} "
-                            f"и {right_type}",
-                            node,
-                        )
-                    )
-                if left_type != right_type:
-                    raise TypeError(
-                        self.format_error(
-                            "Арифметические операции требуют одинаковые "
-                            f"типы, получено {left_type} и {right_type}",
-                            node,
-                        )
-                    )
-                if (
-                    node.operator.value in ["div", "mod"]
-                    and left_type != "integer"
-                ):
-                    raise TypeError(
-                        self.format_error(
-                            "Операции div/mod требуют integer",
-                            node,
-                        )
-                    )
-                return left_type
+        yield from self.check_call(
+            node.name,
+            node.args,
+            allow_procedure=False,
+            allow_function=True,
+            node=node,
+        )
+        node.expr_type = self.functions[node.name]["return_type"]
+        return node.expr_type
+
+    @visits("infer", BinOperatorNode)
+    def _infer_bin_operator(self, node: BinOperatorNode):
+        left = node.leftNode
+        right = node.rightNode
+        if left.__class__ is ValueNode and right.__class__ is ValueNode:
+            return self.bin_operator_type(
+                node, self.infer(left), self.infer(right)
+            )
+        return self.resolve_bin_operator(node)
+
+    def resolve_bin_operator(self, node: BinOperatorNode) -> Iterator:
+        left_type = self.infer(node.leftNode)
+        if left_type.__class__ is GeneratorType:
+            left_type = yield left_type
+        right_type = self.infer(node.rightNode)
+        if right_type.__class__ is GeneratorType:
+            right_type = yield right_type
+        node.expr_type = self.bin_operator_type(node, left_type, right_type)
+        return node.expr_type
+
+    def bin_operator_type(
+        self,
+        node: BinOperatorNode,
+        left_type,
+        right_type,
+    ) -> str:
+        op_value = node.operator.value.lower()
+        if op_value in ["and", "or", "xor"]:
+            if left_type != "boolean" or right_type != "boolean":
+                raise self.error(
+                    TypeError,
+                    "Логические операторы требуют boolean, "
+                    f"получено {left_type} и {right_type}",
+                    node,
+                )
+            return "boolean"
+
+        if node.operator.value in [
+            "==",
+            "!=",
+            "<",
+            ">",
+            "<=",
+            ">=",
+            "=",
+            "<>",
+        ]:
+            if (
+                self.is_array_type(left_type)
+                or self.is_array_type(right_type)
+            ):
+                raise self.error(
+                    TypeError, "Сравнение массивов не поддерживается", node
+                )
+            if left_type != right_type:
+                raise self.error(
+                    TypeError,
+                    f"Сравнение типов {left_type} "
+                    f"и {right_type} невозможно",
+                    node,
+                )
+            return "boolean"
+
+        if node.operator.value in ["+", "-", "*", "/", "div", "mod"]:
+            if self.is_array_type(left_type) or self.is_array_type(
+                right_type
+            ):
+                raise self.error(
+                    TypeError, "Арифметика с массивами не поддерживается", node
+                )
+            if (
+                left_type not in ["integer", "real"]
+                or right_type not in ["integer", "real"]
+            ):
+                raise self.error(
+                    TypeError,
+                    "Арифметические операции требуют "
+                    f"числовые типы, получено {left_type} "
+                    f"и {right_type}",
+                    node,
+                )
+            if left_type != right_type:
+                raise self.error(
+                    TypeError,
+                    "Арифметические операции требуют одинаковые "
+                    f"типы, получено {left_type} и {right_type}",
+                    node,
+                )
+            if (
+                node.operator.value in ["div", "mod"]
+                and left_type != "integer"
+            ):
+                raise self.error(
+                    TypeError, "Операции div/mod требуют integer", node
+                )
+            return left_type
 
         return "unknown"
 
@@ -515,59 +614,54 @@ class SemanticAnalyzer:
         allow_procedure: bool,
         allow_function: bool,
         node: ExpressionNode = None,
-    ) -> None:
+    ) -> Iterator:
         if name in self.procedures:
             if not allow_procedure:
-                raise TypeError(
-                    self.format_error(
-                        f"{name} является процедурой "
-                        "и не может использоваться как функция",
-                        node,
-                    )
+                raise self.error(
+                    TypeError,
+                    f"{name} является процедурой "
+                    "и не может использоваться как функция",
+                    node,
                 )
             signature = self.procedures[name]
         elif name in self.functions:
             if not allow_function:
-                raise TypeError(
-                    self.format_error(
-                        f"{name} является функцией "
-                        "и не может использоваться как процедура",
-                        node,
-                    )
+                raise self.error(
+                    TypeError,
+                    f"{name} является функцией "
+                    "и не может использоваться как процедура",
+                    node,
                 )
             signature = self.functions[name]
         else:
-            raise NameError(
-                self.format_error(
-                    f"Процедура/функция {name} не объявлена",
-                    node,
-                )
+            raise self.error(
+                NameError, f"Процедура/функция {name} не объявлена", node
             )
 
         params = signature["params"]
         if len(args) != len(params):
-            raise TypeError(
-                self.format_error(
-                    f"Неверное количество аргументов при вызове {name}",
-                    node,
-                )
+            raise self.error(
+                TypeError,
+                f"Неверное количество аргументов при вызове {name}",
+                node,
             )
         for arg, (_, param_type) in zip(args, params):
-            arg_type = self.infer_type(arg)
+            arg_type = self.infer(arg)
+            if arg_type.__class__ is GeneratorType:
+                arg_type = yield arg_type
             if arg_type != param_type:
-                raise TypeError(
-                    self.format_error(
-                        f"Тип аргумента {arg_type} "
-                        f"не соответствует {param_type}",
-                        arg,
-                    )
+                raise self.error(
+                    TypeError,
+                    f"Тип аргумента {arg_type} "
+                    f"не соответствует {param_type}",
+                    arg,
                 )
 
     def is_array_type(self, type_) -> bool:
         return isinstance(type_, dict) and type_.get("kind") == "array"
 
-    def check_condition(self, condition: ExpressionNode) -> None:
-        if self.infer_type(condition) != "boolean":
-            raise TypeError(
-                self.format_error("Условие должно быть логическим", condition)
+    def check_condition(self, condition: ExpressionNode) -> Iterator:
+        if (yield self.infer(condition)) != "boolean":
+            raise self.error(
+                TypeError, "Условие должно быть логическим", condition
             )
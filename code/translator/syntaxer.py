@@ -1,4 +1,54 @@
-from lexer import Token
+from collections import deque
+from typing import Iterable, Iterator
+
+from lexer import (
+    ARRAY,
+    ASSIGN,
+    BEGIN,
+    BOOLEAN,
+    BOOL_LIT,
+    CASE,
+    CHAR,
+    CHAR_LIT,
+    COLON,
+    COMMA,
+    DO,
+    DOT,
+    DOWNTO,
+    ELSE,
+    END,
+    FOR,
+    FUNCTION,
+    IDENTIFIER,
+    IF,
+    INTEGER,
+    LBRACKET,
+    LPAR,
+    NOT,
+    NUMBER,
+    OF,
+    OPERATOR,
+    PROCEDURE,
+    PROGRAM,
+    RANGE,
+    RBRACKET,
+    READ,
+    READLN,
+    REAL,
+    REPEAT,
+    RPAR,
+    SEMICOLON,
+    STRING,
+    THEN,
+    TO,
+    UNTIL,
+    VAR,
+    WHILE,
+    WRITELN,
+    Token,
+    TokenKind,
+    located,
+)
 from nodes import (
     ArrayAccessNode,
     BinOperatorNode,
@@ -19,45 +69,65 @@ from nodes import (
     VarDeclarationNode,
     WhileStatementNode,
 )
+from operators import UNARY_PRECEDENCE, binary_precedence
+from visitor import NodeVisitor, visits
+
+PREFIX_TOKENS = frozenset((NOT, OPERATOR, LPAR))
+ARGUMENT_OPENERS = frozenset((LPAR, LBRACKET))
+ROUTINE_TOKENS = frozenset((FUNCTION, PROCEDURE))
+TYPE_TOKENS = frozenset((INTEGER, STRING, BOOLEAN, REAL, CHAR))
+LITERAL_TOKENS = frozenset((NUMBER, STRING, BOOL_LIT, CHAR_LIT))
+CASE_LABEL_TOKENS = LITERAL_TOKENS | {IDENTIFIER}
+CASE_END = frozenset((ELSE, END))
+FOR_DIRECTIONS = frozenset((TO, DOWNTO))
+SYNC_TOKENS = frozenset((SEMICOLON, END))
+
 
+class SyntaxAnalyzer(NodeVisitor):
+    depth_error = SyntaxError
 
-class SyntaxAnalyzer:
-    def __init__(self, tokens: list) -> None:
-        self.tokens = tokens
-        self.pos = 0
+    def __init__(self, tokens: Iterable[Token]) -> None:
+        self.reset(tokens)
+
+    def reset(self, tokens: Iterable[Token]) -> None:
+        self.tokens = iter(tokens)
+        self.lookahead = deque()
         self.current_token: Token = None
+        self.errors = []
+        self.stalled = None
         self.advance()
 
     def peek(self) -> Token:
-        if self.pos < len(self.tokens):
-            return self.tokens[self.pos]
-        return None
+        if not self.lookahead:
+            token = next(self.tokens, None)
+            if token is None:
+                return None
+            self.lookahead.append(token)
+        return self.lookahead[0]
 
     def advance(self) -> None:
-        if self.pos < len(self.tokens):
-            self.current_token = self.tokens[self.pos]
-            self.pos += 1
+        if self.lookahead:
+            self.current_token = self.lookahead.popleft()
         else:
-            self.current_token = None
+            self.current_token = next(self.tokens, None)
 
-    def match(self, token_type: str) -> bool:
+    def match(self, token_type: TokenKind) -> bool:
         if self.current_token and self.current_token.type == token_type:
             self.advance()
             return True
         return False
 
-    def require(self, token_type: str) -> Token:
+    def require(self, token_type: TokenKind) -> Token:
         if self.current_token and self.current_token.type == token_type:
             token = self.current_token
             self.advance()
             return token
 
         current_type = self.current_token.type if self.current_token else "EOF"
-        raise SyntaxError(
-            self.format_error(
-                f"Ожидается {token_type}, но получен {current_type}",
-                self.current_token,
-            )
+        raise self.error(
+            SyntaxError,
+            f"Ожидается {token_type}, но получен {current_type}",
+            self.current_token,
         )
 
     def format_error(self, message: str, token: Token = None) -> str:
@@ -65,57 +135,95 @@ class SyntaxAnalyzer:
             return f"{message} (строка {token.line}, колонка {token.column})"
         return f"{message} (строка ?, колонка ?)"
 
+    def error(
+        self, kind: type, message: str, token: Token = None
+    ) -> Exception:
+        return located(
+            kind(self.format_error(message, token)),
+            token.position if token else None,
+        )
+
+    def depth_position(self, request, stack: list):
+        if self.current_token is None:
+            return None
+        return self.current_token.position
+
+    def synchronize(self, err: SyntaxError) -> None:
+        if (
+            self.current_token is None
+            or err is getattr(self.tokens, "error", None)
+        ):
+            raise err
+        if self.current_token is self.stalled:
+            self.advance()
+        else:
+            self.record_error(err)
+        while (
+            self.current_token is not None
+            and self.current_token.type not in SYNC_TOKENS
+        ):
+            self.advance()
+        self.stalled = None
+        if self.current_token is None:
+            raise self.error(SyntaxError, "Неожиданный конец файла")
+        if self.current_token.type == SEMICOLON:
+            self.advance()
+        else:
+            self.stalled = self.current_token
+
     def parse_program(self) -> ProgramNode:
-        self.require("PROGRAM")
-        self.require("IDENTIFIER")
-        self.require("SEMICOLON")
+        return self.run(self._parse_program())
+
+    def parse_routine_declaration(self) -> ExpressionNode:
+        return self.run(self._parse_routine_declaration())
+
+    def parse_statement(self) -> ExpressionNode:
+        return self.run(self._parse_statement())
+
+    def parse_block(self) -> BlockNode:
+        return self.run(self._parse_block())
+
+    def _parse_program(self) -> Iterator:
+        self.require(PROGRAM)
+        self.require(IDENTIFIER)
+        self.require(SEMICOLON)
 
         global_decls = []
         routines = []
 
-        if self.current_token and self.current_token.type == "VAR":
+        if self.current_token and self.current_token.type == VAR:
             global_decls = self.parse_var_declaration()
 
-        while self.current_token and self.current_token.type in [
-            "FUNCTION",
-            "PROCEDURE",
-        ]:
-            routines.append(self.parse_routine_declaration())
+        while self.current_token and self.current_token.type in ROUTINE_TOKENS:
+            routines.append((yield self._parse_routine_declaration()))
 
-        main_block = self.parse_block()
-        self.require("DOT")
+        main_block = yield self._parse_block()
+        self.require(DOT)
         return ProgramNode(global_decls, routines, main_block)
 
-    def parse_routine_declaration(self) -> ExpressionNode:
-        if self.current_token.type == "FUNCTION":
+    def _parse_routine_declaration(self) -> Iterator:
+        if self.current_token.type == FUNCTION:
             self.advance()
-            name = self.require("IDENTIFIER").value
+            name = self.require(IDENTIFIER).value
             params = self.parse_params()
-            self.require("COLON")
-            if self.current_token.type not in [
-                "INTEGER",
-                "STRING",
-                "BOOLEAN",
-                "REAL",
-                "CHAR",
-            ]:
-                raise SyntaxError(
-                    self.format_error(
-                        "Неверный тип возвращаемого значения: "
-                        f"{self.current_token.value}",
-                        self.current_token,
-                    )
+            self.require(COLON)
+            if self.current_token.type not in TYPE_TOKENS:
+                raise self.error(
+                    SyntaxError,
+                    "Неверный тип возвращаемого значения: "
+                    f"{self.current_token.value}",
+                    self.current_token,
                 )
             return_type = self.current_token.value.lower()
             self.advance()
-            self.require("SEMICOLON")
+            self.require(SEMICOLON)
 
             local_decls = []
-            if self.current_token and self.current_token.type == "VAR":
+            if self.current_token and self.current_token.type == VAR:
                 local_decls = self.parse_var_declaration()
 
-            body = self.parse_block()
-            self.require("SEMICOLON")
+            body = yield self._parse_block()
+            self.require(SEMICOLON)
             return FunctionDeclNode(
                 name,
                 params,
@@ -124,253 +232,261 @@ class SyntaxAnalyzer:
                 body,
             )
 
-        if self.current_token.type == "PROCEDURE":
+        if self.current_token.type == PROCEDURE:
             self.advance()
-            name = self.require("IDENTIFIER").value
+            name = self.require(IDENTIFIER).value
             params = self.parse_params()
-            self.require("SEMICOLON")
+            self.require(SEMICOLON)
 
             local_decls = []
-            if self.current_token and self.current_token.type == "VAR":
+            if self.current_token and self.current_token.type == VAR:
                 local_decls = self.parse_var_declaration()
 
-            body = self.parse_block()
-            self.require("SEMICOLON")
+            body = yield self._parse_block()
+            self.require(SEMICOLON)
             return ProcedureDeclNode(name, params, local_decls, body)
 
-        raise SyntaxError(
-            self.format_error(
-                "Ожидается FUNCTION или PROCEDURE, "
-                f"получено {self.current_token.type}",
-                self.current_token,
-            )
+        raise self.error(
+            SyntaxError,
+            "Ожидается FUNCTION или PROCEDURE, "
+            f"получено {self.current_token.type}",
+            self.current_token,
         )
 
     def parse_var_declaration(self) -> list:
-        self.require("VAR")
+        self.require(VAR)
         declarations = []
-        while self.current_token.type == "IDENTIFIER":
+        while self.current_token.type == IDENTIFIER:
             names = [self.current_token.value]
             self.advance()
-            while self.match("COMMA"):
-                names.append(self.require("IDENTIFIER").value)
-            self.require("COLON")
+            while self.match(COMMA):
+                names.append(self.require(IDENTIFIER).value)
+            self.require(COLON)
             var_type = self.parse_type(allow_array=True)
             for var_name in names:
                 declarations.append((var_name, var_type))
-            self.require("SEMICOLON")
+            self.require(SEMICOLON)
         return declarations
 
     def parse_params(self) -> list:
         params = []
-        if not self.match("LPAR"):
+        if not self.match(LPAR):
             return params
 
-        if self.current_token.type == "RPAR":
+        if self.current_token.type == RPAR:
             self.advance()
             return params
 
         while True:
-            names = [self.require("IDENTIFIER").value]
-            while self.match("COMMA"):
-                names.append(self.require("IDENTIFIER").value)
-            self.require("COLON")
+            names = [self.require(IDENTIFIER).value]
+            while self.match(COMMA):
+                names.append(self.require(IDENTIFIER).value)
+            self.require(COLON)
             param_type = self.parse_type(allow_array=False)
             for name in names:
                 params.append((name, param_type))
-            if self.match("SEMICOLON"):
+            if self.match(SEMICOLON):
                 continue
             break
 
-        self.require("RPAR")
+        self.require(RPAR)
         return params
 
-    def parse_statement(self) -> ExpressionNode:
-        if self.current_token.type == "IDENTIFIER":
-            if self.peek() and self.peek().type == "LPAR":
+    def _parse_statement(self):
+        if self.current_token.type == IDENTIFIER:
+            if self.peek() and self.peek().type == LPAR:
                 return self.parse_procedure_call()
             var_node = self.parse_lvalue()
-            self.require("ASSIGN")
+            self.require(ASSIGN)
             expr_node = self.parse_expression()
             return BinOperatorNode(
-                Token("ASSIGN", ":=", 0, 0),
+                Token(ASSIGN, ":=", 0),
                 var_node,
                 expr_node,
             )
 
-        if self.current_token.type == "WRITELN":
+        if self.current_token.type == WRITELN:
             self.advance()
-            self.require("LPAR")
+            self.require(LPAR)
             args = []
-            while not self.match("RPAR"):
+            while not self.match(RPAR):
                 args.append(self.parse_expression())
-                if self.match("COMMA"):
+                if self.match(COMMA):
                     continue
             return ProcedureCallNode("writeln", args)
 
-        if self.current_token.type == "IF":
+        if self.current_token.type in (READ, READLN):
+            token = self.current_token
             self.advance()
-            condition = self.parse_expression()
-            self.require("THEN")
-            then_block = self.parse_statement_block()
-
-            else_block = None
-            if self.match("ELSE"):
-                else_block = self.parse_statement_block()
+            args = []
+            if self.match(LPAR):
+                while not self.match(RPAR):
+                    args.append(self.parse_lvalue())
+                    if self.match(COMMA):
+                        continue
+            return ProcedureCallNode(token.value.lower(), args, token)
 
-            return IfStatementNode(condition, then_block, else_block)
+        if self.current_token.type == IF:
+            return self.parse_if_statement()
 
-        if self.current_token.type == "WHILE":
-            self.advance()
-            condition = self.parse_expression()
-            self.require("DO")
-            body = self.parse_statement_block()
-            return WhileStatementNode(condition, body)
+        if self.current_token.type == WHILE:
+            return self.parse_while_statement()
 
-        if self.current_token.type == "FOR":
+        if self.current_token.type == FOR:
             return self.parse_for_statement()
 
-        if self.current_token.type == "REPEAT":
+        if self.current_token.type == REPEAT:
             return self.parse_repeat_until_statement()
 
-        if self.current_token.type == "CASE":
+        if self.current_token.type == CASE:
             return self.parse_case_statement()
 
-        raise SyntaxError(
-            self.format_error(
-                f"Неизвестный оператор: {self.current_token.type}",
-                self.current_token,
-            )
+        raise self.error(
+            SyntaxError,
+            f"Неизвестный оператор: {self.current_token.type}",
+            self.current_token,
         )
 
-    def parse_statement_block(self) -> BlockNode:
+    def parse_if_statement(self) -> Iterator:
+        self.require(IF)
+        condition = self.parse_expression()
+        self.require(THEN)
+        then_block = yield self.parse_statement_block()
+
+        else_block = None
+        if self.match(ELSE):
+            else_block = yield self.parse_statement_block()
+
+        return IfStatementNode(condition, then_block, else_block)
+
+    def parse_while_statement(self) -> Iterator:
+        self.require(WHILE)
+        condition = self.parse_expression()
+        self.require(DO)
+        body = yield self.parse_statement_block()
+        return WhileStatementNode(condition, body)
+
+    def parse_statement_block(self) -> Iterator:
         block = BlockNode()
-        if self.match("BEGIN"):
-            while not self.match("END"):
-                block.addNode(self.parse_statement())
-                self.require("SEMICOLON")
+        if self.match(BEGIN):
+            while not self.match(END):
+                try:
+                    block.addNode((yield self._parse_statement()))
+                    self.require(SEMICOLON)
+                except SyntaxError as err:
+                    self.synchronize(err)
             return block
-        block.addNode(self.parse_statement())
+        block.addNode((yield self._parse_statement()))
         return block
 
     def parse_term(self) -> ExpressionNode:
-        if self.current_token.type in [
-            "NUMBER",
-            "STRING",
-            "BOOL_LIT",
-            "CHAR_LIT",
-        ]:
+        if self.current_token.type in LITERAL_TOKENS:
             node = ValueNode(self.current_token)
             self.advance()
             return node
 
-        if self.current_token.type == "IDENTIFIER":
-            if self.peek() and self.peek().type == "LPAR":
-                return self.parse_function_call()
-            if self.peek() and self.peek().type == "LBRACKET":
-                return self.parse_array_access()
+        if self.current_token.type == IDENTIFIER:
             node = ValueNode(self.current_token)
             self.advance()
             return node
 
-        if self.match("LPAR"):
-            node = self.parse_expression()
-            self.require("RPAR")
-            return node
-
-        raise SyntaxError(
-            self.format_error(
-                f"Недопустимый терм: {self.current_token.type}",
-                self.current_token,
-            )
+        raise self.error(
+            SyntaxError,
+            f"Недопустимый терм: {self.current_token.type}",
+            self.current_token,
         )
 
     def parse_expression(self) -> ExpressionNode:
-        return self.parse_or()
-
-    def parse_or(self) -> ExpressionNode:
-        node = self.parse_and()
-        while (
-            self.current_token
-            and self.current_token.type == "OPERATOR"
-            and self.current_token.value.lower() in ["or", "xor"]
-        ):
-            op_token = self.current_token
-            self.advance()
-            node = BinOperatorNode(op_token, node, self.parse_and())
-        return node
-
-    def parse_and(self) -> ExpressionNode:
-        node = self.parse_compare()
-        while (
-            self.current_token
-            and self.current_token.type == "OPERATOR"
-            and self.current_token.value.lower() == "and"
-        ):
-            op_token = self.current_token
-            self.advance()
-            node = BinOperatorNode(op_token, node, self.parse_compare())
-        return node
-
-    def parse_compare(self) -> ExpressionNode:
-        node = self.parse_add()
-        while (
-            self.current_token
-            and self.current_token.type == "OPERATOR"
-            and self.current_token.value in [
-                "==",
-                "!=",
-                "<",
-                ">",
-                "<=",
-                ">=",
-                "=",
-                "<>",
-            ]
-        ):
-            op_token = self.current_token
-            self.advance()
-            node = BinOperatorNode(op_token, node, self.parse_add())
-        return node
-
-    def parse_add(self) -> ExpressionNode:
-        node = self.parse_mul()
-        while (
-            self.current_token
-            and self.current_token.type == "OPERATOR"
-            and self.current_token.value in ["+", "-"]
-        ):
-            op_token = self.current_token
-            self.advance()
-            node = BinOperatorNode(op_token, node, self.parse_mul())
-        return node
-
-    def parse_mul(self) -> ExpressionNode:
-        node = self.parse_unary()
-        while (
-            self.current_token
-            and self.current_token.type == "OPERATOR"
-            and self.current_token.value in ["*", "/", "div", "mod"]
-        ):
-            op_token = self.current_token
-            self.advance()
-            node = BinOperatorNode(op_token, node, self.parse_unary())
-        return node
+        frames = []
+        operands = []
+        operators = []
+        open_parens = 0
+        while True:
+            token = self.current_token
+            while token is not None and token.type in PREFIX_TOKENS:
+                if token.type == LPAR:
+                    operators.append(None)
+                    open_parens += 1
+                elif token.type == NOT or token.value == "-":
+                    operators.append((UNARY_PRECEDENCE, token))
+                else:
+                    break
+                self.advance()
+                token = self.current_token
+            after = None
+            if token is not None and token.type == IDENTIFIER:
+                after = self.peek()
+            if after is not None and after.type in ARGUMENT_OPENERS:
+                self.advance()
+                self.advance()
+                if after.type == LPAR and self.match(RPAR):
+                    operands.append(FunctionCallNode(token.value, [], token))
+                else:
+                    frames.append(
+                        (after.type, token, [], operands, operators,
+                         open_parens)
+                    )
+                    operands, operators, open_parens = [], [], 0
+                    continue
+            else:
+                operands.append(self.parse_term())
+
+            while True:
+                token = self.current_token
+                if token is not None and token.type == OPERATOR:
+                    prec = binary_precedence(token.value)
+                    if prec is not None:
+                        if operators and operators[-1] is not None:
+                            self.reduce(operands, operators, prec)
+                        operators.append((prec, token))
+                        self.advance()
+                        break
+                if open_parens and token is not None and token.type == RPAR:
+                    self.reduce(operands, operators, 0)
+                    operators.pop()
+                    open_parens -= 1
+                    self.advance()
+                    continue
+                if open_parens:
+                    self.require(RPAR)
+                if operators:
+                    self.reduce(operands, operators, 0)
+                node = operands[0]
+                if not frames:
+                    return node
+
+                kind, name_token, args, operands, operators, open_parens = (
+                    frames[-1]
+                )
+                if kind == LBRACKET:
+                    frames.pop()
+                    self.require(RBRACKET)
+                    operands.append(
+                        ArrayAccessNode(name_token.value, node, name_token)
+                    )
+                    continue
+                args.append(node)
+                self.match(COMMA)
+                if self.match(RPAR):
+                    frames.pop()
+                    operands.append(
+                        FunctionCallNode(name_token.value, args, name_token)
+                    )
+                    continue
+                operands, operators, open_parens = [], [], 0
+                break
 
-    def parse_unary(self) -> ExpressionNode:
-        if self.current_token and self.current_token.type == "NOT":
-            op_token = self.current_token
-            self.advance()
-            return UnaryOperatorNode(op_token, self.parse_unary())
-        if (
-            self.current_token
-            and self.current_token.type == "OPERATOR"
-            and self.current_token.value == "-"
-        ):
-            op_token = self.current_token
-            self.advance()
-            return UnaryOperatorNode(op_token, self.parse_unary())
-        return self.parse_term()
+    def reduce(self, operands: list, operators: list, prec: int) -> None:
+        while operators and operators[-1] is not None:
+            top_prec, token = operators[-1]
+            if top_prec < prec:
+                return
+            operators.pop()
+            if top_prec == UNARY_PRECEDENCE:
+                operands[-1] = UnaryOperatorNode(token, operands[-1])
+            else:
+                right = operands.pop()
+                operands[-1] = BinOperatorNode(token, operands[-1], right)
 
     def getTextTree(self, root: StatementNode) -> str:
         text_tree = ""
@@ -390,298 +506,376 @@ class SyntaxAnalyzer:
         return text_tree
 
     def getTextNode(self, node: ExpressionNode, level: int = 0) -> str:
-        indent = "  " * level
-        result = ""
-
-        if isinstance(node, VarDeclarationNode):
-            result += f"{indent}VarDeclaration:\n"
-            for name, type_ in node.declarations:
-                result += f"{indent}  {name} : {self.format_type(type_)}\n"
-
-        elif isinstance(node, BinOperatorNode):
-            result += f"{indent}BinOp: {node.operator.value}\n"
-            result += self.getTextNode(node.leftNode, level + 1)
-            result += self.getTextNode(node.rightNode, level + 1)
-
-        elif isinstance(node, UnaryOperatorNode):
-            result += f"{indent}UnaryOp: {node.operator.value}\n"
-            result += self.getTextNode(node.operand, level + 1)
-
-        elif isinstance(node, ProcedureCallNode):
-            result += f"{indent}ProcedureCall: {node.name}\n"
-            for arg in node.args:
-                result += self.getTextNode(arg, level + 1)
-
-        elif isinstance(node, FunctionCallNode):
-            result += f"{indent}FunctionCall: {node.name}\n"
-            for arg in node.args:
-                result += self.getTextNode(arg, level + 1)
-
-        elif isinstance(node, ArrayAccessNode):
-            result += f"{indent}ArrayAccess: {node.name}\n"
-            result += self.getTextNode(node.index, level + 1)
-
-        elif isinstance(node, ValueNode):
-            result += f"{indent}Value: {node.value.value}\n"
-
-        elif isinstance(node, IfStatementNode):
-            result += f"{indent}If:\n"
-            result += self.getTextNode(node.condition, level + 1)
-            result += f"{indent}Then:\n"
-            for stmt in node.then_block.body:
-                result += self.getTextNode(stmt, level + 2)
-            if node.else_block:
-                result += f"{indent}Else:\n"
-                for stmt in node.else_block.body:
-                    result += self.getTextNode(stmt, level + 2)
-
-        elif isinstance(node, WhileStatementNode):
-            result += f"{indent}While:\n"
-            result += self.getTextNode(node.condition, level + 1)
-            result += f"{indent}Body:\n"
-            for stmt in node.body.body:
-                result += self.getTextNode(stmt, level + 2)
-
-        elif isinstance(node, RepeatUntilStatementNode):
-            result += f"{indent}RepeatUntil:\n"
-            result += f"{indent}  Body:\n"
-            for stmt in node.body.body:
-                result += self.getTextNode(stmt, level + 2)
-            result += f"{indent}  Until:\n"
-            result += self.getTextNode(node.condition, level + 2)
-
-        elif isinstance(node, CaseStatementNode):
-            result += f"{indent}Case:\n"
-            result += self.getTextNode(node.expression, level + 1)
-            for labels, block in node.cases:
-                result += f"{indent}  When:\n"
-                for label in labels:
-                    result += self.getTextNode(label, level + 2)
-                result += f"{indent}  Do:\n"
-                for stmt in block.body:
-                    result += self.getTextNode(stmt, level + 2)
-            if node.else_block:
-                result += f"{indent}  Else:\n"
-                for stmt in node.else_block.body:
-                    result += self.getTextNode(stmt, level + 2)
-
-        elif isinstance(node, FunctionDeclNode):
-            result += f"{indent}Function: {node.name}\n"
-            if node.params:
-                result += f"{indent}  Params:\n"
-                for name, type_ in node.params:
-                    result += (
-                        f"{indent}    {name} : {self.format_type(type_)}\n"
-                    )
-            result += f"{indent}  Return: {node.return_type}\n"
-            if node.local_decls:
-                result += f"{indent}  Locals:\n"
-                for name, type_ in node.local_decls:
-                    result += (
-                        f"{indent}    {name} : {self.format_type(type_)}\n"
-                    )
-            result += f"{indent}  Body:\n"
-            for stmt in node.body.body:
-                result += self.getTextNode(stmt, level + 2)
-
-        elif isinstance(node, ProcedureDeclNode):
-            result += f"{indent}Procedure: {node.name}\n"
-            if node.params:
-                result += f"{indent}  Params:\n"
-                for name, type_ in node.params:
-                    result += (
-                        f"{indent}    {name} : {self.format_type(type_)}\n"
-                    )
-            if node.local_decls:
-                result += f"{indent}  Locals:\n"
-                for name, type_ in node.local_decls:
-                    result += (
-                        f"{indent}    {name} : {self.format_type(type_)}\n"
-                    )
-            result += f"{indent}  Body:\n"
-            for stmt in node.body.body:
-                result += self.getTextNode(stmt, level + 2)
+        self.text_chunks = []
+        self.run(self.text(node, level))
+        text = "".join(self.text_chunks)
+        self.text_chunks = []
+        return text
+
+    def text(self, node: ExpressionNode, level: int):
+        handler = self.dispatch["text"][node.__class__]
+        if handler is not None:
+            return handler(self, node, level)
+        return None
+
+    def emit(self, text: str) -> None:
+        self.text_chunks.append(text)
 
-        return result
+    @visits("text", VarDeclarationNode)
+    def _text_var_declaration(
+        self,
+        node: VarDeclarationNode,
+        level: int,
+    ) -> None:
+        indent = "  " * level
+        self.emit(f"{indent}VarDeclaration:\n")
+        for name, type_ in node.declarations:
+            self.emit(f"{indent}  {name} : {self.format_type(type_)}\n")
+
+    @visits("text", BinOperatorNode)
+    def _text_bin_operator(
+        self,
+        node: BinOperatorNode,
+        level: int,
+    ) -> Iterator:
+        indent = "  " * level
+        self.emit(f"{indent}BinOp: {node.operator.value}\n")
+        yield self.text(node.leftNode, level + 1)
+        yield self.text(node.rightNode, level + 1)
+
+    @visits("text", UnaryOperatorNode)
+    def _text_unary_operator(
+        self,
+        node: UnaryOperatorNode,
+        level: int,
+    ) -> Iterator:
+        indent = "  " * level
+        self.emit(f"{indent}UnaryOp: {node.operator.value}\n")
+        yield self.text(node.operand, level + 1)
+
+    @visits("text", ProcedureCallNode)
+    def _text_procedure_call(
+        self,
+        node: ProcedureCallNode,
+        level: int,
+    ) -> Iterator:
+        indent = "  " * level
+        self.emit(f"{indent}ProcedureCall: {node.name}\n")
+        for arg in node.args:
+            yield self.text(arg, level + 1)
+
+    @visits("text", FunctionCallNode)
+    def _text_function_call(
+        self,
+        node: FunctionCallNode,
+        level: int,
+    ) -> Iterator:
+        indent = "  " * level
+        self.emit(f"{indent}FunctionCall: {node.name}\n")
+        for arg in node.args:
+            yield self.text(arg, level + 1)
+
+    @visits("text", ArrayAccessNode)
+    def _text_array_access(
+        self,
+        node: ArrayAccessNode,
+        level: int,
+    ) -> Iterator:
+        indent = "  " * level
+        self.emit(f"{indent}ArrayAccess: {node.name}\n")
+        yield self.text(node.index, level + 1)
 
-    def parse_for_statement(self) -> ExpressionNode:
-        self.require("FOR")
-        var_token = self.require("IDENTIFIER")
-        self.require("ASSIGN")
+    @visits("text", ValueNode)
+    def _text_value(self, node: ValueNode, level: int) -> None:
+        indent = "  " * level
+        self.emit(f"{indent}Value: {node.value.value}\n")
+
+    @visits("text", IfStatementNode)
+    def _text_if_statement(
+        self,
+        node: IfStatementNode,
+        level: int,
+    ) -> Iterator:
+        indent = "  " * level
+        self.emit(f"{indent}If:\n")
+        yield self.text(node.condition, level + 1)
+        self.emit(f"{indent}Then:\n")
+        for stmt in node.then_block.body:
+            yield self.text(stmt, level + 2)
+        if node.else_block:
+            self.emit(f"{indent}Else:\n")
+            for stmt in node.else_block.body:
+                yield self.text(stmt, level + 2)
+
+    @visits("text", WhileStatementNode)
+    def _text_while_statement(
+        self,
+        node: WhileStatementNode,
+        level: int,
+    ) -> Iterator:
+        indent = "  " * level
+        self.emit(f"{indent}While:\n")
+        yield self.text(node.condition, level + 1)
+        self.emit(f"{indent}Body:\n")
+        for stmt in node.body.body:
+            yield self.text(stmt, level + 2)
+
+    @visits("text", RepeatUntilStatementNode)
+    def _text_repeat_until_statement(
+        self,
+        node: RepeatUntilStatementNode,
+        level: int,
+    ) -> Iterator:
+        indent = "  " * level
+        self.emit(f"{indent}RepeatUntil:\n")
+        self.emit(f"{indent}  Body:\n")
+        for stmt in node.body.body:
+            yield self.text(stmt, level + 2)
+        self.emit(f"{indent}  Until:\n")
+        yield self.text(node.condition, level + 2)
+
+    @visits("text", CaseStatementNode)
+    def _text_case_statement(
+        self,
+        node: CaseStatementNode,
+        level: int,
+    ) -> Iterator:
+        indent = "  " * level
+        self.emit(f"{indent}Case:\n")
+        yield self.text(node.expression, level + 1)
+        for labels, block in node.cases:
+            self.emit(f"{indent}  When:\n")
+            for label in labels:
+                yield self.text(label, level + 2)
+            self.emit(f"{indent}  Do:\n")
+            for stmt in block.body:
+                yield self.text(stmt, level + 2)
+        if node.else_block:
+            self.emit(f"{indent}  Else:\n")
+            for stmt in node.else_block.body:
+                yield self.text(stmt, level + 2)
+
+    @visits("text", FunctionDeclNode)
+    def _text_function_decl(
+        self,
+        node: FunctionDeclNode,
+        level: int,
+    ) -> Iterator:
+        indent = "  " * level
+        self.emit(f"{indent}Function: {node.name}\n")
+        if node.params:
+            self.emit(f"{indent}  Params:\n")
+            for name, type_ in node.params:
+                self.emit(
+                    f"{indent}    {name} : {self.format_type(type_)}\n"
+                )
+        self.emit(f"{indent}  Return: {node.return_type}\n")
+        if node.local_decls:
+            self.emit(f"{indent}  Locals:\n")
+            for name, type_ in node.local_decls:
+                self.emit(
+                    f"{indent}    {name} : {self.format_type(type_)}\n"
+                )
+        self.emit(f"{indent}  Body:\n")
+        for stmt in node.body.body:
+            yield self.text(stmt, level + 2)
+
+    @visits("text", ProcedureDeclNode)
+    def _text_procedure_decl(
+        self,
+        node: ProcedureDeclNode,
+        level: int,
+    ) -> Iterator:
+        indent = "  " * level
+        self.emit(f"{indent}Procedure: {node.name}\n")
+        if node.params:
+            self.emit(f"{indent}  Params:\n")
+            for name, type_ in node.params:
+                self.emit(
+                    f"{indent}    {name} : {self.format_type(type_)}\n"
+                )
+        if node.local_decls:
+            self.emit(f"{indent}  Locals:\n")
+            for name, type_ in node.local_decls:
+                self.emit(
+                    f"{indent}    {name} : {self.format_type(type_)}\n"
+                )
+        self.emit(f"{indent}  Body:\n")
+        for stmt in node.body.body:
+            yield self.text(stmt, level + 2)
+
+    def parse_for_statement(self) -> Iterator:
+        self.require(FOR)
+        var_token = self.require(IDENTIFIER)
+        self.require(ASSIGN)
         start_expr = self.parse_expression()
 
         direction = self.current_token.type
-        if direction not in ["TO", "DOWNTO"]:
-            raise SyntaxError(
-                self.format_error(
-                    "Ожидается TO или DOWNTO, получено "
-                    f"{self.current_token.type}",
-                    self.current_token,
-                )
+        if direction not in FOR_DIRECTIONS:
+            raise self.error(
+                SyntaxError,
+                "Ожидается TO или DOWNTO, получено "
+                f"{self.current_token.type}",
+                self.current_token,
             )
         self.advance()
 
         end_expr = self.parse_expression()
-        self.require("DO")
-        if self.current_token.type == "BEGIN":
-            body = self.parse_block()
+        self.require(DO)
+        if self.current_token.type == BEGIN:
+            body = yield self._parse_block()
         else:
             body = BlockNode()
-            body.addNode(self.parse_statement())
+            body.addNode((yield self._parse_statement()))
         return ForStatementNode(
             var_token,
             start_expr,
             end_expr,
-            direction,
+            direction.name,
             body,
         )
 
-    def parse_repeat_until_statement(self) -> ExpressionNode:
-        self.require("REPEAT")
+    def parse_repeat_until_statement(self) -> Iterator:
+        self.require(REPEAT)
         body = BlockNode()
-        while not self.match("UNTIL"):
-            body.addNode(self.parse_statement())
-            self.require("SEMICOLON")
+        while not self.match(UNTIL):
+            try:
+                body.addNode((yield self._parse_statement()))
+                self.require(SEMICOLON)
+            except SyntaxError as err:
+                self.synchronize(err)
         condition = self.parse_expression()
         return RepeatUntilStatementNode(body, condition)
 
-    def parse_block(self) -> BlockNode:
+    def _parse_block(self) -> Iterator:
         body = BlockNode()
-        self.require("BEGIN")
+        self.require(BEGIN)
 
         while True:
-            if self.current_token.type == "END":
+            if self.current_token.type == END:
                 self.advance()
                 break
 
-            body.addNode(self.parse_statement())
+            try:
+                body.addNode((yield self._parse_statement()))
 
-            if self.current_token.type == "END":
-                self.advance()
-                break
+                if self.current_token.type == END:
+                    self.advance()
+                    break
 
-            self.require("SEMICOLON")
+                self.require(SEMICOLON)
+            except SyntaxError as err:
+                self.synchronize(err)
 
         return body
 
-    def parse_case_statement(self) -> CaseStatementNode:
-        self.require("CASE")
+    def parse_case_statement(self) -> Iterator:
+        self.require(CASE)
         expression = self.parse_expression()
-        self.require("OF")
+        self.require(OF)
         cases = []
 
-        while self.current_token and self.current_token.type not in [
-            "ELSE",
-            "END",
-        ]:
-            labels = [self.parse_case_label()]
-            while self.match("COMMA"):
-                labels.append(self.parse_case_label())
-            self.require("COLON")
-
-            if self.current_token.type == "BEGIN":
-                block = self.parse_block()
-            else:
-                block = BlockNode()
-                block.addNode(self.parse_statement())
+        while self.current_token and self.current_token.type not in CASE_END:
+            try:
+                labels = [self.parse_case_label()]
+                while self.match(COMMA):
+                    labels.append(self.parse_case_label())
+                self.require(COLON)
 
-            self.require("SEMICOLON")
-            cases.append((labels, block))
+                if self.current_token.type == BEGIN:
+                    block = yield self._parse_block()
+                else:
+                    block = BlockNode()
+                    block.addNode((yield self._parse_statement()))
+
+                self.require(SEMICOLON)
+                cases.append((labels, block))
+            except SyntaxError as err:
+                self.synchronize(err)
 
         else_block = None
-        if self.match("ELSE"):
-            if self.current_token.type == "BEGIN":
-                else_block = self.parse_block()
+        if self.match(ELSE):
+            if self.current_token.type == BEGIN:
+                else_block = yield self._parse_block()
             else:
                 else_block = BlockNode()
-                else_block.addNode(self.parse_statement())
-            if self.current_token and self.current_token.type == "SEMICOLON":
+                else_block.addNode((yield self._parse_statement()))
+            if self.current_token and self.current_token.type == SEMICOLON:
                 self.advance()
 
-        self.require("END")
+        self.require(END)
         return CaseStatementNode(expression, cases, else_block)
 
     def parse_case_label(self) -> ExpressionNode:
-        if self.current_token.type in [
-            "NUMBER",
-            "STRING",
-            "BOOL_LIT",
-            "CHAR_LIT",
-            "IDENTIFIER",
-        ]:
+        if self.current_token.type in CASE_LABEL_TOKENS:
             node = ValueNode(self.current_token)
             self.advance()
             return node
 
-        raise SyntaxError(
-            self.format_error(
-                f"Неверная метка CASE: {self.current_token.type}",
-                self.current_token,
-            )
+        raise self.error(
+            SyntaxError,
+            f"Неверная метка CASE: {self.current_token.type}",
+            self.current_token,
         )
 
     def parse_lvalue(self) -> ExpressionNode:
-        if self.current_token.type != "IDENTIFIER":
-            raise SyntaxError(
-                self.format_error(
-                    "Ожидается идентификатор, "
-                    f"получено {self.current_token.type}",
-                    self.current_token,
-                )
+        token = self.current_token
+        if token is None or token.type != IDENTIFIER:
+            current_type = token.type if token else "EOF"
+            raise self.error(
+                SyntaxError,
+                f"Ожидается идентификатор, получено {current_type}",
+                token,
             )
-        if self.peek() and self.peek().type == "LBRACKET":
+        if self.peek() and self.peek().type == LBRACKET:
             return self.parse_array_access()
         node = ValueNode(self.current_token)
         self.advance()
         return node
 
     def parse_array_access(self) -> ArrayAccessNode:
-        name_token = self.require("IDENTIFIER")
+        name_token = self.require(IDENTIFIER)
         name = name_token.value
-        self.require("LBRACKET")
+        self.require(LBRACKET)
         index = self.parse_expression()
-        self.require("RBRACKET")
+        self.require(RBRACKET)
         return ArrayAccessNode(name, index, name_token)
 
     def parse_type(self, allow_array: bool):
-        if self.current_token.type == "ARRAY":
+        if self.current_token.type == ARRAY:
             if not allow_array:
-                raise SyntaxError(
-                    self.format_error(
-                        "Массивы не поддерживаются в параметрах",
-                        self.current_token,
-                    )
+                raise self.error(
+                    SyntaxError,
+                    "Массивы не поддерживаются в параметрах",
+                    self.current_token,
                 )
             self.advance()
-            self.require("LBRACKET")
-            low_tok = self.require("NUMBER")
+            self.require(LBRACKET)
+            low_tok = self.require(NUMBER)
             if "." in low_tok.value:
-                raise SyntaxError(
-                    self.format_error(
-                        "Нижняя граница массива должна быть integer",
-                        low_tok,
-                    )
+                raise self.error(
+                    SyntaxError,
+                    "Нижняя граница массива должна быть integer",
+                    low_tok,
                 )
-            self.require("RANGE")
-            high_tok = self.require("NUMBER")
+            self.require(RANGE)
+            high_tok = self.require(NUMBER)
             if "." in high_tok.value:
-                raise SyntaxError(
-                    self.format_error(
-                        "Верхняя граница массива должна быть integer",
-                        high_tok,
-                    )
+                raise self.error(
+                    SyntaxError,
+                    "Верхняя граница массива должна быть integer",
+                    high_tok,
                 )
-            self.require("RBRACKET")
-            self.require("OF")
+            self.require(RBRACKET)
+            self.require(OF)
             elem_type = self.parse_type(allow_array=False)
             low = int(low_tok.value)
             high = int(high_tok.value)
             if low > high:
-                raise SyntaxError(
-                    self.format_error(
-                        "Нижняя граница массива больше верхней",
-                        low_tok,
-                    )
+                raise self.error(
+                    SyntaxError,
+                    "Нижняя граница массива больше верхней",
+                    low_tok,
                 )
             return {
                 "kind": "array",
@@ -690,22 +884,15 @@ class SyntaxAnalyzer:
                 "elem": elem_type,
             }
 
-        if self.current_token.type in [
-            "INTEGER",
-            "STRING",
-            "BOOLEAN",
-            "REAL",
-            "CHAR",
-        ]:
+        if self.current_token.type in TYPE_TOKENS:
             var_type = self.current_token.value.lower()
             self.advance()
             return var_type
 
-        raise SyntaxError(
-            self.format_error(
-                f"Неверный тип: {self.current_token.value}",
-                self.current_token,
-            )
+        raise self.error(
+            SyntaxError,
+            f"Неверный тип: {self.current_token.value}",
+            self.current_token,
         )
 
     def format_type(self, type_) -> str:
@@ -717,23 +904,12 @@ class SyntaxAnalyzer:
         return str(type_)
 
     def parse_procedure_call(self) -> ProcedureCallNode:
-        name_token = self.require("IDENTIFIER")
+        name_token = self.require(IDENTIFIER)
         name = name_token.value
-        self.require("LPAR")
+        self.require(LPAR)
         args = []
-        while not self.match("RPAR"):
+        while not self.match(RPAR):
             args.append(self.parse_expression())
-            if self.match("COMMA"):
+            if self.match(COMMA):
                 continue
         return ProcedureCallNode(name, args, name_token)
-
-    def parse_function_call(self) -> FunctionCallNode:
-        name_token = self.require("IDENTIFIER")
-        name = name_token.value
-        self.require("LPAR")
-        args = []
-        while not self.match("RPAR"):
-            args.append(self.parse_expression())
-            if self.match("COMMA"):
-                continue
-        return FunctionCallNode(name, args, name_token)
@@ -0,0 +1,109 @@
+from types import GeneratorType
+from typing import Optional
+
+from lexer import located
+from nodes import node_token
+
+
+def visits(table: str, *node_classes: type):
+    def register(method):
+        method.visits = getattr(method, "visits", ()) + tuple(
+            (table, node_class) for node_class in node_classes
+        )
+        return method
+
+    return register
+
+
+class DispatchTable(dict):
+    def __missing__(self, node_class: type):
+        found = None
+        for base in node_class.__mro__[1:]:
+            if base in self:
+                found = self[base]
+                break
+        self[node_class] = found
+        return found
+
+
+class NodeVisitor:
+    dispatch = {}
+    max_depth = 100_000
+    recover = False
+    max_errors = 20
+    depth_error = RecursionError
+
+    def __init_subclass__(cls, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+        names = {}
+        for klass in reversed(cls.__mro__):
+            for name, attr in vars(klass).items():
+                for table, node_class in getattr(attr, "visits", ()):
+                    names.setdefault(table, {})[node_class] = name
+        cls.dispatch = {
+            table: DispatchTable(
+                (node_class, getattr(cls, name))
+                for node_class, name in handlers.items()
+            )
+            for table, handlers in names.items()
+        }
+
+    def record_error(self, err: Exception) -> None:
+        if not self.recover or len(self.errors) + 1 >= self.max_errors:
+            raise err
+        self.errors.append(err)
+
+    def depth_exceeded(self, request, stack: list) -> Exception:
+        position = self.depth_position(request, stack)
+        message = (
+            f"Превышена максимальная глубина вложенности ({self.max_depth})"
+        )
+        if position is not None:
+            message += f" (строка {position[0]}, колонка {position[1]})"
+        return located(self.depth_error(message), position)
+
+    def depth_position(self, request, stack: list) -> Optional[tuple]:
+        for task in (request, *reversed(stack)):
+            frame = task.gi_frame
+            if frame is None:
+                continue
+            for value in frame.f_locals.values():
+                token = node_token(value)
+                if token is not None:
+                    return token.position
+        return None
+
+    def run(self, task):
+        if task.__class__ is not GeneratorType:
+            return task
+        limit = self.max_depth
+        stack = [task]
+        value = None
+        error = None
+        while stack:
+            try:
+                if error is None:
+                    request = stack[-1].send(value)
+                else:
+                    thrown, error = error, None
+                    request = stack[-1].throw(thrown)
+            except StopIteration as stop:
+                stack.pop()
+                value = stop.value
+                continue
+            except Exception as err:
+                stack.pop()
+                if not stack:
+                    raise
+                error = err
+                continue
+            if request.__class__ is GeneratorType:
+                if len(stack) >= limit:
+                    error = self.depth_exceeded(request, stack)
+                    request.close()
+                    continue
+                stack.append(request)
+                value = None
+            else:
+                value = request
+        return value
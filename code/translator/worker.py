@@ -0,0 +1,116 @@
+import signal
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+
+import pipeline
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+TRANSLATOR = pipeline.Translator(instrument=True)
+CPU_SECONDS = None
+
+
+def init_worker(cpu_seconds: Optional[int], max_errors: int = 1) -> None:
+    global TRANSLATOR, CPU_SECONDS
+    TRANSLATOR = pipeline.Translator(
+        instrument=True,
+        recover=max_errors > 1,
+        max_errors=max_errors,
+    )
+    CPU_SECONDS = cpu_seconds if resource is not None else None
+    if CPU_SECONDS is not None:
+        signal.signal(signal.SIGXCPU, cpu_exceeded)
+
+
+def cpu_exceeded(signum, frame) -> None:
+    raise TimeoutError(
+        f"Превышен лимит процессорного времени ({CPU_SECONDS} с)"
+    )
+
+
+def translate(source: str) -> pipeline.Result:
+    if CPU_SECONDS is None:
+        return TRANSLATOR.translate(source)
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    soft, hard = resource.getrlimit(resource.RLIMIT_CPU)
+    limit = int(usage.ru_utime + usage.ru_stime) + 1 + CPU_SECONDS
+    if hard != resource.RLIM_INFINITY:
+        limit = min(limit, hard)
+    resource.setrlimit(resource.RLIMIT_CPU, (limit, hard))
+    try:
+        return TRANSLATOR.translate(source)
+    finally:
+        resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+
+
+def result_payload(result: pipeline.Result) -> dict:
+    return {
+        "ok": result.ok,
+        "output": result.output,
+        "diagnostics": [
+            diagnostic._asdict() for diagnostic in result.diagnostics
+        ],
+        "timings": dict(result.stats.stage_seconds) if result.stats else {},
+    }
+
+
+class TranslationPool:
+    def __init__(
+        self,
+        workers: int,
+        queue_size: int,
+        cpu_seconds: Optional[int] = None,
+        max_errors: int = 1,
+    ) -> None:
+        self.workers = workers
+        self.cpu_seconds = cpu_seconds
+        self.max_errors = max_errors
+        self.slots = threading.BoundedSemaphore(workers + queue_size)
+        self.lock = threading.Lock()
+        self.executor = None
+        self.rejected = 0
+
+    def pool(self) -> ProcessPoolExecutor:
+        with self.lock:
+            if self.executor is None:
+                self.executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    initializer=init_worker,
+                    initargs=(self.cpu_seconds, self.max_errors),
+                )
+            return self.executor
+
+    def restart(self, broken: ProcessPoolExecutor) -> None:
+        with self.lock:
+            if self.executor is broken:
+                self.executor = None
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def submit(self, source: str) -> Optional[Future]:
+        if not self.slots.acquire(blocking=False):
+            with self.lock:
+                self.rejected += 1
+            return None
+        try:
+            executor = self.pool()
+            try:
+                future = executor.submit(translate, source)
+            except BrokenProcessPool:
+                self.restart(executor)
+                future = self.pool().submit(translate, source)
+        except BaseException:
+            self.slots.release()
+            raise
+        future.add_done_callback(lambda _: self.slots.release())
+        return future
+
+    def shutdown(self) -> None:
+        with self.lock:
+            executor, self.executor = self.executor, None
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
@@ -2,17 +2,20 @@ import importlib
 import os
 import socket
 import sys
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
 
-from flask import Flask, flash, render_template, request
+from flask import Flask, Response, flash, jsonify, render_template, request
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 TRANSLATOR_DIR = os.path.abspath(os.path.join(BASE_DIR, "..", "translator"))
 sys.path.insert(0, TRANSLATOR_DIR)
 
-codegen = importlib.import_module("codegen")
-lexer = importlib.import_module("lexer")
-semanalyzer = importlib.import_module("semanalyzer")
-syntaxer = importlib.import_module("syntaxer")
+cache = importlib.import_module("cache")
+incremental = importlib.import_module("incremental")
+metrics = importlib.import_module("metrics")
+pipeline = importlib.import_module("pipeline")
+worker = importlib.import_module("worker")
 
 TEMPLATE_DIR = os.path.join(BASE_DIR, "templates")
 STATIC_DIR = os.path.join(BASE_DIR, "static")
@@ -23,26 +26,155 @@ app = Flask(
     static_folder=STATIC_DIR,
 )
 app.config["SECRET_KEY"] = "smA8691BVVd2bq9iSzeAm2yW1GJJD0dE"
+app.config["TRANSLATION_CACHE_SIZE"] = int(
+    os.environ.get("PAS2GO_CACHE_SIZE", "1024")
+)
+app.config["TRANSLATION_CACHE_BYTES"] = int(
+    os.environ.get("PAS2GO_CACHE_BYTES", str(64 * 2**20))
+)
+app.config["TRANSLATION_CACHE_DIR"] = os.environ.get("PAS2GO_CACHE_DIR")
+app.config["INCREMENTAL_TRANSLATION"] = (
+    os.environ.get("PAS2GO_INCREMENTAL", "0") == "1"
+)
+
+app.config["MAX_DIAGNOSTICS"] = int(
+    os.environ.get("PAS2GO_MAX_DIAGNOSTICS", "20")
+)
+
+app.config["API_WORKERS"] = int(
+    os.environ.get("PAS2GO_API_WORKERS", str(os.cpu_count() or 1))
+)
+app.config["API_QUEUE_SIZE"] = int(os.environ.get("PAS2GO_API_QUEUE", "16"))
+app.config["API_TIMEOUT"] = float(os.environ.get("PAS2GO_API_TIMEOUT", "10"))
+app.config["API_CPU_SECONDS"] = int(
+    os.environ.get("PAS2GO_API_CPU_SECONDS", "5")
+)
+
+translator = pipeline.Translator(
+    instrument=True,
+    recover=app.config["MAX_DIAGNOSTICS"] > 1,
+    max_errors=app.config["MAX_DIAGNOSTICS"],
+)
+incremental_translator = incremental.IncrementalTranslator(translator)
+metrics_registry = metrics.MetricsRegistry()
+translation_pool = worker.TranslationPool(
+    workers=app.config["API_WORKERS"],
+    queue_size=app.config["API_QUEUE_SIZE"],
+    cpu_seconds=app.config["API_CPU_SECONDS"],
+    max_errors=app.config["MAX_DIAGNOSTICS"],
+)
+translation_cache = cache.TranslationCache(
+    max_entries=app.config["TRANSLATION_CACHE_SIZE"],
+    max_bytes=app.config["TRANSLATION_CACHE_BYTES"],
+    directory=app.config["TRANSLATION_CACHE_DIR"],
+)
+
+
+def translate(source: str) -> cache.CachedTranslation:
+    cached = translation_cache.get(source)
+    if cached is not None:
+        return cached
+
+    if app.config["INCREMENTAL_TRANSLATION"]:
+        translation = incremental_translator.translate(source)
+    else:
+        translation = translator.translate(source)
+    metrics_registry.record(translation)
+    error = None
+    if translation.diagnostics:
+        error = "\n".join(
+            diagnostic.format() for diagnostic in translation.diagnostics
+        )
+    result = cache.CachedTranslation(translation.output, error)
+
+    translation_cache.put(source, result)
+    return result
 
 
 @app.route("/", methods=["GET"])
 def index():
     input_text = request.args.get("input")
-    output = ""
 
     if not input_text:
         return render_template("index.html", input="", output="")
 
+    result = translate(input_text)
+    if result.error is not None:
+        for message in result.error.splitlines():
+            flash(message, category="error")
+
+    return render_template(
+        "index.html",
+        input=input_text,
+        output=result.output,
+    )
+
+
+def api_error(status: int, message: str, headers: dict = None) -> Response:
+    response = jsonify({"ok": False, "error": message})
+    response.status_code = status
+    if headers:
+        response.headers.update(headers)
+    return response
+
+
+@app.route("/api/translate", methods=["POST"])
+def api_translate():
+    payload = request.get_json(silent=True)
+    source = payload.get("source") if isinstance(payload, dict) else None
+    if not isinstance(source, str):
+        return api_error(400, "Ожидается JSON с полем source (строка)")
+
+    future = translation_pool.submit(source)
+    if future is None:
+        return api_error(
+            429, "Очередь трансляций заполнена", {"Retry-After": "1"}
+        )
     try:
-        tokens = lexer.tokenize(input_text)
-        analyzer = syntaxer.SyntaxAnalyzer(tokens)
-        syntax_tree = analyzer.parse_program()
-        semanalyzer.SemanticAnalyzer().check_program(syntax_tree)
-        output = codegen.CodeGenerator().generate(syntax_tree)
-    except Exception as err:
-        flash(f"{type(err)}: {err}", category="error")
-
-    return render_template("index.html", input=input_text, output=output)
+        translation = future.result(timeout=app.config["API_TIMEOUT"])
+    except FutureTimeoutError:
+        future.cancel()
+        return api_error(504, "Превышено время ожидания трансляции")
+    except BrokenProcessPool:
+        return api_error(503, "Процесс трансляции завершился аварийно")
+
+    metrics_registry.record(translation)
+    return jsonify(worker.result_payload(translation))
+
+
+@app.route("/metrics", methods=["GET"])
+def metrics_view():
+    cache_stats = translation_cache.stats()
+    routine_stats = incremental_translator.stats()
+    text = metrics_registry.render(
+        {
+            "cache_hits_total": (
+                "Translation cache hits in memory.",
+                cache_stats["hits"],
+            ),
+            "cache_disk_hits_total": (
+                "Translation cache hits on disk.",
+                cache_stats["disk_hits"],
+            ),
+            "cache_misses_total": (
+                "Translation cache misses.",
+                cache_stats["misses"],
+            ),
+            "routines_reused_total": (
+                "Routines reused by incremental translation.",
+                routine_stats["reused"],
+            ),
+            "routines_translated_total": (
+                "Routines translated by incremental translation.",
+                routine_stats["translated"],
+            ),
+            "api_rejected_total": (
+                "API requests rejected because the queue was full.",
+                translation_pool.rejected,
+            ),
+        }
+    )
+    return Response(text, mimetype="text/plain; version=0.0.4")
 
 
 def find_free_port(start_port: int = 5000, max_attempts: int = 10) -> int:
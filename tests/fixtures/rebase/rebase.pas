@@ -0,0 +1,35 @@
+program rebase;
+var
+  a: array[1..1000] of integer;
+  b: array[1..1000] of integer;
+  i: integer;
+procedure fill(seed: integer);
+begin
+  for i := 1 to 1000 do
+  begin
+    a[i] := seed;
+    b[i] := seed + 1;
+  end;
+end;
+function total(n: integer): integer;
+var
+  s: integer;
+begin
+  s := 0;
+  for i := 1 to n do
+    s := s + a[i] * b[i];
+  total := s;
+end;
+function weighted(n: integer): integer;
+var
+  s: integer;
+begin
+  s := 0;
+  for i := n downto 1 do
+    s := s + a[i] * i;
+  weighted := s;
+end;
+begin
+  fill(3);
+  writeln(total(1000), weighted(1000));
+end.
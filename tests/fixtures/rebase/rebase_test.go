@@ -0,0 +1,27 @@
+package main
+
+import "testing"
+
+func TestTotals(t *testing.T) {
+	fill(3)
+	if got := total(1000); got != 12000 {
+		t.Fatalf("total(1000) = %d, want 12000", got)
+	}
+	if got := weighted(1000); got != 1501500 {
+		t.Fatalf("weighted(1000) = %d, want 1501500", got)
+	}
+}
+
+func BenchmarkTotal(b *testing.B) {
+	fill(3)
+	for n := 0; n < b.N; n++ {
+		total(1000)
+	}
+}
+
+func BenchmarkWeighted(b *testing.B) {
+	fill(3)
+	for n := 0; n < b.N; n++ {
+		weighted(1000)
+	}
+}
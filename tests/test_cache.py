@@ -0,0 +1,80 @@
+import importlib
+import os
+import sys
+import tempfile
+import unittest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+TRANSLATOR_DIR = os.path.join(ROOT, "code", "translator")
+sys.path.insert(0, TRANSLATOR_DIR)
+
+cache = importlib.import_module("cache")
+
+
+def entry(output: str, error: str = None):
+    return cache.CachedTranslation(output, error)
+
+
+class TranslationCacheTests(unittest.TestCase):
+    def test_hit_and_miss_counters(self):
+        translations = cache.TranslationCache(version="v1")
+        self.assertIsNone(translations.get("program a;"))
+        translations.put("program a;", entry("package main"))
+        self.assertEqual(
+            translations.get("program a;"),
+            entry("package main"),
+        )
+        stats = translations.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 1))
+
+    def test_errors_are_cached(self):
+        translations = cache.TranslationCache(version="v1")
+        translations.put("bad", entry("", "SyntaxError"))
+        self.assertEqual(translations.get("bad").error, "SyntaxError")
+
+    def test_evicts_least_recently_used_entry(self):
+        translations = cache.TranslationCache(max_entries=2, version="v1")
+        translations.put("a", entry("A"))
+        translations.put("b", entry("B"))
+        translations.get("a")
+        translations.put("c", entry("C"))
+        self.assertIsNotNone(translations.get("a"))
+        self.assertIsNone(translations.get("b"))
+
+    def test_byte_limit(self):
+        translations = cache.TranslationCache(max_bytes=10, version="v1")
+        translations.put("a", entry("x" * 6))
+        translations.put("b", entry("y" * 6))
+        self.assertIsNone(translations.get("a"))
+        self.assertEqual(translations.stats()["bytes"], 6)
+        translations.put("c", entry("z" * 11))
+        self.assertIsNone(translations.get("c"))
+
+    def test_disk_tier_survives_restart(self):
+        with tempfile.TemporaryDirectory() as directory:
+            first = cache.TranslationCache(directory=directory, version="v1")
+            first.put("src", entry("go code"))
+            second = cache.TranslationCache(directory=directory, version="v1")
+            self.assertEqual(second.get("src"), entry("go code"))
+            self.assertEqual(second.stats()["disk_hits"], 1)
+            other = cache.TranslationCache(directory=directory, version="v2")
+            self.assertIsNone(other.get("src"))
+
+    def test_malformed_disk_entries_are_misses(self):
+        with tempfile.TemporaryDirectory() as directory:
+            translations = cache.TranslationCache(
+                directory=directory, version="v1"
+            )
+            path = translations.path(translations.key("src"))
+            os.makedirs(os.path.dirname(path))
+            for text in ('{"output": "go"}', "[1, 2]", '"go"', "{"):
+                with self.subTest(text=text):
+                    with open(path, "w", encoding="utf-8") as stored:
+                        stored.write(text)
+                    self.assertIsNone(translations.get("src"))
+                    self.assertFalse(os.path.exists(path))
+            self.assertEqual(translations.stats()["misses"], 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
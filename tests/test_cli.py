@@ -0,0 +1,81 @@
+import importlib
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+TRANSLATOR_DIR = os.path.join(ROOT, "code", "translator")
+sys.path.insert(0, TRANSLATOR_DIR)
+
+pas2go = importlib.import_module("pas2go")
+
+GOOD = """
+program good;
+begin
+  writeln(1);
+end.
+"""
+
+BAD = """
+program bad;
+begin
+  x := 1;
+end.
+"""
+
+
+class BatchCliTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.root = self.tmp.name
+        os.mkdir(os.path.join(self.root, "nested"))
+        self.write("good.pas", GOOD)
+        self.write(os.path.join("nested", "bad.pas"), BAD)
+        self.write("notes.txt", "not pascal")
+
+    def write(self, name: str, text: str) -> None:
+        with open(os.path.join(self.root, name), "w") as source:
+            source.write(text)
+
+    def run_cli(self, *args: str) -> tuple:
+        summary_path = os.path.join(self.root, "summary.json")
+        code = pas2go.main([*args, "--summary", summary_path, self.root])
+        with open(summary_path) as summary:
+            return code, json.load(summary)
+
+    def test_translates_directory_in_process_pool(self):
+        code, summary = self.run_cli("--workers", "2", "--chunk-size", "1")
+        self.assertEqual(code, 1)
+        self.assertEqual(
+            (summary["files"], summary["translated"], summary["failed"]),
+            (2, 1, 1),
+        )
+        go_path = os.path.join(self.root, "good.go")
+        with open(go_path) as output:
+            self.assertIn("int64(1), 10))", output.read())
+        failed = [r for r in summary["results"] if r["error"]]
+        self.assertEqual(failed[0]["error_type"], "NameError")
+        self.assertEqual(failed[0]["snippet"], "4 |   x := 1;\n  |   ^")
+
+    def test_single_worker(self):
+        os.remove(os.path.join(self.root, "nested", "bad.pas"))
+        code, summary = self.run_cli("--workers", "1")
+        self.assertEqual(code, 0)
+        self.assertEqual(summary["translated"], 1)
+        self.assertIsNone(summary["results"][0]["removed_nodes"])
+
+    def test_optimize_reports_removed_nodes(self):
+        os.remove(os.path.join(self.root, "nested", "bad.pas"))
+        self.write("good.pas", GOOD.replace("writeln(1)", "writeln(1 + 2)"))
+        code, summary = self.run_cli("--workers", "2", "--optimize")
+        self.assertEqual(code, 0)
+        self.assertEqual(summary["results"][0]["removed_nodes"], 2)
+        with open(os.path.join(self.root, "good.go")) as output:
+            self.assertIn("int64(3), 10))", output.read())
+
+
+if __name__ == "__main__":
+    unittest.main()
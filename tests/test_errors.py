@@ -202,6 +202,69 @@ end.
         with self.assertRaises(NameError):
             analyze_pascal(src)
 
+    def test_read_checks_targets(self):
+        cases = {
+            "read(b)": TypeError,
+            "readln(a)": TypeError,
+            "read(y)": NameError,
+            "read(a[b])": TypeError,
+            "read(1)": SyntaxError,
+            "read(x": SyntaxError,
+        }
+        for statement, error in cases.items():
+            src = (
+                "program t;\nvar\n  x: integer;\n  b: boolean;\n"
+                "  a: array[1..2] of integer;\n"
+                f"begin\n  {statement};\nend.\n"
+            )
+            with self.subTest(statement=statement):
+                with self.assertRaises(error):
+                    analyze_pascal(src)
+
+    def test_generated_go_names_are_rejected(self):
+        src = """
+program t;
+var
+  _out: integer;
+begin
+  _out := 1;
+  writeln(_out);
+end.
+"""
+        with self.assertRaisesRegex(NameError, "'_out' зарезервировано"):
+            analyze_pascal(src)
+
+    def test_reader_helper_names_are_rejected(self):
+        goruntime = importlib.import_module("goruntime")
+        for name, (requires, _) in goruntime.RUNTIME.items():
+            for declared in (name, *requires):
+                self.assertIn(declared.lower(), lexer.GENERATED_NAMES)
+        src = """
+program t;
+var
+  _in: integer;
+procedure _readInt;
+begin
+end;
+begin
+  read(_in);
+end.
+"""
+        with self.assertRaisesRegex(NameError, "'_in' зарезервировано"):
+            analyze_pascal(src)
+
+    def test_syntax_error_reported_before_later_lexer_error(self):
+        src = """
+program t;
+begin x := ;
+  writeln(1 @ 2);
+end.
+"""
+        tokens = lexer.iter_tokens(src)
+        with self.assertRaisesRegex(SyntaxError, "строка 3"):
+            syntaxer.SyntaxAnalyzer(tokens).parse_program()
+        self.assertEqual(next(tokens).value, "writeln")
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,113 @@
+import importlib
+import os
+import sys
+import unittest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+TRANSLATOR_DIR = os.path.join(ROOT, "code", "translator")
+sys.path.insert(0, TRANSLATOR_DIR)
+
+incremental = importlib.import_module("incremental")
+pipeline = importlib.import_module("pipeline")
+
+SOURCE = """program t;
+var
+  x: integer;
+function g(a: integer): integer;
+begin
+  g := a + 1;
+end;
+function f(a: integer): integer;
+begin
+  case a of
+    1: f := g(a);
+  else
+    f := 0;
+  end;
+end;
+procedure p(a: integer);
+begin
+  writeln(a);
+end;
+begin
+  x := f(3);
+  p(x);
+end.
+"""
+
+
+class IncrementalTranslatorTests(unittest.TestCase):
+    def setUp(self):
+        self.full = pipeline.Translator()
+        self.translator = incremental.IncrementalTranslator()
+
+    def assertSameAsFull(self, source):
+        result = self.translator.translate(source)
+        expected = self.full.translate(source)
+        self.assertEqual(result.output, expected.output)
+        self.assertEqual(result.diagnostics, expected.diagnostics)
+        return result
+
+    def test_routine_spans(self):
+        tokens = list(incremental.lexer.iter_tokens(SOURCE))
+        head, spans, tail = incremental.split_routines(tokens)
+        self.assertEqual(head[-1].type, incremental.lexer.SEMICOLON)
+        self.assertEqual([span[1].value for span in spans], ["g", "f", "p"])
+        self.assertEqual(tail[0].type, incremental.lexer.BEGIN)
+
+    def test_unchanged_routines_are_reused(self):
+        self.assertSameAsFull(SOURCE)
+        self.assertSameAsFull(SOURCE.replace("x := f(3)", "x := f(4)"))
+        self.assertEqual(self.translator.stats()["reused"], 3)
+        self.assertSameAsFull(SOURCE.replace("writeln(a)", "writeln(a, 1)"))
+        stats = self.translator.stats()
+        self.assertEqual((stats["reused"], stats["translated"]), (5, 4))
+
+    def test_callers_are_rechecked_when_signature_changes(self):
+        self.assertSameAsFull(SOURCE)
+        changed = SOURCE.replace(
+            "function g(a: integer): integer;", "function g(a: real): integer;"
+        ).replace("g := a + 1", "g := 1")
+        result = self.assertSameAsFull(changed)
+        self.assertFalse(result.ok)
+        self.assertEqual(result.diagnostics[0].line, 11)
+
+    def test_globals_change_invalidates_routines(self):
+        self.assertSameAsFull(SOURCE)
+        self.assertSameAsFull(SOURCE.replace("x: integer", "x, y: integer"))
+        self.assertEqual(self.translator.stats()["reused"], 0)
+
+    def test_errors_match_full_translation(self):
+        self.assertSameAsFull(SOURCE)
+        for index, source in enumerate((
+            SOURCE.replace("writeln(a)", "writeln(a @ 1)"),
+            SOURCE.replace("g := a + 1;", "g := a +;"),
+            SOURCE.replace("end;\nprocedure", "end\nprocedure"),
+            SOURCE.replace("p(x)", "p(x, x)"),
+        )):
+            with self.subTest(index=index):
+                self.assertFalse(self.assertSameAsFull(source).ok)
+
+    def test_recovering_translator_falls_back(self):
+        self.full = pipeline.Translator(recover=True)
+        self.translator = incremental.IncrementalTranslator(self.full)
+        self.assertSameAsFull(SOURCE)
+        broken = SOURCE.replace("g := a + 1;", "g := a +;").replace(
+            "p(x);", "p(x, x);"
+        )
+        result = self.assertSameAsFull(broken)
+        self.assertEqual(len(result.diagnostics), 2)
+        self.assertEqual(self.translator.stats()["fallbacks"], 1)
+
+    def test_internal_errors_are_not_hidden(self):
+        def broken(head, spans, tail):
+            raise KeyError("entry")
+
+        self.translator.translate_layout = broken
+        with self.assertRaises(KeyError):
+            self.translator.translate(SOURCE)
+        self.assertEqual(self.translator.stats()["fallbacks"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
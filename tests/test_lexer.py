@@ -0,0 +1,145 @@
+import importlib
+import os
+import sys
+import tempfile
+import unittest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+TRANSLATOR_DIR = os.path.join(ROOT, "code", "translator")
+sys.path.insert(0, TRANSLATOR_DIR)
+
+lexer = importlib.import_module("lexer")
+
+
+def kinds(code: str) -> list:
+    return [
+        (token.type.name, token.value) for token in lexer.tokenize(code)
+    ]
+
+
+def fields(token) -> tuple:
+    return token.type, token.value, token.line, token.column
+
+
+class LexerTests(unittest.TestCase):
+    def test_keywords_are_case_insensitive(self):
+        self.assertEqual(
+            kinds("PROGRAM Begin eNd"),
+            [("PROGRAM", "PROGRAM"), ("BEGIN", "Begin"), ("END", "eNd")],
+        )
+
+    def test_keyword_prefix_is_identifier(self):
+        self.assertEqual(
+            kinds("programx do_it endif"),
+            [
+                ("IDENTIFIER", "programx"),
+                ("IDENTIFIER", "do_it"),
+                ("IDENTIFIER", "endif"),
+            ],
+        )
+
+    def test_word_operators_and_literals(self):
+        self.assertEqual(
+            kinds("a AND true mod 2"),
+            [
+                ("IDENTIFIER", "a"),
+                ("OPERATOR", "AND"),
+                ("BOOL_LIT", "true"),
+                ("OPERATOR", "mod"),
+                ("NUMBER", "2"),
+            ],
+        )
+
+    def test_word_operator_needs_leading_boundary(self):
+        self.assertEqual(
+            kinds("1and 1begin"),
+            [
+                ("NUMBER", "1"),
+                ("IDENTIFIER", "and"),
+                ("NUMBER", "1"),
+                ("BEGIN", "begin"),
+            ],
+        )
+
+    def test_positions(self):
+        tokens = lexer.tokenize("x := 1;\n  { c\n }  y")
+        self.assertEqual((tokens[0].line, tokens[0].column), (1, 0))
+        self.assertEqual((tokens[-1].line, tokens[-1].column), (3, 4))
+
+    def test_line_index(self):
+        index = lexer.LineIndex("ab\n\tc := 1\n\nd")
+        self.assertEqual(index.position(0), (1, 0))
+        self.assertEqual(index.position(3), (2, 0))
+        self.assertEqual(index.position(9), (2, 6))
+        self.assertEqual(index.position(12), (4, 0))
+        self.assertEqual(index.snippet(2, 3), "2 | \tc := 1\n  | \t  ^")
+        self.assertEqual(index.snippet(5, 0), "")
+
+    def test_go_reserved_word(self):
+        with self.assertRaises(NameError):
+            lexer.tokenize("var func: integer;")
+
+    def test_generated_names_are_reserved(self):
+        for name in ("_end1", "_END12", "_out", "strconv", "Bufio", "os"):
+            source = f"var {name}: integer;"
+            with self.subTest(name=name):
+                with self.assertRaisesRegex(NameError, "кода Go"):
+                    lexer.tokenize(source)
+                with self.assertRaisesRegex(NameError, "кода Go"):
+                    list(lexer.iter_bytes_tokens(source.encode("utf-8")))
+        self.assertEqual(
+            kinds("_end _endx end1"),
+            [("IDENTIFIER", "_end"), ("IDENTIFIER", "_endx"),
+             ("IDENTIFIER", "end1")],
+        )
+
+    def test_file_tokens_match_string_tokens(self):
+        code = (
+            "program p; { комментарий }\nvar s: string; c: char;\n"
+            "begin s := 'привет\nмир'; c := 'ж'; writeln(s, c and1, 1.5)"
+            "\nend."
+        )
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "p.pas")
+            with open(path, "w", encoding="utf-8") as source:
+                source.write(code)
+            self.assertEqual(
+                list(map(fields, lexer.iter_file_tokens(path))),
+                list(map(fields, lexer.tokenize(code))),
+            )
+
+    def test_file_and_string_entry_points_agree_on_unicode(self):
+        pipeline = importlib.import_module("pipeline")
+        good = (
+            "program p;\nvar \u017fum: integer;\nbegin\n"
+            "  \u017fum :=\u00a0\u0661\u0662;\n  writeln('ж', \u017fum)\nend."
+        )
+        bad = "program p;\nbegin\n  writeln('ж');\u3000x\u00e9\nend."
+        translator = pipeline.Translator()
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "p.pas")
+            for code in (good, bad):
+                with open(path, "w", encoding="utf-8") as source:
+                    source.write(code)
+                with self.subTest(code=code):
+                    self.assertEqual(
+                        translator.translate_file(path),
+                        translator.translate(code),
+                    )
+            with open(path, "w", encoding="utf-8") as source:
+                source.write(good)
+            self.assertEqual(
+                list(map(fields, lexer.iter_file_tokens(path))),
+                list(map(fields, lexer.tokenize(good))),
+            )
+        self.assertFalse(translator.translate(bad).ok)
+
+    def test_bytes_tokens_errors(self):
+        with self.assertRaisesRegex(SyntaxError, "'@' на строке 2, колонка 4"):
+            list(lexer.iter_bytes_tokens("x\n'ж' @".encode("utf-8")))
+        with self.assertRaises(NameError):
+            list(lexer.iter_bytes_tokens(b"var func: integer;"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+import importlib
+import os
+import sys
+import unittest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+TRANSLATOR_DIR = os.path.join(ROOT, "code", "translator")
+sys.path.insert(0, TRANSLATOR_DIR)
+
+incremental = importlib.import_module("incremental")
+pipeline = importlib.import_module("pipeline")
+
+DECLS = "var\n  x: integer;\n  f: real;\n  b: boolean;\n"
+
+
+def program(body: str) -> str:
+    return f"program t;\n{DECLS}begin\n{body}\nend.\n"
+
+
+class OptimizerTests(unittest.TestCase):
+    def setUp(self):
+        self.translator = pipeline.Translator(optimize=True, instrument=True)
+
+    def translate(self, source: str) -> pipeline.Result:
+        result = self.translator.translate(source)
+        self.assertEqual(result.diagnostics, [])
+        return result
+
+    def test_constants_are_folded(self):
+        result = self.translate(program(
+            "  x := 2 * 3 + 4;\n"
+            "  x := -7 div 2 + -7 mod 3 * 10 + 7 mod -3 * 100;\n"
+            "  x := 9 / -2;\n"
+            "  f := 1.0 / 3.0 * 3.0;\n"
+            "  b := not (true and false) xor (2 > 3);\n"
+            "  x := x + 1 div 0;\n"
+            "  b := 'abc' < 'abd';"
+        ))
+        self.assertIn("\tx = 10\n", result.output)
+        self.assertIn("\tx = 87\n", result.output)
+        self.assertIn("\tx = -4\n", result.output)
+        self.assertIn("\tf = 1.0\n", result.output)
+        self.assertIn("\tb = true\n", result.output)
+        self.assertIn("\tx = x + 1 / 0\n", result.output)
+        self.assertIn("\tb = true\n}", result.output)
+        self.assertEqual(result.stats.removed_nodes, 37)
+
+    def test_dead_branches_are_pruned(self):
+        result = self.translate(program(
+            "  if 1 > 2 then\n    x := 1\n  else\n    x := 2;\n"
+            "  while false do\n    x := x + 1;\n"
+            "  for x := 5 to 1 do\n    writeln(x);\n"
+            "  repeat\n    x := x + 3;\n  until true;\n"
+            "  case 1 + 1 of\n    1: x := 4;\n    2, 3: x := 5;\n"
+            "  else\n    x := 6;\n  end;"
+        ))
+        main = result.output.split("func main() {\n", 1)[1]
+        self.assertEqual(
+            main, "\tx = 2\n\tx = x + 3\n\tx = 5\n}"
+        )
+        self.assertEqual(result.stats.removed_nodes, 42)
+        self.assertIn("optimize", result.stats.stage_seconds)
+
+    def test_dropped_locals_are_kept_used(self):
+        result = self.translate(
+            "program t;\n"
+            "procedure p(a: integer);\n"
+            "var\n  u, w: integer;\n"
+            "begin\n"
+            "  u := a;\n"
+            "  if false then\n    writeln(u, w);\n"
+            "end;\n"
+            "begin\n  p(1);\nend.\n"
+        )
+        self.assertIn(
+            "\tvar u int\n\tvar w int\n\t_ = u\n\t_ = w\n\tu = a\n}",
+            result.output,
+        )
+
+    def test_programs_without_constants_are_unchanged(self):
+        source = program(
+            "  x := x * 2 + 1;\n"
+            "  if b then\n    f := f / 2.5;\n"
+            "  while x < 10 do\n    x := x + 1;"
+        )
+        result = self.translate(source)
+        self.assertEqual(
+            result.output, pipeline.Translator().translate(source).output
+        )
+        self.assertEqual(result.stats.removed_nodes, 0)
+
+    def test_incremental_translation_optimizes_fresh_routines(self):
+        source = (
+            "program t;\n"
+            "var\n  x: integer;\n"
+            "function g(a: integer): integer;\n"
+            "begin\n  g := a * (2 + 3);\nend;\n"
+            "begin\n  if true then\n    x := g(1);\nend.\n"
+        )
+        translator = incremental.IncrementalTranslator(
+            pipeline.Translator(optimize=True)
+        )
+        first = translator.translate(source)
+        self.assertIn("return a * 5\n", first.output)
+        self.assertIn("\tx = g(1)\n}", first.output)
+        self.assertEqual(translator.translate(source).output, first.output)
+        self.assertEqual(translator.stats()["reused"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,240 @@
+import importlib
+import os
+import sys
+import tempfile
+import threading
+import unittest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+TRANSLATOR_DIR = os.path.join(ROOT, "code", "translator")
+sys.path.insert(0, TRANSLATOR_DIR)
+
+metrics = importlib.import_module("metrics")
+pipeline = importlib.import_module("pipeline")
+
+
+def program(body: str, decls: str = "") -> str:
+    return f"program t;\n{decls}begin\n{body}\nend.\n"
+
+
+class TranslatorTests(unittest.TestCase):
+    def setUp(self):
+        self.translator = pipeline.Translator()
+
+    def test_successful_translation(self):
+        result = self.translator.translate(program("  writeln(1);"))
+        self.assertTrue(result.ok)
+        self.assertIn("int64(1), 10))", result.output)
+
+    def test_diagnostic_stages(self):
+        cases = [
+            (program("  writeln(1 @ 2);"), "lexer", "SyntaxError", 3),
+            (program("  x := ;"), "syntax", "SyntaxError", 3),
+            (program("  x := 1;"), "semantic", "NameError", 3),
+        ]
+        for source, stage, kind, line in cases:
+            with self.subTest(stage=stage):
+                result = self.translator.translate(source)
+                self.assertFalse(result.ok)
+                self.assertEqual(result.output, "")
+                (diagnostic,) = result.diagnostics
+                self.assertEqual(
+                    (diagnostic.stage, diagnostic.kind, diagnostic.line),
+                    (stage, kind, line),
+                )
+                self.assertEqual(
+                    diagnostic.snippet.splitlines()[0],
+                    f"{line} | " + source.splitlines()[line - 1],
+                )
+
+    def test_diagnostic_position_comes_from_exception(self):
+        lexer = importlib.import_module("lexer")
+        located = lexer.located(TypeError("без позиции"), (2, 1))
+        diagnostic = pipeline.diagnostic_from("semantic", located)
+        self.assertEqual((diagnostic.line, diagnostic.column), (2, 1))
+        plain = TypeError("текст (строка 2, колонка 1)")
+        diagnostic = pipeline.diagnostic_from("semantic", plain)
+        self.assertEqual((diagnostic.line, diagnostic.column), (None, None))
+
+        source = program("  x := 'a';", "var\n  x: integer;\n")
+        (diagnostic,) = self.translator.translate(source).diagnostics
+        self.assertEqual((diagnostic.line, diagnostic.column), (5, 7))
+
+    def test_state_is_reset_between_translations(self):
+        declared = program("  x := 1;", "var\n  x: integer;\n")
+        self.assertTrue(self.translator.translate(declared).ok)
+        self.assertFalse(self.translator.translate(program("  x := 1;")).ok)
+        self.assertTrue(self.translator.translate(declared).ok)
+
+    def test_shared_between_threads(self):
+        sources = [
+            program(f"  x := {n};", "var\n  x: integer;\n")
+            for n in range(20)
+        ]
+        outputs = {}
+
+        def work(index: int) -> None:
+            for _ in range(20):
+                result = self.translator.translate(sources[index])
+                outputs.setdefault(index, set()).add(result.output)
+
+        threads = [
+            threading.Thread(target=work, args=(n,)) for n in range(20)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for index, seen in outputs.items():
+            self.assertEqual(len(seen), 1)
+            self.assertIn(f"x = {index}\n", seen.pop())
+
+    def test_deep_nesting(self):
+        depth = 10000
+        decls = "var\n  x: integer;\n"
+        cases = {
+            "if": "  if x > 0 then begin\n" * depth
+            + "  x := 1;\n" + "  end;\n" * depth,
+            "while": "  while x > 0 do\n" * depth + "  x := x - 1;",
+            "chain": "  x := " + " + ".join(["x"] * depth) + ";",
+            "parens": "  x := " + "(" * depth + "x" + ")" * depth + ";",
+        }
+        for name, body in cases.items():
+            with self.subTest(name=name):
+                result = self.translator.translate(program(body, decls))
+                self.assertTrue(result.ok, result.diagnostics)
+                self.assertIn("x", result.output)
+
+    def test_max_depth_diagnostic(self):
+        translator = pipeline.Translator(max_depth=100)
+        body = "  while x > 0 do\n" * 200 + "  x := x - 1;"
+        result = translator.translate(program(body, "var\n  x: integer;\n"))
+        (diagnostic,) = result.diagnostics
+        self.assertEqual(
+            (diagnostic.stage, diagnostic.kind), ("syntax", "SyntaxError")
+        )
+        self.assertIn("глубина вложенности (100)", diagnostic.message)
+        self.assertIsNotNone(diagnostic.line)
+
+    def test_max_depth_after_parsing(self):
+        body = "  while x > 0 do\n" * 30 + "  x := x - 1;"
+        source = program(body, "var\n  x: integer;\n")
+        for index, stage in ((1, "semantic"), (2, "codegen")):
+            with self.subTest(stage=stage):
+                translator = pipeline.Translator()
+                translator.passes()[index].max_depth = 20
+                (diagnostic,) = translator.translate(source).diagnostics
+                self.assertEqual(
+                    (diagnostic.stage, diagnostic.kind),
+                    (stage, "RecursionError"),
+                )
+                self.assertIn("глубина вложенности (20)", diagnostic.message)
+                self.assertTrue(3 < diagnostic.line < 35, diagnostic)
+                self.assertIn("while x > 0 do", diagnostic.snippet)
+
+    def test_recovery_collects_diagnostics(self):
+        source = program(
+            "  x := ;\n"
+            "  x := 1\n"
+            "  x := 'a';\n"
+            "  while x > 0 do\n"
+            "  begin\n"
+            "    x := x + ;\n"
+            "    y := 2;\n"
+            "  end;\n"
+            "  repeat\n"
+            "    x := x - 1;\n"
+            "  end;\n"
+            "  until x = 0;\n"
+            "  x := true;",
+            "var\n  x: integer;\n",
+        )
+        result = pipeline.Translator(recover=True).translate(source)
+        self.assertEqual(result.output, "")
+        self.assertEqual(
+            [(item.stage, item.kind, item.line)
+             for item in result.diagnostics],
+            [
+                ("syntax", "SyntaxError", 5),
+                ("syntax", "SyntaxError", 7),
+                ("syntax", "SyntaxError", 10),
+                ("syntax", "SyntaxError", 15),
+                ("semantic", "NameError", 11),
+                ("semantic", "TypeError", 17),
+            ],
+        )
+        limited = pipeline.Translator(recover=True, max_errors=4)
+        self.assertEqual(
+            [item.line for item in limited.translate(source).diagnostics],
+            [5, 7, 10, 15],
+        )
+        self.assertEqual(len(self.translator.translate(source).diagnostics), 1)
+
+    def test_recovery_keeps_valid_programs_and_lexer_errors(self):
+        translator = pipeline.Translator(recover=True)
+        source = program("  x := 1;", "var\n  x: integer;\n")
+        self.assertEqual(
+            translator.translate(source), self.translator.translate(source)
+        )
+        result = translator.translate(program("  x := ;\n  x := 1 @ 2;"))
+        self.assertEqual(
+            [item.stage for item in result.diagnostics], ["syntax", "lexer"]
+        )
+
+    def test_translate_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "t.pas")
+            for source in (
+                program("  writeln('ёж');", "var\n  x: integer;\n"),
+                program("  x := 1;"),
+            ):
+                with open(path, "w", encoding="utf-8") as target:
+                    target.write(source)
+                with self.subTest(source=source):
+                    self.assertEqual(
+                        self.translator.translate_file(path),
+                        self.translator.translate(source),
+                    )
+            missing = self.translator.translate_file(path + ".missing")
+            (diagnostic,) = missing.diagnostics
+            self.assertEqual(
+                (diagnostic.stage, diagnostic.kind),
+                ("lexer", "FileNotFoundError"),
+            )
+
+    def test_stats_are_optional(self):
+        result = self.translator.translate(program("  writeln(1);"))
+        self.assertIsNone(result.stats)
+
+    def test_instrumented_translation(self):
+        translator = pipeline.Translator(instrument=True)
+        source = program(
+            "  if x > 1 then\n    x := (x + 1) * 2;",
+            "var\n  x: integer;\n",
+        )
+        result = translator.translate(source)
+        stats = result.stats
+        self.assertEqual(
+            set(stats.stage_seconds),
+            {"lexer", "syntax", "semantic", "codegen"},
+        )
+        self.assertEqual(stats.tokens, 26)
+        self.assertEqual(stats.nodes, 14)
+        self.assertEqual(stats.max_depth, 8)
+        self.assertEqual(stats.output_bytes, len(result.output))
+
+        failed = translator.translate(program("  x := 1;"))
+        self.assertNotIn("codegen", failed.stats.stage_seconds)
+
+        registry = metrics.MetricsRegistry()
+        registry.record(result)
+        registry.record(failed)
+        text = registry.render()
+        self.assertIn('pas2go_translations_total{outcome="ok"} 1', text)
+        self.assertIn('pas2go_translations_total{outcome="error"} 1', text)
+        self.assertIn('pas2go_stage_seconds_count{stage="codegen"} 1', text)
+        self.assertIn("pas2go_ast_max_depth 8", text)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+import importlib
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+TRANSLATOR_DIR = os.path.join(ROOT, "code", "translator")
+FIXTURE_DIR = os.path.join(ROOT, "tests", "fixtures", "rebase")
+sys.path.insert(0, TRANSLATOR_DIR)
+
+pipeline = importlib.import_module("pipeline")
+
+GO = shutil.which("go")
+
+
+def translate_fixture(rebase_loops: bool) -> str:
+    translator = pipeline.Translator()
+    generator = translator.passes()[2]
+    generator.rebase_loops = rebase_loops
+    with open(os.path.join(FIXTURE_DIR, "rebase.pas")) as source:
+        result = translator.translate(source.read())
+    assert result.ok, result.diagnostics
+    return result.output
+
+
+class LoopRebasingTests(unittest.TestCase):
+    def test_index_only_loops_are_rebased(self):
+        rebased = translate_fixture(True)
+        self.assertIn("for i := 0; i <= 999; i++ {", rebased)
+        self.assertIn("\t\ta[i] = seed\n", rebased)
+        self.assertIn("for i := 0; i <= n - 1; i++ {", rebased)
+        self.assertIn("s = s + a[i] * b[i]", rebased)
+        self.assertIn("for i := n; i >= 1; i-- {", rebased)
+        self.assertIn("s = s + a[(i) - 1] * i", rebased)
+
+        plain = translate_fixture(False)
+        self.assertIn("for i := 1; i <= n; i++ {", plain)
+        self.assertIn("s = s + a[(i) - 1] * b[(i) - 1]", plain)
+
+    def test_escaping_or_mixed_indexes_keep_offsets(self):
+        source = """program t;
+var
+  a: array[1..10] of integer;
+  z: array[0..9] of integer;
+  i, j: integer;
+begin
+  for i := 1 to 10 do
+    a[i] := z[i];
+  for i := 2 to j + 1 do
+    a[i] := j;
+  for i := -1 to 8 do
+    z[i + 1] := a[i + 2];
+end.
+"""
+        output = pipeline.Translator().translate(source).output
+        self.assertIn("for i := 1; i <= 10; i++ {", output)
+        self.assertIn("a[(i) - 1] = z[i]", output)
+        self.assertIn("for i, _end1 := 1, (j + 1) - 1; i <= _end1;", output)
+        self.assertIn("\t\ta[i] = j\n", output)
+        self.assertIn("a[(i + 2) - 1]", output)
+
+    @unittest.skipUnless(GO, "нет компилятора Go")
+    def test_go_benchmark_fixture(self):
+        for rebase_loops in (False, True):
+            with self.subTest(rebase_loops=rebase_loops):
+                with tempfile.TemporaryDirectory() as module:
+                    with open(os.path.join(module, "main.go"), "w") as main:
+                        main.write(translate_fixture(rebase_loops))
+                    with open(os.path.join(module, "go.mod"), "w") as mod:
+                        mod.write("module rebase\n\ngo 1.18\n")
+                    shutil.copy(
+                        os.path.join(FIXTURE_DIR, "rebase_test.go"), module
+                    )
+                    run = subprocess.run(
+                        [GO, "test", "-bench", ".", "-benchtime", "10x"],
+                        cwd=module,
+                        capture_output=True,
+                        text=True,
+                        timeout=300,
+                    )
+                    self.assertEqual(
+                        run.returncode, 0, run.stdout + run.stderr
+                    )
+                    self.assertIn("BenchmarkTotal", run.stdout)
+
+
+if __name__ == "__main__":
+    unittest.main()
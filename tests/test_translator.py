@@ -1,6 +1,9 @@
 import importlib
 import os
+import shutil
+import subprocess
 import sys
+import tempfile
 import unittest
 
 ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
@@ -12,6 +15,30 @@ lexer = importlib.import_module("lexer")
 semanalyzer = importlib.import_module("semanalyzer")
 syntaxer = importlib.import_module("syntaxer")
 
+GO = shutil.which("go")
+
+READ_PROGRAM = """
+program t;
+var
+  n, i, s: integer;
+  a: array[1..5] of integer;
+  r: real;
+  c: char;
+  line: string;
+begin
+  readln(n);
+  s := 0;
+  for i := 1 to n do
+  begin
+    read(a[i]);
+    s := s + a[i];
+  end;
+  readln;
+  read(r, c);
+  readln(line);
+  writeln(s, r, c, line);
+end.
+"""
 
 def compile_pascal(code: str) -> str:
     tokens = lexer.tokenize(code)
@@ -122,6 +149,44 @@ end.
         self.assertIn("case 2, 3:", out)
         self.assertIn("default:", out)
 
+    def test_for_end_bound_is_evaluated_once(self):
+        src = """
+program t;
+var
+  n, j: integer;
+function f(k: integer): integer;
+begin
+  f := k;
+end;
+procedure p(m: integer);
+var
+  i, k: integer;
+begin
+  for i := 1 to m do
+    k := k + i;
+  for i := 1 to k do
+    k := k - 1;
+  for i := m downto -2 do
+    for j := 1 to f(i) do
+      writeln(j);
+end;
+begin
+  for j := 1 to n do
+    writeln(j);
+  for j := 1 to j do
+    writeln(j);
+end.
+"""
+        out = compile_pascal(src)
+        self.assertIn("for i := 1; i <= m; i++ {", out)
+        self.assertIn("for i, _end1 := 1, k; i <= _end1; i++ {", out)
+        self.assertIn("for i := m; i >= -2; i-- {", out)
+        self.assertIn(
+            "\t\tfor j, _end1 := 1, f(i); j <= _end1; j++ {", out
+        )
+        self.assertIn("for j, _end1 := 1, n; j <= _end1; j++ {", out)
+        self.assertIn("for j, _end1 := 1, j; j <= _end1; j++ {", out)
+
     def test_types_float_char(self):
         src = """
 program t;
@@ -152,7 +217,181 @@ end.
         out = compile_pascal(src)
         self.assertIn("var a [3]int", out)
         self.assertIn("a[(i) - 1] = 10", out)
-        self.assertIn("fmt.Println(a[(1) - 1])", out)
+        self.assertIn(
+            "_out.Write(strconv.AppendInt(_out.AvailableBuffer(), "
+            "int64(a[(1) - 1]), 10))",
+            out,
+        )
+
+    def test_writeln_is_buffered_and_typed(self):
+        src = """
+program t;
+var
+  f: real;
+  c: char;
+  b: boolean;
+  a: array[1..2] of integer;
+begin
+  writeln(f, c, b, 'a "b"');
+  writeln(a);
+  writeln();
+end.
+"""
+        out = compile_pascal(src)
+        self.assertIn(
+            'import (\n\t"bufio"\n\t"fmt"\n\t"os"\n\t"strconv"\n)\n\n'
+            "var _out = bufio.NewWriter(os.Stdout)\n",
+            out,
+        )
+        self.assertIn("func main() {\n\tdefer _out.Flush()\n", out)
+        self.assertIn(
+            "\t_out.Write(strconv.AppendFloat(_out.AvailableBuffer(), "
+            "f, 'g', -1, 64))\n"
+            "\t_out.WriteByte(' ')\n"
+            "\t_out.WriteRune(c)\n"
+            "\t_out.WriteByte(' ')\n"
+            "\t_out.Write(strconv.AppendBool(_out.AvailableBuffer(), b))\n"
+            "\t_out.WriteByte(' ')\n"
+            '\t_out.WriteString("a \\"b\\"")\n'
+            "\t_out.WriteByte('\\n')\n"
+            "\tfmt.Fprint(_out, a)\n"
+            "\t_out.WriteByte('\\n')\n"
+            "\t_out.WriteByte('\\n')\n}",
+            out,
+        )
+
+        silent = compile_pascal("program t;\nbegin\nend.\n")
+        self.assertEqual(silent, "package main\n\nfunc main() {\n}")
+
+    def test_read_uses_shared_reader(self):
+        out = compile_pascal(READ_PROGRAM)
+        self.assertIn(
+            "var _in = bufio.NewReaderSize(os.Stdin, 1<<16)\n", out
+        )
+        self.assertIn("func _readInt() int {", out)
+        self.assertNotIn("fmt", out)
+        self.assertIn(
+            "\tn = _readInt()\n"
+            "\t_skipLine()\n",
+            out,
+        )
+        self.assertIn("\t\ta[i] = _readInt()\n", out)
+        self.assertIn(
+            "\t_skipLine()\n"
+            "\tr = _readReal()\n"
+            "\tc = _readChar()\n"
+            "\tline = _readString()\n"
+            "\t_skipLine()\n",
+            out,
+        )
+
+        only_int = compile_pascal(
+            "program t;\nvar\n  x: integer;\nbegin\n  read(x);\nend.\n"
+        )
+        self.assertIn('import (\n\t"bufio"\n\t"os"\n)\n', only_int)
+        self.assertNotIn("_readString", only_int)
+        self.assertNotIn("_out", only_int)
+
+    @unittest.skipUnless(GO, "нет компилятора Go")
+    def test_read_runs_in_go(self):
+        with tempfile.TemporaryDirectory() as module:
+            with open(os.path.join(module, "main.go"), "w") as main:
+                main.write(compile_pascal(READ_PROGRAM))
+            run = subprocess.run(
+                [GO, "run", "main.go"],
+                cwd=module,
+                input=" 3 \r\n-4 +10\n7 rest\r\n2.5e1x hello\r\n",
+                capture_output=True,
+                text=True,
+                timeout=300,
+            )
+        self.assertEqual(run.returncode, 0, run.stderr)
+        self.assertEqual(run.stdout, "13 25 x  hello\n")
+
+    def test_expression_types_are_annotated(self):
+        src = """
+program t;
+var
+  x: integer;
+  b: boolean;
+begin
+  x := 1 + 2 * x;
+  b := x > 3;
+end.
+"""
+        ast = syntaxer.SyntaxAnalyzer(lexer.tokenize(src)).parse_program()
+        semanalyzer.SemanticAnalyzer().check_program(ast)
+        first, second = ast.main_block.body
+        self.assertEqual(first.rightNode.expr_type, "integer")
+        self.assertEqual(first.rightNode.rightNode.expr_type, "integer")
+        self.assertEqual(second.leftNode.expr_type, "boolean")
+        self.assertEqual(second.rightNode.expr_type, "boolean")
+
+    def test_identifiers_are_bound_to_symbols(self):
+        src = """
+program t;
+var
+  a: array[1..3] of integer;
+  x: integer;
+procedure p(x: integer);
+var
+  a: array[0..2] of integer;
+begin
+  a[x] := x;
+end;
+begin
+  a[x] := x;
+end.
+"""
+        ast = syntaxer.SyntaxAnalyzer(lexer.tokenize(src)).parse_program()
+        semanalyzer.SemanticAnalyzer().check_program(ast)
+        (local,) = ast.routines[0].body.body
+        (main,) = ast.main_block.body
+        self.assertEqual(
+            (local.leftNode.symbol.depth, local.leftNode.symbol.low), (1, 0)
+        )
+        self.assertEqual(local.rightNode.symbol.depth, 1)
+        self.assertEqual(
+            (main.leftNode.symbol.depth, main.leftNode.symbol.high), (0, 3)
+        )
+        self.assertEqual(main.leftNode.index.symbol.type, "integer")
+        out = codegen.CodeGenerator().generate(ast)
+        self.assertIn("\ta[x] = x\n", out)
+        self.assertIn("\ta[(x) - 1] = x\n", out)
+
+        parser = syntaxer.SyntaxAnalyzer(lexer.tokenize(src))
+        unchecked = parser.parse_program()
+        with self.assertRaisesRegex(RuntimeError, "Массив a не связан"):
+            codegen.CodeGenerator().generate(unchecked)
+
+    def test_expression_shapes(self):
+        def shape(node):
+            if isinstance(node, syntaxer.BinOperatorNode):
+                return (
+                    node.operator.value,
+                    shape(node.leftNode),
+                    shape(node.rightNode),
+                )
+            if isinstance(node, syntaxer.UnaryOperatorNode):
+                return (node.operator.value, shape(node.operand))
+            return node.value.value
+
+        cases = {
+            "1 - 2 - 3": ("-", ("-", "1", "2"), "3"),
+            "-a * b": ("*", ("-", "a"), "b"),
+            "not a = b OR c": ("OR", ("=", ("not", "a"), "b"), "c"),
+            "a * -(b + c)": ("*", "a", ("-", ("+", "b", "c"))),
+        }
+        for text, expected in cases.items():
+            with self.subTest(text=text):
+                parser = syntaxer.SyntaxAnalyzer(lexer.tokenize(text))
+                self.assertEqual(shape(parser.parse_expression()), expected)
+
+    def test_deeply_nested_expression_parses(self):
+        depth = 10000
+        text = "(" * depth + "-1" + ")" * depth + " + " + "- " * depth + "x"
+        node = syntaxer.SyntaxAnalyzer(lexer.tokenize(text)).parse_expression()
+        self.assertEqual(node.operator.value, "+")
 
 
 if __name__ == "__main__":
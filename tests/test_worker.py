@@ -0,0 +1,65 @@
+import importlib
+import os
+import sys
+import unittest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+TRANSLATOR_DIR = os.path.join(ROOT, "code", "translator")
+sys.path.insert(0, TRANSLATOR_DIR)
+
+worker = importlib.import_module("worker")
+
+GOOD = "program t;\nvar\n  x: integer;\nbegin\n  x := 1;\nend.\n"
+HEAVY = (
+    "program t;\nvar\n  x: integer;\nbegin\n"
+    + "  x := x + 1;\n" * 100000
+    + "end.\n"
+)
+
+
+class TranslationPoolTests(unittest.TestCase):
+    def make_pool(self, **options) -> worker.TranslationPool:
+        pool = worker.TranslationPool(**options)
+        self.addCleanup(pool.shutdown)
+        return pool
+
+    def test_result_payload(self):
+        payload = worker.result_payload(worker.translate(GOOD))
+        self.assertTrue(payload["ok"])
+        self.assertIn("x = 1", payload["output"])
+        self.assertEqual(payload["diagnostics"], [])
+        self.assertEqual(
+            set(payload["timings"]), {"lexer", "syntax", "semantic", "codegen"}
+        )
+
+        failed = worker.result_payload(
+            worker.translate(GOOD.replace("x := 1", "y := 1"))
+        )
+        (diagnostic,) = failed["diagnostics"]
+        self.assertEqual(
+            (diagnostic["stage"], diagnostic["kind"], diagnostic["line"]),
+            ("semantic", "NameError", 5),
+        )
+
+    def test_full_queue_is_rejected(self):
+        pool = self.make_pool(workers=1, queue_size=0)
+        first = pool.submit(GOOD.replace("x := 1;", "x := 1;\n" * 2000))
+        self.assertIsNone(pool.submit(GOOD))
+        self.assertEqual(pool.rejected, 1)
+        self.assertTrue(first.result(timeout=60).ok)
+
+    def test_cpu_limit_stops_translation(self):
+        pool = self.make_pool(
+            workers=1, queue_size=1, cpu_seconds=1, max_errors=20
+        )
+        heavy = pool.submit(HEAVY)
+        good = pool.submit(GOOD)
+        result = heavy.result(timeout=60)
+        self.assertFalse(result.ok)
+        self.assertEqual(result.diagnostics[-1].kind, "TimeoutError")
+        self.assertIn("процессорного времени", result.diagnostics[-1].message)
+        self.assertTrue(good.result(timeout=60).ok)
+
+
+if __name__ == "__main__":
+    unittest.main()